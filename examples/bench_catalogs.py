@@ -0,0 +1,77 @@
+"""
+Compare option storage backends on the operations get_input performs on
+large option sets: building the lookup tables, single and batch key lookup,
+prefix completion, and the first substring pass of type-to-search.
+
+    python examples/bench_catalogs.py --sizes 10000 100000 500000
+
+NumpyCatalog is skipped when numpy is not installed.
+"""
+import argparse
+import time
+
+from receptus import OptionCatalog
+from receptus.prompt import option_tables
+from receptus.search import IncrementalFilter
+
+try:
+    from receptus.numpy_backend import NumpyCatalog, np
+except ImportError:
+    np = None
+
+
+def best(fn, repeat=5):
+    """Best wall time of ``repeat`` runs, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def run(size, batch):
+    options = {f"host{i:07d}": f"Host {i} rack {i % 97}" for i in range(size)}
+    lookups = [f"host{i:07d}" for i in range(0, size, max(1, size // batch))][:batch]
+
+    backends = {"dict": lambda: options, "OptionCatalog": lambda: OptionCatalog(options)}
+    if np is not None:
+        backends["NumpyCatalog"] = lambda: NumpyCatalog(options)
+
+    rows = []
+    for name, build in backends.items():
+        build_ms = best(lambda: option_tables(build(), None, "key"), repeat=3)
+        opts = build()
+        _, keys, _, complete, _ = option_tables(opts, None, "key")
+        if hasattr(opts, "find_many"):
+            batch_fn = lambda: opts.find_many(lookups)  # noqa: E731
+        else:
+            batch_fn = lambda: [keys.get(low) for low in lookups]  # noqa: E731
+        rows.append((
+            name,
+            build_ms,
+            best(lambda: [keys.get(low) for low in lookups]) / len(lookups) * 1000,
+            best(batch_fn),
+            best(lambda: complete("host00012")),
+            best(lambda: IncrementalFilter(opts).update("rack 42"), repeat=3),
+        ))
+
+    print(f"\n{size} options ({len(lookups)} lookups per batch)")
+    print(f"{'backend':<15}{'build ms':>10}{'lookup us':>11}{'batch ms':>10}{'prefix ms':>11}{'search ms':>11}")
+    for name, *cols in rows:
+        print(f"{name:<15}" + "".join(f"{c:>{w}.3f}" for c, w in zip(cols, (10, 11, 10, 11, 11))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    if np is None:
+        print("numpy is not installed: NumpyCatalog is skipped")
+    for size in args.sizes:
+        run(size, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Load test for PromptServer: N concurrent clients each answer a few prompts
+over a Unix socket (or TCP with --tcp) and the script reports prompts/s
+and latency percentiles, measured from "prompt seen" to "next prompt seen".
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from receptus import PromptServer
+
+OPTIONS = {f"opt{i}": f"Option {i}" for i in range(50)}
+
+
+def handler(session):
+    for _ in range(ROUNDS):
+        session.get_input(prompt="Pick:", options=OPTIONS, page_size=5)
+    session.out("done")
+
+
+async def client(connect, rounds, latencies):
+    reader, writer = await connect()
+    await reader.readuntil(b": ")
+    for i in range(rounds):
+        started = time.perf_counter()
+        writer.write(f"opt{i % len(OPTIONS)}\n".encode())
+        await writer.drain()
+        if i + 1 < rounds:
+            await reader.readuntil(b": ")
+        else:
+            await reader.readuntil(b"done")
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+
+
+async def main(clients, tcp):
+    server = PromptServer(handler, max_sessions=clients)
+    if tcp:
+        await server.start_tcp()
+        host, port = server.address[:2]
+        connect = lambda: asyncio.open_connection(host, port)  # noqa: E731
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "receptus.sock")
+        await server.start_unix(path)
+        connect = lambda: asyncio.open_unix_connection(path)  # noqa: E731
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(connect, ROUNDS, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    await server.close()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000  # noqa: E731
+    print(f"{clients} clients x {ROUNDS} prompts in {elapsed:.2f}s "
+          f"-> {len(latencies) / elapsed:,.0f} prompts/s")
+    print(f"latency ms: p50={pct(0.50):.2f} p95={pct(0.95):.2f} p99={pct(0.99):.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--tcp", action="store_true")
+    args = parser.parse_args()
+    ROUNDS = args.rounds
+    asyncio.run(main(args.clients, args.tcp))
@@ -1,4 +1,41 @@
-from .receptus import Receptus, UserQuit, ReceptusTimeout
+from .receptus import Receptus, UserQuit, UserBack, Cancelled, ReceptusTimeout
+from .prompt import IndexCache, Prompt
+from .cancel import CancelToken
+from .backends import ReceptusCancelled, InputBackend, OutputBackend, ConsoleInput, StreamInput, QueueInput, StreamOutput, FdOutput, MemoryOutput, NullOutput
+from .catalog import OptionCatalog
+from .deadline import Deadline
+from .metrics import MetricsRegistry
+from .sinks import JsonlEventSink
+from .profiling import PromptProfiler
+from .layout import FrameCache
+from .lazy import LazyLabel
+from .memo import Memoized, memoize
+from .tree import OptionGroup, OptionTree
+from .mapped import MappedCatalog
+from .matching import Matcher, OptionIndex
+from .metadata import MetaIndex
+from .parallel import ParallelFuzzyScorer
+from .session import PromptServer, PromptSession
+from .broker import PromptBroker
+from .replay import Recorder, ReplayMismatch
+from .forms import Form, Field, FormError
+from .validation import ValidationSpec, validate_records
 
-__all__ = ["Receptus", "UserQuit", "ReceptusTimeout"]
-__version__ = "0.1.4"
\ No newline at end of file
+__all__ = ["Receptus", "Prompt", "IndexCache", "UserQuit", "UserBack", "Cancelled", "ReceptusTimeout", "Deadline",
+           "CancelToken", "ReceptusCancelled", "MetricsRegistry", "JsonlEventSink",
+           "PromptProfiler", "FrameCache", "LazyLabel", "Memoized", "memoize",
+           "InputBackend", "OutputBackend", "ConsoleInput", "StreamInput", "QueueInput",
+           "StreamOutput", "FdOutput", "MemoryOutput", "NullOutput",
+           "OptionCatalog", "MappedCatalog", "Matcher", "OptionIndex", "MetaIndex",
+           "ParallelFuzzyScorer", "PromptServer", "PromptSession", "PromptBroker", "Recorder", "ReplayMismatch",
+           "Form", "Field", "FormError", "ValidationSpec", "validate_records",
+           "OptionGroup", "OptionTree", "NumpyCatalog"]
+__version__ = "0.1.4"
+
+
+def __getattr__(name):
+    # NumpyCatalog is imported on first use, so ``import receptus`` does not load numpy.
+    if name == "NumpyCatalog":
+        from .numpy_backend import NumpyCatalog
+        return NumpyCatalog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
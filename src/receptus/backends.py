@@ -0,0 +1,489 @@
+##
+## Receptus - input/output backends
+##
+## ``Receptus`` reads every line through an ``InputBackend`` and writes every
+## frame through an ``OutputBackend``. The defaults reproduce the classic
+## console behaviour (``input()``/``getpass`` and a text stream), while the
+## other implementations cover raw file descriptors, in-memory queues for
+## tests and embedding, and a null sink for headless runs.
+##
+
+
+import concurrent.futures
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from typing import IO, Iterable, List, Optional
+
+
+class ReceptusTimeout(Exception):
+    """Raised when user input times out."""
+    pass
+
+class ReceptusCancelled(Exception):
+    """Raised when a read is aborted through its CancelToken."""
+    pass
+
+
+def _wait_for(future: concurrent.futures.Future, timeout: Optional[float], token=None):
+    """
+    Wait for a helper-thread read. Raises ReceptusCancelled as soon as the
+    token fires and ReceptusTimeout once ``timeout`` has passed; in both
+    cases the read is left pending for the next call.
+    """
+    if token is None:
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise ReceptusTimeout
+    woken = threading.Event()
+    token.add_callback(woken.set)
+    future.add_done_callback(lambda _: woken.set())
+    try:
+        woken.wait(timeout)
+    finally:
+        token.remove_callback(woken.set)
+    if token.cancelled:
+        raise ReceptusCancelled
+    if not future.done():
+        raise ReceptusTimeout
+    return future.result()
+
+
+class InputBackend:
+    """
+    Source of user input. ``readline`` returns one line without its newline
+    and raises ``EOFError`` when the input is exhausted.
+    """
+
+    def readline(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def read_secret(self, prompt: str) -> str:
+        """Read a line without echo; backends that cannot mask just read it."""
+        return self.readline(prompt)
+
+    def readline_timeout(self, prompt: str, timeout: float) -> str:
+        """Read a line, raising ``ReceptusTimeout`` after ``timeout`` seconds."""
+        raise NotImplementedError
+
+    def read_secret_timeout(self, prompt: str, timeout: float) -> str:
+        """
+        ``read_secret`` raising ``ReceptusTimeout`` after ``timeout`` seconds.
+        Raises NotImplementedError when the backend cannot time a masked read.
+        """
+        return self.readline_timeout(prompt, timeout)
+
+    def readline_cancellable(self, prompt: str, timeout: Optional[float], token) -> str:
+        """
+        Read a line that ``token`` can interrupt, raising ``ReceptusCancelled``.
+        This default only checks the token before reading; backends override
+        it to wake up mid-read.
+        """
+        if token.cancelled:
+            raise ReceptusCancelled
+        return self.readline(prompt) if timeout is None else self.readline_timeout(prompt, timeout)
+
+    def readline_module(self):
+        """The ``readline``-compatible module for history and completion, or None."""
+        return None
+
+
+class OutputBackend:
+    """Sink for rendered text."""
+
+    def write(self, text: str) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _flush_tty_input() -> None:
+    """Drop half-typed terminal input for a prompt that was cancelled."""
+    try:
+        import termios
+        termios.tcflush(sys.stdin.fileno(), termios.TCIFLUSH)
+    except Exception:
+        pass
+
+
+class ConsoleInput(InputBackend):
+    """
+    The interactive console: ``input()``, ``getpass`` and the ``readline``
+    module. ``input`` is looked up on every call, so patching it still works.
+
+    Timed reads use SIGALRM on the main thread. Signals cannot be used from
+    other threads, so there the read runs on a helper thread instead, and a
+    line typed after the timeout is returned by the next read.
+
+    Cancellable reads on the main thread (POSIX) are ordinary ``input()``
+    calls that the token interrupts with SIGALRM, so readline editing,
+    completion and history keep working. Other threads cannot take signals:
+    on a terminal they wait in ``select()`` on stdin and a wake-up pipe the
+    token writes to, reading the line without readline, and write the
+    prompt to ``prompt_output`` (Receptus passes its output backend).
+    """
+
+    def __init__(self, prompt_output: Optional[OutputBackend] = None):
+        self.prompt_output = prompt_output
+        self._reader: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: Optional[concurrent.futures.Future] = None
+        self._wake_pipe: Optional[tuple] = None
+
+    def readline(self, prompt):
+        if self._pending is not None:
+            future, self._pending = self._pending, None
+            return future.result()
+        return input(prompt)
+
+    def read_secret(self, prompt):
+        from getpass import getpass
+        return getpass(prompt)
+
+    def read_secret_timeout(self, prompt, timeout):
+        """An echo-off ``select()`` read of stdin; POSIX terminals only."""
+        if os.name == "nt" or sys.stdin is None or not sys.stdin.isatty():
+            raise NotImplementedError("timed masked input needs a POSIX terminal")
+        import termios
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        quiet = termios.tcgetattr(fd)
+        quiet[3] &= ~termios.ECHO
+        out = self._prompt_out(prompt)
+        termios.tcsetattr(fd, termios.TCSADRAIN, quiet)
+        try:
+            return self._tty_line(fd, timeout)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            out.write("\n")  # the Enter that ended the line was not echoed
+            out.flush()
+
+    def readline_timeout(self, prompt, timeout):
+        """
+        Wait for input with a timeout, using inputimeout (Windows) or signal (UNIX).
+        """
+        import platform
+        if threading.current_thread() is not threading.main_thread():
+            return self._readline_on_helper(prompt, timeout)
+        if platform.system() != "Windows":
+            import signal
+            def handler(signum, frame):
+                raise ReceptusTimeout
+            signal.signal(signal.SIGALRM, handler)
+            if hasattr(signal, "setitimer"):
+                # Sub-second precision for deadline budgets; alarm(0) below clears it too.
+                signal.setitimer(signal.ITIMER_REAL, max(timeout, 0.001))
+            else:
+                signal.alarm(max(1, math.ceil(timeout)))
+            try:
+                result = self.readline(prompt)
+                signal.alarm(0)
+                return result
+            except ReceptusTimeout:
+                signal.alarm(0)
+                raise
+        else:
+            try:
+                from inputimeout import inputimeout, TimeoutOccurred
+                try:
+                    return inputimeout(prompt, timeout=timeout)
+                except TimeoutOccurred:
+                    raise ReceptusTimeout
+            except ImportError:
+                # No timeout support on Windows without the inputimeout module.
+                return self.readline(prompt)
+
+    def _readline_on_helper(self, prompt, timeout, token=None):
+        if self._pending is None:
+            if self._reader is None:
+                self._reader = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                                     thread_name_prefix="receptus-input")
+            self._pending = self._reader.submit(input, prompt)
+        line = _wait_for(self._pending, timeout, token)
+        self._pending = None
+        return line
+
+    def readline_cancellable(self, prompt, timeout, token):
+        if token.cancelled:
+            raise ReceptusCancelled
+        if self._pending is None and os.name != "nt":
+            if threading.current_thread() is threading.main_thread():
+                return self._signal_readline(prompt, timeout, token)
+            if sys.stdin is not None and sys.stdin.isatty():
+                return self._select_readline(prompt, timeout, token)
+        return self._readline_on_helper(prompt, timeout, token)
+
+    def _signal_readline(self, prompt, timeout, token):
+        import signal
+        main = threading.main_thread().ident
+        active = True
+
+        def handler(signum, frame):
+            # A late wake-up (after the read finished) must not raise.
+            if active:
+                raise ReceptusCancelled if token.cancelled else ReceptusTimeout
+
+        def wake():
+            signal.pthread_kill(main, signal.SIGALRM)
+
+        signal.signal(signal.SIGALRM, handler)
+        token.add_callback(wake)
+        try:
+            if timeout is not None:
+                signal.setitimer(signal.ITIMER_REAL, max(timeout, 0.001))
+            return self.readline(prompt)
+        except ReceptusCancelled:
+            _flush_tty_input()
+            raise
+        finally:
+            active = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            token.remove_callback(wake)
+
+    def _wake_fds(self):
+        if self._wake_pipe is None:
+            r, w = os.pipe()
+            os.set_blocking(r, False)
+            os.set_blocking(w, False)
+            self._wake_pipe = (r, w)
+        r, w = self._wake_pipe
+        try:
+            while os.read(r, 64):
+                pass  # drop wake-ups left over from earlier reads
+        except BlockingIOError:
+            pass
+        return r, w
+
+    def _prompt_out(self, prompt):
+        out = self.prompt_output if self.prompt_output is not None else sys.stdout
+        out.write(prompt)
+        out.flush()
+        return out
+
+    def _select_readline(self, prompt, timeout, token):
+        wake_r, wake_w = self._wake_fds()
+
+        def wake():
+            try:
+                os.write(wake_w, b"\0")
+            except OSError:
+                pass
+
+        self._prompt_out(prompt)
+        token.add_callback(wake)
+        try:
+            return self._tty_line(sys.stdin.fileno(), timeout, token, wake_r)
+        finally:
+            token.remove_callback(wake)
+
+    @staticmethod
+    def _tty_line(fd, timeout, token=None, wake_r=None):
+        """Read one line from a terminal fd with ``select()``, honouring ``timeout`` and ``token``."""
+        import select
+        watched = [fd] if wake_r is None else [fd, wake_r]
+        expires = None if timeout is None else time.monotonic() + timeout
+        line = bytearray()
+        while True:
+            wait = None if expires is None else expires - time.monotonic()
+            if wait is not None and wait <= 0:
+                raise ReceptusTimeout
+            ready, _, _ = select.select(watched, [], [], wait)
+            if token is not None and token.cancelled:
+                _flush_tty_input()
+                raise ReceptusCancelled
+            if fd in ready:
+                # The terminal is in canonical mode, so a readable fd means a
+                # whole line is waiting; read it byte by byte to never over-read.
+                ch = os.read(fd, 1)
+                if not ch:
+                    if line:
+                        break
+                    raise EOFError
+                if ch == b"\n":
+                    break
+                line += ch
+        return line.decode(sys.stdin.encoding or "utf-8", "replace").rstrip("\r")
+
+    def readline_module(self):
+        try:
+            import readline
+        except ImportError:
+            return None  # readline not available
+        return readline
+
+
+class StreamInput(InputBackend):
+    """
+    Lines from any text stream (a pipe, a file, a socket file). Prompts are
+    written to ``echo`` when given. Timed reads run on a helper thread; a
+    read that times out is kept and consumed by the next call, so no input
+    is lost.
+    """
+
+    def __init__(self, stream: IO[str], echo: Optional[IO[str]] = None):
+        self.stream = stream
+        self.echo = echo
+        self._reader: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: Optional[concurrent.futures.Future] = None
+
+    def _prompt(self, prompt):
+        if self.echo is not None and prompt:
+            self.echo.write(prompt)
+            self.echo.flush()
+
+    @staticmethod
+    def _line(line: str) -> str:
+        if not line:
+            raise EOFError
+        return line.rstrip("\r\n")
+
+    def readline(self, prompt):
+        self._prompt(prompt)
+        if self._pending is not None:
+            future, self._pending = self._pending, None
+            return self._line(future.result())
+        return self._line(self.stream.readline())
+
+    def readline_timeout(self, prompt, timeout):
+        return self._read_pending(prompt, timeout, None)
+
+    def readline_cancellable(self, prompt, timeout, token):
+        if token.cancelled:
+            raise ReceptusCancelled
+        return self._read_pending(prompt, timeout, token)
+
+    def _read_pending(self, prompt, timeout, token):
+        self._prompt(prompt)
+        if self._pending is None:
+            if self._reader is None:
+                self._reader = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                                     thread_name_prefix="receptus-input")
+            self._pending = self._reader.submit(self.stream.readline)
+        line = _wait_for(self._pending, timeout, token)
+        self._pending = None
+        return self._line(line)
+
+
+class QueueInput(InputBackend):
+    """
+    Lines from an in-memory queue, for tests and for embedding Receptus in
+    another program. ``feed()`` adds lines and ``close()`` signals EOF. When
+    ``blocking`` is False, an empty queue reads as EOF instead of waiting.
+    Every prompt shown is recorded in ``prompts``.
+    """
+
+    _EOF = object()
+    _WAKE = object()  # put by a cancelled token to wake a blocked get()
+
+    def __init__(self, lines: Iterable[str] = (), *, blocking: bool = False):
+        self.queue: "queue.Queue" = queue.Queue()
+        self.blocking = blocking
+        self.prompts: List[str] = []
+        self.feed(*lines)
+
+    def feed(self, *lines: str) -> None:
+        for line in lines:
+            self.queue.put(line)
+
+    def close(self) -> None:
+        self.queue.put(self._EOF)
+
+    def _get(self, prompt, timeout, token=None):
+        self.prompts.append(prompt)
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if token is not None and token.cancelled:
+                raise ReceptusCancelled
+            wait = None if expires is None else max(0.0, expires - time.monotonic())
+            try:
+                line = self.queue.get(block=self.blocking or timeout is not None, timeout=wait)
+            except queue.Empty:
+                if timeout is not None:
+                    raise ReceptusTimeout
+                raise EOFError
+            if line is self._WAKE:
+                continue
+            if line is self._EOF:
+                self.queue.put(line)  # stay at EOF for later reads
+                raise EOFError
+            return line
+
+    def readline(self, prompt):
+        return self._get(prompt, None)
+
+    def readline_timeout(self, prompt, timeout):
+        return self._get(prompt, timeout)
+
+    def readline_cancellable(self, prompt, timeout, token):
+        wake = lambda: self.queue.put(self._WAKE)  # noqa: E731
+        token.add_callback(wake)
+        try:
+            return self._get(prompt, timeout, token)
+        finally:
+            token.remove_callback(wake)
+
+
+class StreamOutput(OutputBackend):
+    """Buffered text stream output (``sys.stdout`` by default)."""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream or sys.stdout
+
+    def write(self, text):
+        self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self):
+        isatty = getattr(self.stream, "isatty", None)
+        return bool(isatty and isatty())
+
+
+class FdOutput(OutputBackend):
+    """
+    Raw file descriptor output. Each frame is encoded once and handed to
+    ``os.write`` directly, bypassing the text I/O layer.
+    """
+
+    def __init__(self, fd: int, encoding: str = "utf-8"):
+        self.fd = fd
+        self.encoding = encoding
+
+    def write(self, text):
+        data = memoryview(text.encode(self.encoding, "replace"))
+        while data:
+            data = data[os.write(self.fd, data):]
+
+    def isatty(self):
+        return os.isatty(self.fd)
+
+
+class MemoryOutput(OutputBackend):
+    """Collects output in memory; ``getvalue()`` returns everything written so far."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+
+    def write(self, text):
+        self.chunks.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.chunks)
+
+    def clear(self) -> None:
+        self.chunks.clear()
+
+
+class NullOutput(OutputBackend):
+    """Discards all output, for headless runs."""
+
+    def write(self, text):
+        pass
@@ -0,0 +1,124 @@
+##
+## Receptus - prompt broker
+##
+## Worker threads must not call ``get_input`` concurrently: their output
+## interleaves, they overwrite each other's readline completer, and SIGALRM
+## timeouts only work on one thread. ``PromptBroker`` gives the terminal to
+## a single owner thread. Workers submit prompt requests and get futures
+## back; the owner serves the requests one at a time, highest priority
+## first, then in submission order.
+##
+## Each request may carry a ``Deadline`` that starts counting at submission,
+## so time spent waiting in the queue is part of its budget. A request can
+## be cancelled until the owner starts serving it.
+##
+
+
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional, Union
+
+from .deadline import Deadline
+from .receptus import Receptus
+
+
+class _Request:
+    __slots__ = ("future", "kwargs", "deadline")
+
+    def __init__(self, kwargs, deadline):
+        self.future: Future = Future()
+        self.kwargs = kwargs
+        self.deadline = deadline
+
+
+class PromptBroker:
+    """
+    Serialize prompts from many threads onto one terminal.
+
+    ``start()`` (called by default) serves requests on a background thread;
+    call ``serve()`` yourself instead to own the terminal from the current
+    thread, e.g. the main thread so SIGALRM timeouts are available.
+    """
+
+    def __init__(self, receptus: Optional[Receptus] = None, *, start: bool = True):
+        self.receptus = receptus or Receptus()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self.start()
+
+    def submit(self, prompt: Optional[str] = None, *, priority: int = 0,
+               deadline: Optional[Union[Deadline, float]] = None, **kwargs) -> Future:
+        """
+        Queue a ``get_input(prompt, **kwargs)`` call and return its future.
+        Higher ``priority`` requests are served first.
+        """
+        request = _Request(dict(kwargs, prompt=prompt), Deadline.coerce(deadline))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PromptBroker is closed")
+            self._queue.put((-priority, next(self._order), request))
+        return request.future
+
+    def ask(self, prompt: Optional[str] = None, **kwargs) -> Any:
+        """Submit a prompt and block until it has been answered."""
+        return self.submit(prompt, **kwargs).result()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def serve(self) -> None:
+        """Serve requests on the calling thread until ``close()``."""
+        while True:
+            _, _, request = self._queue.get()
+            if request is None:
+                return
+            if not request.future.set_running_or_notify_cancel():
+                continue  # cancelled while queued
+            try:
+                result = self.receptus.get_input(deadline=request.deadline, **request.kwargs)
+            except Exception as e:
+                request.future.set_exception(e)
+            except BaseException as e:
+                # KeyboardInterrupt/SystemExit: the requester sees it, and serving stops.
+                request.future.set_exception(e)
+                raise
+            else:
+                request.future.set_result(result)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve, name="receptus-broker", daemon=True)
+            self._thread.start()
+
+    def close(self, cancel_pending: bool = True, wait: bool = True) -> None:
+        """
+        Stop accepting requests. Queued requests are cancelled, or with
+        ``cancel_pending=False`` answered first; a prompt already on screen
+        always finishes.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if cancel_pending:
+                while True:
+                    try:
+                        _, _, request = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    request.future.cancel()
+            self._queue.put((float("inf"), next(self._order), None))
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(cancel_pending=exc[0] is not None)
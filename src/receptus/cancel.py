@@ -0,0 +1,55 @@
+##
+## Receptus - cancellation tokens
+##
+## A ``CancelToken`` lets another thread (or an asyncio task) abort a prompt
+## that is blocked waiting for input. Input backends register a wake-up
+## callback on the token for the duration of a read, so a cancelled read
+## returns immediately instead of at the next polling interval.
+##
+
+
+import threading
+from typing import Callable, List, Optional
+
+
+class CancelToken:
+    """Thread-safe, one-shot cancellation flag with wake-up callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: Optional[str] = None) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on cancellation, or right away if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def __repr__(self):
+        return f"<CancelToken {'cancelled' if self.cancelled else 'active'}>"
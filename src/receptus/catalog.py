@@ -0,0 +1,378 @@
+##
+## Receptus - compact option catalogs
+##
+## A plain ``{key: label}`` dict is fine for a handful of options, but
+## ``get_input`` derives several more dicts from it on every attempt
+## (folded lookup, hotkeys, enabled flags). For very large option sets
+## that bookkeeping dominates memory. ``OptionCatalog`` stores everything
+## once, in parallel arrays, and exposes read-only views that the prompt
+## loop can use in place of those per-attempt dicts.
+##
+## ``BaseCatalog`` holds the parts shared with other storage backends
+## (see ``receptus.mapped.MappedCatalog``): the Mapping protocol, the views
+## and paged iteration, all expressed in terms of positional accessors.
+##
+
+
+import difflib
+from abc import abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, ItemsView, ValuesView
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .normalize import fold
+
+
+def _lower_key(key: Any, accents: bool = False) -> str:
+    """
+    Folded lookup form of a key (see ``receptus.normalize.fold``). Returns
+    the key object itself when it is already folded, so the common case
+    costs no extra storage.
+    """
+    skey = key if isinstance(key, str) else str(key)
+    low = fold(skey, accents)
+    return skey if low == skey else low
+
+
+class BaseCatalog(Mapping):
+    """
+    Read-only option set addressed by position.
+
+    Subclasses provide ``__len__``, ``key_at``, ``label_at``, ``find``,
+    ``index_of``, ``iter_lower``, ``complete``, ``distinct_count``,
+    ``hotkeys`` and an ``_enabled`` bitmap (one bit per position); this class
+    derives the Mapping protocol and the views ``get_input`` consumes.
+    """
+
+    __slots__ = ()
+
+    # Whether keys are also accent-folded; input must be folded the same way.
+    fold_accents: bool = False
+    # Provided by subclasses (as slots): the enabled bitmap and a counter
+    # bumped on every change, for caches keyed on the catalog.
+    _enabled: Union[bytearray, memoryview]
+    version: int
+
+    # -- Storage interface ------------------------------------------------
+
+    @abstractmethod
+    def key_at(self, idx: int) -> Any: ...
+
+    @abstractmethod
+    def label_at(self, idx: int) -> Any: ...
+
+    @abstractmethod
+    def find(self, lower: str) -> int:
+        """Return the position of an already-folded input, or -1."""
+
+    @abstractmethod
+    def index_of(self, key: Any) -> int:
+        """Return the position of ``key``, or -1 if it is not in the catalog."""
+
+    @abstractmethod
+    def iter_lower(self) -> Iterator[str]:
+        """Yield each distinct folded key once, in sorted order."""
+
+    @abstractmethod
+    def complete(self, prefix: str) -> List[str]:
+        """Return distinct folded keys starting with ``prefix``, in sorted order."""
+
+    @property
+    @abstractmethod
+    def distinct_count(self) -> int: ...
+
+    @property
+    @abstractmethod
+    def hotkeys(self) -> Dict[str, Any]:
+        """Single-character keys by folded form."""
+
+    # -- Mapping protocol -------------------------------------------------
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self.key_at(i) for i in range(len(self)))
+
+    def __contains__(self, key: Any) -> bool:
+        return self.index_of(key) >= 0
+
+    def __getitem__(self, key: Any) -> Any:
+        idx = self.index_of(key)
+        if idx < 0:
+            raise KeyError(key)
+        return self.label_at(idx)
+
+    def items(self):
+        return _CatalogItems(self)
+
+    def values(self):
+        return _CatalogValues(self)
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        return ((self.key_at(i), self.label_at(i)) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {len(self)} options>"
+
+    # -- Positional access ------------------------------------------------
+
+    def lower_at(self, idx: int) -> str:
+        return _lower_key(self.key_at(idx), self.fold_accents)
+
+    def is_enabled_at(self, idx: int) -> bool:
+        return bool(self._enabled[idx >> 3] & (1 << (idx & 7)))
+
+    def set_enabled(self, key: Any, enabled: bool = True) -> None:
+        """Enable or disable a single option. Raises KeyError for unknown keys."""
+        idx = self.index_of(key)
+        if idx < 0:
+            raise KeyError(key)
+        if enabled:
+            self._enabled[idx >> 3] |= (1 << (idx & 7))
+        else:
+            self._enabled[idx >> 3] &= ~(1 << (idx & 7)) & 0xFF
+        self.version += 1
+
+    def iter_entries(self, enabled: Optional[Mapping] = None, start: int = 0,
+                     stop: Optional[int] = None) -> Iterator[Tuple[Any, Any, bool]]:
+        """
+        Yield ``(key, label, enabled)`` for positions ``start`` to ``stop``.
+        ``enabled`` may be one of this catalog's enabled views or any
+        ``key -> bool`` mapping.
+        """
+        items = islice(self.iter_items(), start, stop)
+        if enabled is None:
+            bitmap = self._enabled
+        elif isinstance(enabled, _EnabledView) and enabled._catalog is self:
+            bitmap = enabled._bitmap
+        else:
+            for key, label in items:
+                yield key, label, enabled.get(key, True)
+            return
+        for idx, (key, label) in enumerate(items, start):
+            yield key, label, bool(bitmap[idx >> 3] & (1 << (idx & 7)))
+
+    # -- Views used by get_input -----------------------------------------
+
+    @property
+    def processed_keys(self) -> "_LowerKeyView":
+        """Read-only ``folded -> key`` mapping, equivalent to the per-attempt dict in ``get_input``."""
+        return _LowerKeyView(self)
+
+    @property
+    def enabled(self) -> "_EnabledView":
+        """Read-only ``key -> bool`` view over the catalog's own enabled bitmap."""
+        return _EnabledView(self, self._enabled)
+
+    def enabled_with(self, is_enabled: Callable[[Any, Any], bool]) -> "_EnabledView":
+        """
+        Evaluate a dynamic ``is_enabled(key, label)`` predicate into a fresh
+        bitmap, combined with the catalog's own enabled flags.
+        """
+        bitmap = bytearray(len(self._enabled))
+        for idx, (key, label) in enumerate(self.iter_items()):
+            if self.is_enabled_at(idx) and is_enabled(key, label):
+                bitmap[idx >> 3] |= (1 << (idx & 7))
+        return _EnabledView(self, bitmap)
+
+    def mask_key(self, enabled: Optional[Mapping] = None) -> Any:
+        """
+        Hashable snapshot of an enabled mapping, for caches that also key on
+        ``version``: None for the catalog's own flags, the bitmap bytes for
+        a view from ``enabled_with``.
+        """
+        if enabled is None or (isinstance(enabled, _EnabledView) and enabled._bitmap is self._enabled):
+            return None
+        if isinstance(enabled, _EnabledView) and enabled._catalog is self:
+            return bytes(enabled._bitmap)
+        return tuple(enabled.get(key, True) for key in self)
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.75) -> List[str]:
+        """Fuzzy suggestions over the folded keys (same contract as ``difflib.get_close_matches``)."""
+        return difflib.get_close_matches(word, self.iter_lower(), n=n, cutoff=cutoff)
+
+
+class OptionCatalog(BaseCatalog):
+    """
+    Compact, array-backed option set usable anywhere ``get_input`` accepts options.
+
+    Keys and labels are held once in parallel lists, enabled flags in a bitmap
+    (one bit per option), and lookups go through a sorted list of folded
+    keys paired with an ``array('I')`` of positions, which also serves prefix
+    completion. The catalog behaves as a read-only ``Mapping`` of key to label,
+    in insertion order. With ``fold_accents``, "Café" is found by "cafe".
+    """
+
+    __slots__ = ("_keys", "_labels", "_enabled", "_sorted_lower", "_sorted_idx",
+                 "_unique", "_hotkeys", "fold_accents", "version", "__weakref__")
+
+    def __init__(self, options: Optional[Any] = None, *, disabled_keys: Optional[Iterable[Any]] = None,
+                 fold_accents: bool = False):
+        self.fold_accents = fold_accents
+        if options is None:
+            pairs: Iterable[Tuple[Any, Any]] = ()
+        elif isinstance(options, Mapping):
+            pairs = options.items()
+        else:
+            pairs = options
+
+        keys: List[Any] = []
+        labels: List[Any] = []
+        lower: List[str] = []
+        hotkeys: Dict[str, Any] = {}
+        for key, label in pairs:
+            low = _lower_key(key, fold_accents)
+            keys.append(key)
+            labels.append(label)
+            lower.append(low)
+            if isinstance(key, str) and len(key) == 1:
+                hotkeys[low] = key
+
+        # Stable sort: among keys sharing a folded form, the last one added
+        # sorts last, which is the one the plain dict path resolves to.
+        order = sorted(range(len(keys)), key=lower.__getitem__)
+        self._sorted_lower = [lower[i] for i in order]
+        self._sorted_idx = array("I", order)
+        del lower, order
+
+        self._keys = keys
+        self._labels = labels
+        self._hotkeys = hotkeys
+        self._unique = sum(1 for _ in self.iter_lower())
+        self._enabled = bytearray(b"\xff" * ((len(keys) + 7) // 8))
+        self.version = 0
+
+        for key in disabled_keys or ():
+            self.set_enabled(key, False)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[Any, Any]], **kwargs) -> "OptionCatalog":
+        """Build a catalog from an iterable of ``(key, label)`` pairs without an intermediate dict."""
+        return cls(pairs, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        return zip(self._keys, self._labels)
+
+    @property
+    def distinct_count(self) -> int:
+        return self._unique
+
+    def index_of(self, key: Any) -> int:
+        """Return the position of ``key``, or -1 if it is not in the catalog."""
+        low = _lower_key(key, self.fold_accents)
+        ordered = self._sorted_lower
+        for pos in range(bisect_left(ordered, low), bisect_right(ordered, low)):
+            idx = self._sorted_idx[pos]
+            if self._keys[idx] == key:
+                return idx
+        return -1
+
+    def find(self, lower: str) -> int:
+        """Return the position of an already-folded input, or -1."""
+        pos = bisect_right(self._sorted_lower, lower) - 1
+        if pos >= 0 and self._sorted_lower[pos] == lower:
+            return self._sorted_idx[pos]
+        return -1
+
+    def key_at(self, idx: int) -> Any:
+        return self._keys[idx]
+
+    def label_at(self, idx: int) -> Any:
+        return self._labels[idx]
+
+    def iter_lower(self) -> Iterator[str]:
+        """Yield each distinct folded key once, in sorted order."""
+        prev = None
+        for low in self._sorted_lower:
+            if low != prev:
+                yield low
+                prev = low
+
+    @property
+    def hotkeys(self) -> Dict[str, Any]:
+        """Single-character keys by folded form."""
+        return self._hotkeys
+
+    def complete(self, prefix: str) -> List[str]:
+        """Return distinct folded keys starting with ``prefix``, in sorted order."""
+        ordered = self._sorted_lower
+        matches: List[str] = []
+        for i in range(bisect_left(ordered, prefix), len(ordered)):
+            low = ordered[i]
+            if not low.startswith(prefix):
+                break
+            if not matches or matches[-1] != low:
+                matches.append(low)
+        return matches
+
+
+class _LowerKeyView(Mapping):
+    __slots__ = ("_catalog",)
+
+    def __init__(self, catalog: BaseCatalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return self._catalog.distinct_count
+
+    def __iter__(self):
+        return self._catalog.iter_lower()
+
+    def __contains__(self, lower):
+        return isinstance(lower, str) and self._catalog.find(lower) >= 0
+
+    def __getitem__(self, lower):
+        idx = self._catalog.find(lower) if isinstance(lower, str) else -1
+        if idx < 0:
+            raise KeyError(lower)
+        return self._catalog.key_at(idx)
+
+    def get_many(self, lowers: Sequence[str], default: Any = None) -> List[Any]:
+        """Keys for many folded inputs (``default`` where absent); one batch lookup with ``find_many``."""
+        catalog = self._catalog
+        find_many = getattr(catalog, "find_many", None)  # NumpyCatalog: a single searchsorted
+        positions = find_many(lowers).tolist() if find_many is not None else [catalog.find(low) for low in lowers]
+        return [catalog.key_at(idx) if idx >= 0 else default for idx in positions]
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.75) -> List[str]:
+        return self._catalog.close_matches(word, n=n, cutoff=cutoff)
+
+
+class _EnabledView(Mapping):
+    __slots__ = ("_catalog", "_bitmap")
+
+    def __init__(self, catalog: BaseCatalog, bitmap):
+        self._catalog = catalog
+        self._bitmap = bitmap
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def __iter__(self):
+        return iter(self._catalog)
+
+    def __getitem__(self, key):
+        idx = self._catalog.index_of(key)
+        if idx < 0:
+            raise KeyError(key)
+        return bool(self._bitmap[idx >> 3] & (1 << (idx & 7)))
+
+
+class _CatalogItems(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _CatalogValues(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return (label for _, label in self._mapping.iter_items())
@@ -0,0 +1,52 @@
+##
+## Receptus - deadline budgets
+##
+## A ``Deadline`` is a fixed point on the monotonic clock. Every read made
+## while it is active (main prompt, retries after help or invalid input,
+## confirmations) is capped by the time remaining, so a whole prompt
+## sequence has a hard upper bound no matter how many reads it takes.
+##
+
+
+import time
+from typing import Callable, Optional, Union
+
+
+class Deadline:
+    """
+    Time budget of ``seconds`` from now, measured on ``clock``
+    (``time.monotonic`` by default).
+    """
+
+    __slots__ = ("expires_at", "clock")
+
+    def __init__(self, seconds: float, *, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        return self.clock() >= self.expires_at
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """The shorter of ``timeout`` and the time remaining."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @classmethod
+    def coerce(cls, value: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """Accept a Deadline, a number of seconds (starting now) or None."""
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(value)
+
+    @staticmethod
+    def earliest(*deadlines: Optional["Deadline"]) -> Optional["Deadline"]:
+        active = [d for d in deadlines if d is not None]
+        return min(active, key=lambda d: d.expires_at) if active else None
+
+    def __repr__(self):
+        return f"<Deadline {self.remaining():.3f}s remaining>"
@@ -0,0 +1,269 @@
+##
+## Receptus - declarative forms
+##
+## A ``Form`` declares its fields once and compiles them into a plan: each
+## step's ``get_input`` arguments are merged and its static options are
+## normalized up front, and every step shares one match-index cache. Running
+## the plan loads and saves the history file once for the whole form and
+## buffers each screen so it is written as a single frame. The answers come
+## back as an instance of a frozen dataclass generated from the fields.
+##
+## ``fill()`` runs the same plan non-interactively from a dict or a JSON
+## file, pushing each answer through the same option lookup, transformer
+## and validator as an interactive answer.
+##
+
+
+import json
+import os
+from dataclasses import field as dataclass_field, make_dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union, cast
+
+from .backends import InputBackend, OutputBackend, QueueInput, MemoryOutput
+from .catalog import BaseCatalog
+from .deadline import Deadline
+from .prompt import IndexCache
+from .receptus import Receptus
+
+AnswersType = Union[Mapping[str, Any], str, os.PathLike, None]
+
+
+class FormError(ValueError):
+    """Raised by ``fill()`` when an answer is missing or rejected."""
+
+    def __init__(self, field: str, value: Any, message: str):
+        super().__init__(f"{field}: {message} (got {value!r})")
+        self.field = field
+        self.value = value
+        self.message = message
+
+
+class Field:
+    """
+    One question of a form.
+
+    ``options`` and every extra keyword are passed to ``get_input``.
+    ``choices_from(answers)`` builds the options from earlier answers instead;
+    ``when(answers)`` skips the field (leaving its default) when it returns
+    False; ``default`` may also be a callable of the earlier answers.
+    ``type`` is the annotation used on the result dataclass.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            prompt: Optional[str] = None,
+            *,
+            options: Optional[Any] = None,
+            choices_from: Optional[Callable[[Mapping[str, Any]], Any]] = None,
+            when: Optional[Callable[[Mapping[str, Any]], bool]] = None,
+            default: Any = None,
+            type: Any = Any,
+            **kwargs,
+            ):
+        self.name = name
+        self.prompt = prompt if prompt is not None else name
+        self.options = options
+        self.choices_from = choices_from
+        self.when = when
+        self.default = default
+        self.type = type
+        self.kwargs = kwargs
+
+    def resolve_default(self, answers: Mapping[str, Any]) -> Any:
+        return self.default(answers) if callable(self.default) else self.default
+
+
+def _normalize_options(options):
+    if options is None or isinstance(options, BaseCatalog):
+        return options
+    return options if isinstance(options, dict) else dict(options)
+
+
+class _Step:
+    """A compiled field: ``get_input`` arguments merged and options normalized once."""
+
+    __slots__ = ("field", "kwargs", "options")
+
+    def __init__(self, field: Field, common: Mapping[str, Any]):
+        self.field = field
+        self.kwargs = {**common, **field.kwargs, "prompt": field.prompt, "history_file": None}
+        self.options = None if callable(field.options) else _normalize_options(field.options)
+
+    def arguments(self, answers: Mapping[str, Any]) -> Dict[str, Any]:
+        kwargs = dict(self.kwargs)
+        if self.field.choices_from is not None:
+            options = _normalize_options(self.field.choices_from(answers))
+        else:
+            options = self.options
+        if options is not None:
+            # Handed over as a zero-argument callable so get_input uses this very
+            # object (no per-call copy) and the shared index cache can hit.
+            kwargs["options"] = lambda: options
+        elif callable(self.field.options):
+            kwargs["options"] = self.field.options
+        default = self.field.resolve_default(answers)
+        if default is not None:
+            kwargs["default"] = default
+        return kwargs
+
+
+class _FrameBuffer(OutputBackend):
+    """Collects one screen of output and writes it as a single frame before the next read."""
+
+    def __init__(self, backend: OutputBackend):
+        self.backend = backend
+        self.chunks: List[str] = []
+
+    def write(self, text):
+        self.chunks.append(text)
+
+    def isatty(self):
+        return self.backend.isatty()
+
+    def drain(self):
+        if self.chunks:
+            self.backend.write("".join(self.chunks))
+            self.chunks.clear()
+            self.backend.flush()
+
+
+class _DrainingInput(InputBackend):
+    def __init__(self, backend: InputBackend, frame: _FrameBuffer):
+        self.backend = backend
+        self.frame = frame
+
+    def readline(self, prompt):
+        self.frame.drain()
+        return self.backend.readline(prompt)
+
+    def read_secret(self, prompt):
+        self.frame.drain()
+        return self.backend.read_secret(prompt)
+
+    def read_secret_timeout(self, prompt, timeout):
+        self.frame.drain()
+        return self.backend.read_secret_timeout(prompt, timeout)
+
+    def readline_timeout(self, prompt, timeout):
+        self.frame.drain()
+        return self.backend.readline_timeout(prompt, timeout)
+
+    def readline_cancellable(self, prompt, timeout, token):
+        self.frame.drain()
+        return self.backend.readline_cancellable(prompt, timeout, token)
+
+    def readline_module(self):
+        return self.backend.readline_module()
+
+
+def _load_answers(answers: AnswersType) -> Dict[str, Any]:
+    if answers is None:
+        return {}
+    if isinstance(answers, Mapping):
+        return dict(answers)
+    with open(answers, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _answer_line(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+
+class Form:
+    """
+    A compiled sequence of ``Field`` prompts.
+
+    Keyword arguments other than ``name``, ``history_file`` and ``deadline``
+    are defaults for every field's ``get_input`` call (e.g. ``formatter``,
+    ``matcher``, ``fuzzy_match``).
+    """
+
+    def __init__(self, *fields: Field, name: str = "FormResult", history_file: Optional[str] = None,
+                 deadline: Optional[Union[Deadline, float]] = None, **common):
+        names = [f.name for f in fields]
+        if len(set(names)) != len(names):
+            raise ValueError("field names must be unique")
+        self.fields: Sequence[Field] = fields
+        self.history_file = history_file
+        self.deadline = deadline
+        self.index_cache = IndexCache()
+        common.setdefault("index_cache", self.index_cache)
+        self.steps = [_Step(f, common) for f in fields]
+        self.result_type = make_dataclass(name, [(f.name, f.type, dataclass_field(default=None)) for f in fields],
+                                          frozen=True)
+
+    def run(self, receptus: Optional[Receptus] = None, *, answers: AnswersType = None,
+            interactive: bool = True) -> Any:
+        """
+        Ask every applicable field and return a ``result_type`` instance, or
+        ``Receptus.USER_QUIT`` if the user quits (``Receptus.CANCELLED`` if
+        the prompt is cancelled). Fields present in
+        ``answers`` are not asked; with ``interactive=False`` no field is.
+        """
+        receptus = receptus or Receptus()
+        given = _load_answers(answers)
+        deadline = Deadline.coerce(self.deadline)  # the budget starts when the form does
+        history_file = self.history_file if interactive else None
+        readline = receptus._readline_module() if history_file else None
+        if readline is not None and history_file and os.path.exists(history_file):
+            try:
+                readline.read_history_file(history_file)
+            except Exception as e:
+                receptus.out(f"## Warning: Could not load history file: {e} ##")
+
+        saved = receptus.input_backend, receptus.output_backend
+        frame = _FrameBuffer(receptus.output_backend)
+        receptus.output_backend = frame
+        receptus.input_backend = _DrainingInput(saved[0], frame)
+        values: Dict[str, Any] = {}
+        filler = None
+        try:
+            for step in self.steps:
+                f = step.field
+                if f.when is not None and not f.when(values):
+                    values[f.name] = f.resolve_default(values)
+                    continue
+                kwargs = step.arguments(values)
+                if deadline is not None:
+                    kwargs["deadline"] = deadline
+                if f.name in given or not interactive:
+                    if filler is None:
+                        filler = Receptus(output_backend=MemoryOutput(), force_ascii=receptus.force_ascii,
+                                          force_no_color=True, line_clear=False)
+                    value = self._fill_one(filler, f, kwargs, given.get(f.name))
+                else:
+                    value = receptus.get_input(**kwargs)
+                if value is Receptus.USER_QUIT or value is Receptus.CANCELLED:
+                    return value
+                values[f.name] = value
+        finally:
+            frame.drain()
+            receptus.input_backend, receptus.output_backend = saved
+            if readline is not None and history_file:
+                try:
+                    readline.write_history_file(history_file)
+                except Exception as e:
+                    receptus.out(f"## Warning: Could not save history file: {e} ##")
+        return self.result_type(**values)
+
+    def fill(self, answers: AnswersType, receptus: Optional[Receptus] = None) -> Any:
+        """Non-interactive run from a dict or JSON file; raises ``FormError`` on a bad or missing answer."""
+        return self.run(receptus, answers=answers, interactive=False)
+
+    @staticmethod
+    def _fill_one(filler: Receptus, f: Field, kwargs: Dict[str, Any], value: Any) -> Any:
+        # One queued line: a rejected answer makes get_input read again and hit EOF.
+        filler.input_backend = QueueInput([_answer_line(value)])
+        output = cast(MemoryOutput, filler.output_backend)
+        output.clear()
+        kwargs.update(confirm=False, timeout_seconds=None, mask_input=False, auto_complete=False, attempts=-1)
+        try:
+            return filler.get_input(**kwargs)
+        except EOFError:
+            errors = [line.strip(" #") for line in output.getvalue().splitlines() if "##" in line]
+            raise FormError(f.name, value, errors[-1] if errors else "invalid answer") from None
@@ -0,0 +1,181 @@
+##
+## Receptus - option layout
+##
+## Packs option labels into terminal-width columns (``get_input(columns=...)``)
+## so a large menu takes about ``len(options) / columns`` lines instead of
+## one line per option. Widths are measured in terminal cells: East Asian
+## wide and fullwidth characters count as two and combining marks as zero.
+## Measurements are cached, since the same labels are laid out again on
+## every attempt.
+##
+## The terminal size is read once per frame and, where SIGWINCH exists,
+## cached until the terminal is resized, so the next frame is laid out for
+## the new width.
+##
+## ``FrameCache`` keeps fully rendered option blocks in a bounded LRU, so a
+## menu shown again with the same options, enabled mask, formatter, output
+## mode and width is one buffer write instead of a formatter call per option.
+##
+
+
+import math
+import os
+import shutil
+import signal
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+ELLIPSIS = "..."
+
+
+@lru_cache(maxsize=4096)
+def char_width(ch: str) -> int:
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=16384)
+def display_width(text: str) -> int:
+    """Width of ``text`` in terminal cells."""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(ch) for ch in text)
+
+
+def truncate(text: str, width: int, marker: str = ELLIPSIS) -> str:
+    """Cut ``text`` to at most ``width`` cells, ending with ``marker`` when cut."""
+    if display_width(text) <= width:
+        return text
+    room = width - len(marker)
+    if room <= 0:
+        return marker[:width]
+    used = 0
+    for i, ch in enumerate(text):
+        used += char_width(ch)
+        if used > room:
+            return text[:i] + marker
+    return text
+
+
+class Grid(NamedTuple):
+    """``rows`` hold indices into ``texts`` (the possibly truncated cells), column-major."""
+    rows: List[List[int]]
+    texts: List[str]
+    col_width: int
+
+
+def pack(cells: Sequence[str], width: int, *, columns: Union[int, str, None] = "auto", gutter: int = 2,
+         max_cell_width: Optional[int] = None) -> Grid:
+    """
+    Lay ``cells`` out in columns that fit ``width`` cells: as many as fit
+    for ``columns="auto"``, or exactly ``columns`` (cells are truncated to
+    make them fit). Cells fill each column top to bottom, like ``ls``.
+    """
+    if not cells:
+        return Grid([], [], 0)
+    width = max(width, 1)
+    widest = max(display_width(c) for c in cells)
+    if max_cell_width:
+        widest = min(widest, max_cell_width)
+    if isinstance(columns, int) and columns > 0:
+        ncols = min(columns, len(cells))
+        col_width = min(widest, max(1, (width - gutter * (ncols - 1)) // ncols))
+    else:
+        col_width = min(widest, width)
+        ncols = max(1, min(len(cells), (width + gutter) // (col_width + gutter)))
+    nrows = math.ceil(len(cells) / ncols)
+    texts = [truncate(c, col_width) for c in cells]
+    rows = [list(range(r, len(cells), nrows)) for r in range(nrows)]
+    return Grid(rows, texts, col_width)
+
+
+class TerminalSize:
+    """
+    The terminal size, cached between frames and invalidated by SIGWINCH.
+    Without SIGWINCH (Windows, or before it could be installed from the main
+    thread) the size is queried on every call.
+    """
+
+    def __init__(self, fallback=(80, 24)):
+        self.fallback = fallback
+        self._size: Optional[os.terminal_size] = None
+        self._watching = False
+
+    def _watch(self) -> bool:
+        if self._watching:
+            return True
+        if not hasattr(signal, "SIGWINCH") or threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def on_resize(signum, frame):
+            self._size = None
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(signal.SIGWINCH, on_resize)
+        self._watching = True
+        return True
+
+    def get(self):
+        size = self._size
+        if size is None:
+            size = shutil.get_terminal_size(self.fallback)
+            if self._watch():
+                self._size = size
+        return size
+
+    def invalidate(self) -> None:
+        self._size = None
+
+
+terminal_size = TerminalSize()
+
+
+class FrameCache:
+    """
+    LRU of rendered option blocks, bounded by entry count and total size.
+    Each entry also holds the options object it was rendered from: keys
+    built from ``id()`` stay valid because that object cannot be freed and
+    its id reused while the entry exists.
+    """
+
+    def __init__(self, max_entries: int = 64, max_chars: int = 4_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._frames: "OrderedDict[Hashable, Tuple[Any, str]]" = OrderedDict()
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, options: Any) -> Optional[str]:
+        entry = self._frames.get(key)
+        if entry is None or entry[0] is not options:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, options: Any, frame: str) -> None:
+        if len(frame) > self.max_chars:
+            return
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.chars -= len(old[1])
+        self._frames[key] = (options, frame)
+        self.chars += len(frame)
+        while len(self._frames) > self.max_entries or self.chars > self.max_chars:
+            _, (_, evicted) = self._frames.popitem(last=False)
+            self.chars -= len(evicted)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self.chars = 0
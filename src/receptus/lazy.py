@@ -0,0 +1,90 @@
+##
+## Receptus - lazy option labels
+##
+## An option label may be a callable (or a ``LazyLabel``) instead of a string.
+## It is resolved only when it is displayed (the visible rows of a page, the
+## default line, the search results) or returned (``return_format="value"``
+## or ``"tuple"``), so a 10k-host menu whose labels carry live status makes a
+## status call per row shown, not per host.
+##
+## Resolved labels are memoized for ``ttl`` seconds. Plain callables share
+## one memo per callable (held weakly), so a label shown again in the next
+## prompt within the TTL is not recomputed. Matching and type-to-search work
+## on the keys of lazy options only: indexing their labels would resolve
+## every one of them, and the index would go stale anyway.
+##
+
+
+import time
+import weakref
+from typing import Any, Callable, Optional, Tuple
+
+DEFAULT_TTL = 30.0
+
+
+class LazyLabel:
+    """
+    A label computed by ``func()`` on first use and memoized for ``ttl``
+    seconds (None: forever). ``str()`` and formatting resolve it.
+    """
+
+    __slots__ = ("func", "ttl", "clock", "_value", "_expires", "__weakref__")
+
+    def __init__(self, func: Callable[[], Any], ttl: Optional[float] = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.func = func
+        self.ttl = ttl
+        self.clock = clock
+        self._value: Any = None
+        self._expires: Optional[float] = None  # None until first resolved
+
+    def resolve(self) -> Any:
+        now = self.clock() if self.ttl is not None else 0.0
+        expires = self._expires
+        if expires is None or (self.ttl is not None and now >= expires):
+            # Two threads may both refresh an expired label; either result is fine to keep.
+            self._value = self.func()
+            self._expires = now + self.ttl if self.ttl is not None else 0.0
+        return self._value
+
+    def invalidate(self) -> None:
+        self._expires = None
+
+    def __str__(self):
+        return str(self.resolve())
+
+    def __format__(self, spec):
+        return format(self.resolve(), spec)
+
+    def __repr__(self):
+        return f"<LazyLabel {self.func!r}>"
+
+
+# callable -> (value, expires); the memo must not reference the callable, or it would never be dropped.
+_memos: "weakref.WeakKeyDictionary[Callable, Tuple[Any, float]]" = weakref.WeakKeyDictionary()
+
+
+def is_lazy(label: Any) -> bool:
+    return isinstance(label, LazyLabel) or (callable(label) and not isinstance(label, type))
+
+
+def resolve_label(label: Any, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic) -> Any:
+    """The value to display or return for ``label``."""
+    if isinstance(label, LazyLabel):
+        return label.resolve()
+    if not is_lazy(label):
+        return label
+    now = clock()
+    try:
+        memo = _memos.get(label)
+    except TypeError:  # not weakly referenceable: no memo
+        return label()
+    if memo is None or now >= memo[1]:
+        memo = (label(), now + ttl)
+        _memos[label] = memo
+    return memo[0]
+
+
+def label_text(label: Any) -> str:
+    """Text to index or search a label by: empty for lazy labels, which are not resolved for search."""
+    return "" if is_lazy(label) else str(label)
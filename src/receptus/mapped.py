@@ -0,0 +1,404 @@
+##
+## Receptus - memory-mapped option catalogs
+##
+## ``MappedCatalog.build()`` writes an option set to a single file once;
+## ``MappedCatalog.open()`` maps it read-only, so opening costs the same for
+## ten options or ten million, nothing is copied onto the Python heap, and
+## every process that opens the same file shares one copy in the page cache.
+##
+## File layout (native byte order, every section 8-byte aligned):
+##
+##   header      magic, byte-order mark, format version, flags, option count,
+##               distinct folded key count, and a directory of
+##               (offset, length) pairs for the sections below
+##   lower_off   u64[count + 1]  offsets into lower_blob
+##   lower_blob  UTF-8 folded keys (``receptus.normalize.fold``), sorted
+##   key_off     u64[count + 1]  offsets into key_blob
+##   key_blob    UTF-8 original keys, same order
+##   label_off   u64[count + 1]  offsets into label_blob
+##   label_blob  UTF-8 labels, same order
+##   enabled     bitmap, one bit per option
+##   prefix      u64[257]  first position for each leading byte of lower_blob
+##   hotkeys     u32[]  positions of single-character keys
+##   gram_ids    u32[]  sorted 3-byte n-grams (optional fuzzy index)
+##   gram_start  u64[len(gram_ids) + 1]  offsets into gram_post
+##   gram_post   u32[]  positions containing each n-gram
+##
+
+
+import difflib
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .catalog import BaseCatalog
+from .normalize import fold
+
+
+_MAGIC = b"RCPTCAT\x00"
+_BOM = 0x0A0B0C0D
+_FORMAT_VERSION = 2  # 2: keys folded (NFKC + casefold) instead of lower()
+_FLAG_NGRAM = 1
+_FLAG_FOLD_ACCENTS = 2
+
+_SECTIONS = (
+    "lower_off", "lower_blob", "key_off", "key_blob", "label_off", "label_blob",
+    "enabled", "prefix", "hotkeys", "gram_ids", "gram_start", "gram_post",
+)
+_HEADER = struct.Struct("=8sIIIIQQ" + "QQ" * len(_SECTIONS))
+
+# Fuzzy lookups only score this many of the best n-gram candidates.
+_FUZZY_CANDIDATES = 64
+
+
+def _grams(data: bytes) -> Iterable[int]:
+    return {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)}
+
+
+def _offsets(blobs: List[bytes]) -> array:
+    offs = array("Q", [0])
+    total = 0
+    for b in blobs:
+        total += len(b)
+        offs.append(total)
+    return offs
+
+
+class MappedCatalog(BaseCatalog):
+    """
+    Read-only option catalog backed by a memory-mapped file.
+
+    Options are kept in sorted folded-key order; that is also the display
+    order. Lookups and prefix completion binary-search the mapped key blob,
+    and ``close_matches`` uses the optional n-gram index instead of comparing
+    every key. Keys and labels are always strings.
+    """
+
+    __slots__ = ("path", "_file", "_mm", "_view", "_count", "_distinct", "_flags",
+                 "_lower_off", "_key_off", "_label_off", "_lower_base", "_key_base",
+                 "_label_base", "_enabled", "_prefix", "_hotkeys", "_gram_ids",
+                 "_gram_start", "_gram_post", "fold_accents", "version", "__weakref__")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        fields = _HEADER.unpack_from(self._mm, 0)
+        magic, bom, fmt, self._flags, _, self._count, self._distinct = fields[:7]
+        self.fold_accents = bool(self._flags & _FLAG_FOLD_ACCENTS)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a Receptus catalog file")
+        if bom != _BOM or fmt != _FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: catalog was built for a different platform or format version")
+
+        directory = dict(zip(_SECTIONS, zip(fields[7::2], fields[8::2])))
+        self._view = memoryview(self._mm)
+
+        def section(name, fmt=None):
+            off, length = directory[name]
+            view = self._view[off:off + length]
+            return view.cast(fmt) if fmt else view
+
+        self._lower_off = section("lower_off", "Q")
+        self._key_off = section("key_off", "Q")
+        self._label_off = section("label_off", "Q")
+        self._lower_base = directory["lower_blob"][0]
+        self._key_base = directory["key_blob"][0]
+        self._label_base = directory["label_blob"][0]
+        self._enabled = section("enabled")
+        self._prefix = section("prefix", "Q")
+        self._gram_ids = section("gram_ids", "I")
+        self._gram_start = section("gram_start", "Q")
+        self._gram_post = section("gram_post", "I")
+        self._hotkeys = {self.lower_at(pos): self.key_at(pos) for pos in section("hotkeys", "I")}
+        self.version = 0
+
+    @classmethod
+    def open(cls, path: str) -> "MappedCatalog":
+        """Map an existing catalog file."""
+        return cls(path)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        options: Any,
+        *,
+        disabled_keys: Optional[Iterable[Any]] = None,
+        ngram_index: bool = True,
+        fold_accents: bool = False,
+    ) -> int:
+        """
+        Write ``options`` (a dict or iterable of ``(key, label)`` pairs) to a
+        catalog file at ``path`` and return the number of options written.
+        Keys and labels are stored as strings. The file is written to a
+        temporary name and renamed into place, so readers never see a
+        partial catalog.
+        """
+        pairs = options.items() if hasattr(options, "items") else options
+        entries = []
+        for key, label in pairs:
+            key = str(key)
+            entries.append((fold(key, fold_accents).encode("utf-8"), key, str(label).encode("utf-8")))
+        entries.sort(key=lambda e: e[0])
+        count = len(entries)
+
+        lowers = [e[0] for e in entries]
+        disabled = {str(k) for k in disabled_keys or ()}
+        enabled = bytearray(b"\xff" * ((count + 7) // 8))
+        prefix = array("Q", [0] * 257)
+        hotkeys = array("I")
+        grams: Dict[int, List[int]] = {}
+        distinct = 0
+        for pos, (low, key, _) in enumerate(entries):
+            if pos == 0 or low != lowers[pos - 1]:
+                distinct += 1
+            if key in disabled:
+                enabled[pos >> 3] &= ~(1 << (pos & 7)) & 0xFF
+            if len(key) == 1:
+                hotkeys.append(pos)
+            if ngram_index:
+                for gram in _grams(low):
+                    grams.setdefault(gram, []).append(pos)
+
+        # prefix[b] is the first position whose key starts with a byte >= b;
+        # empty keys sort before every bucket.
+        first = 0
+        for b in range(256):
+            while first < count and (not lowers[first] or lowers[first][0] < b):
+                first += 1
+            prefix[b] = first
+        prefix[256] = count
+
+        gram_ids = array("I", sorted(grams))
+        gram_start = array("Q", [0])
+        gram_post = array("I")
+        for gram in gram_ids:
+            gram_post.extend(grams[gram])
+            gram_start.append(len(gram_post))
+
+        keys = [e[1].encode("utf-8") for e in entries]
+        blobs = {
+            "lower_off": _offsets(lowers).tobytes(),
+            "lower_blob": b"".join(lowers),
+            "key_off": _offsets(keys).tobytes(),
+            "key_blob": b"".join(keys),
+            "label_off": _offsets([e[2] for e in entries]).tobytes(),
+            "label_blob": b"".join(e[2] for e in entries),
+            "enabled": bytes(enabled),
+            "prefix": prefix.tobytes(),
+            "hotkeys": hotkeys.tobytes(),
+            "gram_ids": gram_ids.tobytes(),
+            "gram_start": gram_start.tobytes(),
+            "gram_post": gram_post.tobytes(),
+        }
+
+        directory: List[int] = []
+        offset = _HEADER.size
+        for name in _SECTIONS:
+            offset += -offset % 8
+            directory.extend((offset, len(blobs[name])))
+            offset += len(blobs[name])
+
+        flags = (_FLAG_NGRAM if ngram_index else 0) | (_FLAG_FOLD_ACCENTS if fold_accents else 0)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _BOM, _FORMAT_VERSION, flags, 0, count, distinct, *directory))
+            for name in _SECTIONS:
+                f.write(b"\0" * (-f.tell() % 8))
+                f.write(blobs[name])
+        os.replace(tmp_path, path)
+        return count
+
+    # -- Lifecycle --------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        Release the mapping. Views into it become invalid. If a caller still
+        holds one (e.g. a posting list), the file is unmapped once it is gone.
+        """
+        for name in ("_lower_off", "_key_off", "_label_off", "_enabled", "_prefix",
+                     "_gram_ids", "_gram_start", "_gram_post", "_view"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                try:
+                    view.release()
+                except BufferError:
+                    pass  # exported to a consumer; released with it
+        if not self._mm.closed:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a live view keeps the mapping; the mmap is unmapped when collected
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- Positional access ------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def distinct_count(self) -> int:
+        return self._distinct
+
+    @property
+    def has_ngram_index(self) -> bool:
+        return bool(self._flags & _FLAG_NGRAM)
+
+    def _lower_bytes(self, pos: int) -> bytes:
+        base = self._lower_base
+        return self._mm[base + self._lower_off[pos]:base + self._lower_off[pos + 1]]
+
+    def key_at(self, idx: int) -> str:
+        base = self._key_base
+        return self._mm[base + self._key_off[idx]:base + self._key_off[idx + 1]].decode("utf-8")
+
+    def label_at(self, idx: int) -> str:
+        base = self._label_base
+        return self._mm[base + self._label_off[idx]:base + self._label_off[idx + 1]].decode("utf-8")
+
+    def lower_at(self, idx: int) -> str:
+        return self._lower_bytes(idx).decode("utf-8")
+
+    def iter_items(self) -> Iterator[Tuple[str, str]]:
+        return ((self.key_at(i), self.label_at(i)) for i in range(self._count))
+
+    def _bucket(self, target: bytes) -> Tuple[int, int]:
+        if not target:
+            return 0, self._count
+        return self._prefix[target[0]], self._prefix[target[0] + 1]
+
+    def _bisect(self, target: bytes, right: bool = False) -> int:
+        lo, hi = self._bucket(target)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self._lower_bytes(mid)
+            if value < target or (right and value == target):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, lower: str) -> int:
+        """Return the position of an already-folded input, or -1."""
+        target = lower.encode("utf-8")
+        pos = self._bisect(target, right=True) - 1
+        if pos >= 0 and self._lower_bytes(pos) == target:
+            return pos
+        return -1
+
+    def index_of(self, key: Any) -> int:
+        """Return the position of ``key``, or -1 if it is not in the catalog."""
+        if not isinstance(key, str):
+            return -1
+        target = fold(key, self.fold_accents).encode("utf-8")
+        pos = self._bisect(target)
+        while pos < self._count and self._lower_bytes(pos) == target:
+            if self.key_at(pos) == key:
+                return pos
+            pos += 1
+        return -1
+
+    def set_enabled(self, key: Any, enabled: bool = True) -> None:
+        """Toggle an option for this process only; the file is never modified."""
+        if not isinstance(self._enabled, bytearray):
+            self._enabled = bytearray(self._enabled)
+        super().set_enabled(key, enabled)
+
+    # -- Search -----------------------------------------------------------
+
+    def iter_lower(self) -> Iterator[str]:
+        """Yield each distinct folded key once, in sorted order."""
+        prev = None
+        for pos in range(self._count):
+            low = self._lower_bytes(pos)
+            if low != prev:
+                yield low.decode("utf-8")
+                prev = low
+
+    @property
+    def hotkeys(self) -> Dict[str, str]:
+        """Single-character keys by folded form."""
+        return self._hotkeys
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Return distinct folded keys starting with ``prefix``, in sorted order."""
+        target = prefix.encode("utf-8")
+        matches: List[str] = []
+        prev = None
+        for pos in range(self._bisect(target), self._count):
+            low = self._lower_bytes(pos)
+            if not low.startswith(target):
+                break
+            if low != prev:
+                if limit is not None and len(matches) >= limit:
+                    break
+                matches.append(low.decode("utf-8"))
+                prev = low
+        return matches
+
+    def _gram_postings(self, gram: int) -> memoryview:
+        lo, hi = 0, len(self._gram_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._gram_ids[mid] < gram:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self._gram_ids) or self._gram_ids[lo] != gram:
+            return self._gram_post[0:0]
+        return self._gram_post[self._gram_start[lo]:self._gram_start[lo + 1]]
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.75) -> List[str]:
+        """
+        Fuzzy suggestions over the folded keys. With an n-gram index only
+        keys sharing n-grams with ``word`` are scored; without one (or for
+        words shorter than an n-gram) this falls back to a full scan.
+        """
+        target = word.encode("utf-8")
+        if not self.has_ngram_index or len(target) < 3:
+            return super().close_matches(word, n=n, cutoff=cutoff)
+
+        # Grams shared by a large share of the catalog carry little signal and
+        # dominate the cost, so they are skipped whenever rarer ones exist.
+        postings = sorted((self._gram_postings(g) for g in _grams(target)), key=len)
+        common = max(_FUZZY_CANDIDATES, self._count // 8)
+        hits: Counter = Counter()
+        for i, posting in enumerate(postings):
+            if i and len(posting) > common:
+                break
+            hits.update(posting)
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        scored = []
+        for pos, _ in hits.most_common(_FUZZY_CANDIDATES):
+            low = self.lower_at(pos)
+            matcher.set_seq1(low)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff \
+                    and matcher.ratio() >= cutoff:
+                scored.append((matcher.ratio(), low))
+        seen = set()
+        result = []
+        for _, low in heapq.nlargest(len(scored), scored):
+            if low not in seen:
+                seen.add(low)
+                result.append(low)
+            if len(result) == n:
+                break
+        return result
@@ -0,0 +1,324 @@
+##
+## Receptus - ranked option matching
+##
+## ``OptionIndex`` precomputes, once per option set, everything needed to
+## resolve a query without visiting every option: an exact-key table,
+## hotkeys, a sorted key list for prefix search, exact-label and label-word
+## tables, optional tags, and a 3-gram posting index over keys and labels
+## for substring and fuzzy lookups. Keys, labels and tags are folded
+## (``receptus.normalize.fold``) while the index is built; a query is
+## folded once per match.
+##
+## A ``Matcher`` runs a pipeline of stages over that index. Each stage
+## returns ``(score, position)`` hits from its own structure; the matcher
+## keeps the best score per option, stops early on a unique high-confidence
+## hit, and otherwise returns the top-k candidates from a heap.
+##
+
+
+import difflib
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .catalog import BaseCatalog
+from .lazy import label_text
+from .normalize import fold
+
+
+# Score bands, highest first: exact > prefix > substring > fuzzy.
+SCORE_EXACT = 100.0
+SCORE_HOTKEY = 95.0
+SCORE_LABEL = 90.0
+SCORE_TAG = 85.0
+SCORE_PREFIX = 70.0
+SCORE_LABEL_PREFIX = 60.0
+SCORE_SUBSTRING = 40.0
+SCORE_FUZZY = 30.0
+
+_GRAM = 3
+
+
+def _grams(text: str) -> set:
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in "".join(c if c.isalnum() else " " for c in text).split() if w]
+
+
+class OptionIndex:
+    """
+    Search structures over one option set. Build it once and reuse it for
+    every query against the same options.
+    """
+
+    def __init__(self, options: Mapping, tags: Optional[Mapping[Any, Iterable[str]]] = None,
+                 fold_accents: bool = False):
+        self.options = options
+        self.fold_accents = fold_accents
+        if isinstance(options, BaseCatalog):
+            items: Iterable[Tuple[Any, Any]] = options.iter_items()
+        else:
+            items = options.items()
+
+        self.keys: List[Any] = []
+        self.labels: List[Any] = []
+        self.lower_keys: List[str] = []
+        self.lower_labels: List[str] = []
+        self.exact: Dict[str, int] = {}
+        self.hotkeys: Dict[str, int] = {}
+        self.label_exact: Dict[str, List[int]] = {}
+        self.tags: Dict[str, List[int]] = {}
+        self.grams: Dict[str, List[int]] = {}
+        label_words: List[Tuple[str, int]] = []
+
+        for pos, (key, label) in enumerate(items):
+            low = fold(str(key), fold_accents)
+            label_low = fold(label_text(label), fold_accents)
+            self.keys.append(key)
+            self.labels.append(label)
+            self.lower_keys.append(low)
+            self.lower_labels.append(label_low)
+            self.exact[low] = pos
+            if isinstance(key, str) and len(key) == 1:
+                self.hotkeys[low] = pos
+            self.label_exact.setdefault(label_low, []).append(pos)
+            for word in set(_words(label_low)):
+                label_words.append((word, pos))
+            for gram in _grams(low) | _grams(label_low):
+                self.grams.setdefault(gram, []).append(pos)
+
+        for key, key_tags in (tags or {}).items():
+            tagged = self.exact.get(fold(str(key), fold_accents))
+            if tagged is None:
+                continue
+            for tag in key_tags:
+                self.tags.setdefault(fold(str(tag), fold_accents), []).append(tagged)
+
+        order = sorted(self.exact.items())
+        self.sorted_keys: List[str] = [k for k, _ in order]
+        self.sorted_pos: List[int] = [p for _, p in order]
+        label_words.sort()
+        self.label_words: List[str] = [w for w, _ in label_words]
+        self.label_word_pos: List[int] = [p for _, p in label_words]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lower_key(self, pos: int) -> str:
+        return self.lower_keys[pos]
+
+    def lower_label(self, pos: int) -> str:
+        return self.lower_labels[pos]
+
+    def prefixed(self, sorted_words: Sequence[str], positions: Sequence[int], prefix: str) -> Iterator[Tuple[str, int]]:
+        """Yield ``(word, position)`` for sorted words starting with ``prefix``."""
+        for i in range(bisect_left(sorted_words, prefix), len(sorted_words)):
+            if not sorted_words[i].startswith(prefix):
+                break
+            yield sorted_words[i], positions[i]
+
+    def gram_candidates(self, query: str) -> Counter:
+        """Count shared 3-grams per option; only options sharing at least one are returned."""
+        hits: Counter = Counter()
+        for gram in _grams(query):
+            hits.update(self.grams.get(gram, ()))
+        return hits
+
+
+class Match(NamedTuple):
+    score: float
+    key: Any
+    label: Any
+    stage: str
+
+
+class MatchResult(NamedTuple):
+    accepted: Optional[Match]
+    candidates: List[Match]
+
+
+class MatchStage:
+    """Base class for pipeline stages. ``search`` yields ``(score, position)`` hits."""
+
+    name = "stage"
+
+    def search(self, index: OptionIndex, query: str) -> Iterable[Tuple[float, int]]:
+        raise NotImplementedError
+
+
+class ExactStage(MatchStage):
+    name = "exact"
+
+    def search(self, index, query):
+        pos = index.exact.get(query)
+        return () if pos is None else ((SCORE_EXACT, pos),)
+
+
+class HotkeyStage(MatchStage):
+    name = "hotkey"
+
+    def search(self, index, query):
+        pos = index.hotkeys.get(query) if len(query) == 1 else None
+        return () if pos is None else ((SCORE_HOTKEY, pos),)
+
+
+class LabelStage(MatchStage):
+    name = "label"
+
+    def search(self, index, query):
+        return ((SCORE_LABEL, pos) for pos in index.label_exact.get(query, ()))
+
+
+class TagStage(MatchStage):
+    name = "tag"
+
+    def search(self, index, query):
+        return ((SCORE_TAG, pos) for pos in index.tags.get(query, ()))
+
+
+class PrefixStage(MatchStage):
+    """Key prefix hits; shorter keys (closer to the query) score higher."""
+
+    name = "prefix"
+
+    def __init__(self, limit: int = 200):
+        self.limit = limit
+
+    def search(self, index, query):
+        for n, (word, pos) in enumerate(index.prefixed(index.sorted_keys, index.sorted_pos, query)):
+            if n >= self.limit:
+                break
+            yield SCORE_PREFIX + 10.0 * len(query) / len(word), pos
+
+
+class LabelPrefixStage(MatchStage):
+    """Prefix hits on any word of a label."""
+
+    name = "label_prefix"
+
+    def __init__(self, limit: int = 200):
+        self.limit = limit
+
+    def search(self, index, query):
+        for n, (word, pos) in enumerate(index.prefixed(index.label_words, index.label_word_pos, query)):
+            if n >= self.limit:
+                break
+            yield SCORE_LABEL_PREFIX + 10.0 * len(query) / len(word), pos
+
+
+class SubstringStage(MatchStage):
+    """
+    Substring hits in keys or labels. Candidates must contain every 3-gram
+    of the query, so only queries of three or more characters are searched.
+    """
+
+    name = "substring"
+
+    def search(self, index, query):
+        grams = _grams(query)
+        if not grams:
+            return
+        postings = sorted((index.grams.get(g, ()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return
+        for pos in candidates:
+            key, label = index.lower_key(pos), index.lower_label(pos)
+            if query in key:
+                yield SCORE_SUBSTRING + 10.0 * len(query) / len(key), pos
+            elif query in label:
+                yield SCORE_SUBSTRING + 5.0 * len(query) / len(label), pos
+
+
+class FuzzyStage(MatchStage):
+    """
+    Similarity hits (``difflib`` ratio) over the options sharing the most
+    3-grams with the query; at most ``candidates`` options are scored.
+    With a ``scorer`` (anything with ``close_matches(word, n, cutoff)`` over
+    the folded keys), every key is scored by it instead.
+    """
+
+    name = "fuzzy"
+
+    def __init__(self, cutoff: float = 0.6, candidates: int = 64, scorer: Optional[Any] = None):
+        self.cutoff = cutoff
+        self.candidates = candidates
+        self.scorer = scorer
+
+    def score(self, index: OptionIndex, query: str, positions: Iterable[int]) -> Iterator[Tuple[float, int]]:
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        for pos in positions:
+            best = 0.0
+            for text in (index.lower_key(pos), index.lower_label(pos)):
+                matcher.set_seq1(text)
+                if matcher.real_quick_ratio() >= self.cutoff and matcher.quick_ratio() >= self.cutoff:
+                    best = max(best, matcher.ratio())
+            if best >= self.cutoff:
+                yield SCORE_FUZZY * best, pos
+
+    def search(self, index, query):
+        if self.scorer is not None:
+            # Full-recall scoring over every key, e.g. a ParallelFuzzyScorer built on index.sorted_keys.
+            lowers = self.scorer.close_matches(query, n=self.candidates, cutoff=self.cutoff)
+            positions = (index.exact[low] for low in lowers if low in index.exact)
+        else:
+            hits = index.gram_candidates(query)
+            positions = (pos for pos, _ in hits.most_common(self.candidates))
+        return self.score(index, query, positions)
+
+
+def default_stages() -> List[MatchStage]:
+    return [ExactStage(), HotkeyStage(), LabelStage(), TagStage(), PrefixStage(),
+            LabelPrefixStage(), SubstringStage(), FuzzyStage()]
+
+
+class Matcher:
+    """
+    Ranked matching pipeline.
+
+    Stages run in order. After each stage, if the best hit so far scores at
+    least ``accept_score`` and strictly beats every other hit, it is accepted
+    and the remaining stages are skipped. Otherwise the top ``top_k`` hits across all
+    stages are returned as candidates. With ``fold_accents``, "cafe" matches
+    "Café" (a catalog's own ``fold_accents`` takes precedence).
+    """
+
+    def __init__(self, stages: Optional[Sequence[MatchStage]] = None, top_k: int = 5,
+                 accept_score: float = SCORE_TAG, fold_accents: bool = False):
+        self.stages = list(stages) if stages is not None else default_stages()
+        self.top_k = top_k
+        self.accept_score = accept_score
+        self.fold_accents = fold_accents
+
+    def build_index(self, options: Mapping, tags: Optional[Mapping[Any, Iterable[str]]] = None) -> OptionIndex:
+        return OptionIndex(options, tags=tags, fold_accents=getattr(options, "fold_accents", self.fold_accents))
+
+    def match(self, index: OptionIndex, query: str) -> MatchResult:
+        query = fold(query.strip(), index.fold_accents)
+        if not query:
+            return MatchResult(None, [])
+
+        best: Dict[int, Tuple[float, str]] = {}
+        for stage in self.stages:
+            for score, pos in stage.search(index, query):
+                if pos not in best or score > best[pos][0]:
+                    best[pos] = (score, stage.name)
+            if not best:
+                continue
+            lead = heapq.nlargest(2, best.items(), key=lambda item: item[1][0])
+            score, name = lead[0][1]
+            if score >= self.accept_score:
+                if len(lead) == 1 or lead[1][1][0] < score:
+                    pos = lead[0][0]
+                    return MatchResult(Match(score, index.keys[pos], index.labels[pos], name), [])
+                break  # tie among strong hits; lower stages cannot break it
+
+        top = heapq.nlargest(self.top_k, best.items(), key=lambda item: (item[1][0], -item[0]))
+        return MatchResult(None, [Match(score, index.keys[pos], index.labels[pos], name)
+                                  for pos, (score, name) in top])
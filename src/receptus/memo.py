@@ -0,0 +1,128 @@
+##
+## Receptus - memoized validators and transformers
+##
+## A free-text answer goes through ``transformer`` and ``validator`` on every
+## attempt, and operators often resubmit the same value (after declining a
+## confirmation, or when a form is revisited). ``memoize`` wraps a pure
+## callable with a bounded LRU keyed by its arguments, so an expensive check
+## (a schema validation, a path resolution) runs once per distinct input.
+##
+## ``get_input(pure=True)`` memoizes the prompt's own transformer and
+## validator for the life of the prompt (a compiled ``Prompt`` keeps them
+## across runs); ``pure="session"`` shares one cache per callable across
+## every prompt of the ``Receptus`` instance. Exceptions are not cached, and
+## arguments that cannot be hashed bypass the cache.
+##
+
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class Memoized:
+    """``func`` with an LRU of at most ``maxsize`` results, keyed by its positional arguments."""
+
+    def __init__(self, func: Callable, maxsize: int = 256):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(args: tuple) -> Hashable:
+        # Types are part of the key: 1 and True are equal, but a validator may treat them differently.
+        return args, tuple(type(a) for a in args)
+
+    def __call__(self, *args):
+        key = self._key(args)
+        try:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return self._cache[key]
+        except TypeError:  # unhashable argument
+            return self.func(*args)
+        value = self.func(*args)  # outside the lock: the call may be slow
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = value
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def invalidate(self, *args) -> bool:
+        """Forget the result for ``args``; returns whether one was cached."""
+        try:
+            with self._lock:
+                return self._cache.pop(self._key(args), _MISSING) is not _MISSING
+        except TypeError:
+            return False
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __bool__(self):
+        return True  # still a callable when its cache is empty ("if transformer:")
+
+    def __reduce__(self):
+        # Picklable for process pools (validate_records); the cache stays behind.
+        return Memoized, (self.func, self.maxsize)
+
+    def __repr__(self):
+        return f"<Memoized {self.func!r} {len(self)}/{self.maxsize}>"
+
+
+def memoize(func: Optional[Callable] = None, *, maxsize: int = 256):
+    """
+    Decorator: cache a pure function's results in a bounded LRU.
+    Use as ``@memoize`` or ``@memoize(maxsize=1024)``.
+    """
+    if func is None:
+        return lambda f: Memoized(f, maxsize)
+    return Memoized(func, maxsize)
+
+
+class MemoRegistry:
+    """
+    One ``Memoized`` per callable, for session-scoped caches. At most
+    ``max_funcs`` callables are tracked; the least recently used is dropped.
+    """
+
+    def __init__(self, maxsize: int = 256, max_funcs: int = 64):
+        self.maxsize = maxsize
+        self.max_funcs = max_funcs
+        self._memos: "OrderedDict[Callable, Memoized]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wrap(self, func: Optional[Callable]) -> Optional[Callable]:
+        if func is None or isinstance(func, Memoized):
+            return func
+        with self._lock:
+            memo = self._memos.get(func)
+            if memo is None:
+                memo = self._memos[func] = Memoized(func, self.maxsize)
+                if len(self._memos) > self.max_funcs:
+                    self._memos.popitem(last=False)
+            else:
+                self._memos.move_to_end(func)
+            return memo
+
+    def clear(self, func: Optional[Callable] = None) -> None:
+        """Drop the cached results of ``func``, or of every callable."""
+        with self._lock:
+            memos = [self._memos.get(func)] if func is not None else list(self._memos.values())
+        for memo in memos:
+            if memo is not None:
+                memo.cache_clear()
@@ -0,0 +1,106 @@
+##
+## Receptus - option metadata index
+##
+## Options can carry metadata besides their label (``option_meta``): tags,
+## aliases, a description, and any other ``field: value`` pairs. A
+## ``MetaIndex`` inverts it once per option set into posting lists of option
+## positions, one per term:
+##
+##     env:prod        a field value (also a tag written as "env:prod")
+##     db              a bare tag, an alias, or a word of the description
+##
+## A query is whitespace-separated terms that must all hold, so
+## ``env:prod role:db`` is the intersection of two posting lists, smallest
+## first, and never visits the options that match neither.
+##
+
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union, cast
+
+from .catalog import BaseCatalog
+from .normalize import fold
+
+MetaType = Mapping[Any, Union[Mapping[str, Any], Iterable[str]]]
+
+
+def _values(value: Any) -> Iterable[Any]:
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        return (value,)
+    return value
+
+
+def meta_terms(data: Union[Mapping[str, Any], Iterable[str]]) -> Iterator[Tuple[bool, str]]:
+    """
+    Yield ``(is_field, term)`` for one option's metadata. A plain list is
+    taken as its tags.
+    """
+    if not isinstance(data, Mapping):
+        data = {"tags": data}
+    for field, value in data.items():
+        field = fold(str(field))
+        if field in ("tags", "aliases"):
+            for tag in _values(value):
+                tag = fold(str(tag).strip())
+                if tag:
+                    yield ":" in tag, tag
+        elif field == "description":
+            for word in fold(str(value)).split():
+                yield False, word
+        else:
+            for item in _values(value):
+                yield True, f"{field}:{fold(str(item).strip())}"
+
+
+class MetaIndex:
+    """
+    Inverted index over ``option_meta`` for one option set. Metadata for
+    keys that are not options is ignored.
+    """
+
+    def __init__(self, options: Mapping, meta: MetaType):
+        self.options = options
+        if isinstance(options, BaseCatalog):
+            self._keys = None
+
+            def position(key):
+                idx = options.index_of(key)
+                return idx if idx >= 0 else None
+        else:
+            self._keys = list(options)
+            position = {key: pos for pos, key in enumerate(self._keys)}.get
+
+        self.fields: Dict[str, List[int]] = {}  # "field:value" -> positions
+        self.names: Dict[str, List[int]] = {}   # tags, aliases, description words -> positions
+        for key, data in meta.items():
+            pos = position(key)
+            if pos is None or data is None:
+                continue
+            for is_field, term in meta_terms(data):
+                (self.fields if is_field else self.names).setdefault(term, []).append(pos)
+        for postings in (self.fields, self.names):
+            for term, positions in postings.items():
+                postings[term] = sorted(set(positions))
+
+    def key_at(self, pos: int) -> Any:
+        return self._keys[pos] if self._keys is not None else cast(BaseCatalog, self.options).key_at(pos)
+
+    def postings(self, term: str) -> List[int]:
+        return (self.fields if ":" in term else self.names).get(term, [])
+
+    def query(self, text: str) -> Optional[List[Any]]:
+        """
+        Keys matching every term of ``text``, in option order; None for an
+        empty query.
+        """
+        terms = fold(text).split()
+        if not terms:
+            return None
+        lists = sorted((self.postings(term) for term in terms), key=len)
+        if len(lists) == 1:
+            return [self.key_at(pos) for pos in lists[0]]
+        found = set(lists[0])
+        for positions in lists[1:]:
+            if not found:
+                break
+            found.intersection_update(positions)
+        return [self.key_at(pos) for pos in sorted(found)]
@@ -0,0 +1,211 @@
+##
+## Receptus - metrics
+##
+## ``MetricsRegistry`` collects counters and histograms about prompt
+## behaviour (prompts shown, attempts, invalid inputs, timeouts, quits,
+## fuzzy hits, answer and render times) and renders them in the Prometheus
+## text exposition format.
+##
+## Updates never take a lock: each thread writes to its own shard, and the
+## shards are only merged when the metrics are read. The registry can be
+## dumped to a file (for node_exporter's textfile collector) or served over
+## a small local HTTP endpoint.
+##
+
+
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+ATTEMPT_BUCKETS = (1, 2, 3, 5, 10)
+RENDER_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    __slots__ = ("name", "kind", "help", "labelnames", "buckets")
+
+    def __init__(self, name, kind, help, labelnames=(), buckets=None):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets is not None else None
+
+
+class _Shard:
+    """One thread's share of the metrics. Only its owner thread writes to it."""
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> per-bucket counts (last slot is +Inf) followed by the sum
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """
+    Lock-free counters and histograms for ``Receptus(metrics=...)``.
+
+    The standard prompt metrics are predefined; ``counter()`` and
+    ``histogram()`` add custom ones. Metric names get the ``namespace``
+    prefix, and counters the ``_total`` suffix, when rendered.
+    """
+
+    def __init__(self, namespace: str = "receptus"):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()  # guards shard registration and definitions only
+
+        self.counter("prompts_shown", "Times a prompt was rendered, one per attempt.")
+        self.histogram("prompt_attempts", "Attempts per get_input call.", buckets=ATTEMPT_BUCKETS)
+        self.counter("invalid_inputs", "Rejected inputs, by reason.", ("reason",))
+        self.counter("timeouts", "Reads that timed out.")
+        self.counter("deadline_expired", "Prompts ended by an expired deadline.")
+        self.counter("quits", "Prompts ended with the quit word.")
+        self.counter("cancelled", "Prompts aborted through a CancelToken.")
+        self.counter("fuzzy_hits", "Inexact matches: suggestions shown or ranked matches accepted.", ("kind",))
+        self.histogram("answer_seconds", "Time from the start of get_input until it returns.")
+        self.histogram("render_seconds", "Time spent rendering a prompt.", buckets=RENDER_BUCKETS)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        with self._lock:
+            self._metrics[name] = _Metric(name, "counter", help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        with self._lock:
+            self._metrics[name] = _Metric(name, "histogram", help, labelnames, sorted(buckets))
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """Add ``amount`` to a counter."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Record one histogram observation."""
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = self._metrics[name].buckets
+        slots = histograms.get(key)
+        if slots is None:
+            slots = histograms[key] = [0] * (len(buckets) + 2)
+        slots[bisect_left(buckets, value)] += 1  # le semantics: value <= bound
+        slots[-1] += value
+
+    def _merged(self):
+        with self._lock:
+            shards = list(self._shards)
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        for shard in shards:
+            # dict.copy() is atomic, so a shard can keep being written while it is read.
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, slots in shard.histograms.copy().items():
+                merged = histograms.setdefault(key, [0] * len(slots))
+                for i, v in enumerate(list(slots)):
+                    merged[i] += v
+        return counters, histograms
+
+    def value(self, name: str, labels: Labels = ()) -> float:
+        """Current total of a counter, or observation count of a histogram."""
+        counters, histograms = self._merged()
+        if (name, labels) in histograms:
+            return sum(histograms[(name, labels)][:-1])
+        return counters.get((name, labels), 0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        counters, histograms = self._merged()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            full = f"{self.namespace}_{metric.name}" if self.namespace else metric.name
+            if metric.kind == "counter":
+                full += "_total"
+            lines.append(f"# HELP {full} {metric.help}")
+            lines.append(f"# TYPE {full} {metric.kind}")
+            if metric.kind == "counter":
+                samples = sorted((k[1], v) for k, v in counters.items() if k[0] == metric.name)
+                if not samples and not metric.labelnames:
+                    samples = [((), 0)]
+                for labels, value in samples:
+                    lines.append(f"{full}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+                continue
+            for labels, slots in sorted((k[1], v) for k, v in histograms.items() if k[0] == metric.name):
+                cumulative = 0
+                for bound, count in zip(list(metric.buckets) + ["+Inf"], slots[:-1]):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{full}_bucket{_format_labels(metric.labelnames, labels, le)} {cumulative}")
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{full}_sum{label_text} {_format_value(slots[-1])}")
+                lines.append(f"{full}_count{label_text} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write ``render()`` to ``path`` atomically, so scrapers never see a partial file."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1"):
+        """
+        Serve ``render()`` over HTTP from a daemon thread and return the
+        server; ``server.server_address`` has the bound port and
+        ``server.shutdown()`` stops it.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="receptus-metrics", daemon=True).start()
+        return server
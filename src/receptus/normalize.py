@@ -0,0 +1,34 @@
+##
+## Receptus - text folding for matching
+##
+## Keys, labels and typed input are compared in a folded form: NFKC, so
+## full-width digits and letters, ligatures and other compatibility
+## characters become their plain forms; then casefold, so "STRASSE" and
+## "Straße" both become "strasse"; and optionally accent folding ("Café" ->
+## "cafe"), the same NFKD-and-drop-combining-marks step ``force_ascii``
+## applies to output. Option sets fold their keys once, when their lookup
+## tables or index are built, and input is folded once per attempt, so an
+## exact lookup stays a single dict or sorted-array probe.
+##
+## ASCII text, the common case, takes a fast path: ``lower()`` is its casefold.
+##
+
+
+import unicodedata
+
+
+def strip_accents(text: str) -> str:
+    """Drop combining marks after canonical decomposition ("é" -> "e")."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def fold(text: str, accents: bool = False) -> str:
+    """The matching form of ``text``: NFKC + casefold, plus accent folding with ``accents``."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if accents:
+        text = strip_accents(text)
+    # Casefolding and mark removal can leave sequences that NFKC composes differently.
+    return unicodedata.normalize("NFKC", text)
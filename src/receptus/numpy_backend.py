@@ -0,0 +1,177 @@
+##
+## Receptus - NumPy catalog backend
+##
+## ``NumpyCatalog`` is an option catalog whose folded keys live in NumPy
+## unicode arrays: one in option order and one sorted, with the positions
+## that sort them. Key lookup and prefix completion are ``np.searchsorted``
+## on the sorted array, a batch of lookups is a single ``searchsorted`` call
+## (``find_many``), and substring search over keys (and labels) is one
+## ``np.char.find`` pass instead of a Python loop per option. Type-to-search
+## (``IncrementalFilter``) uses that search for its first keystroke.
+##
+## NumPy is optional: the pure-Python ``OptionCatalog`` stays the default,
+## and constructing a ``NumpyCatalog`` without NumPy raises ImportError.
+## Below a few thousand options the per-call NumPy overhead outweighs the
+## vectorized work; ``examples/bench_catalogs.py`` shows where it wins.
+##
+
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .catalog import BaseCatalog, _lower_key
+from .lazy import label_text
+from .normalize import fold
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]  # NumpyCatalog is unavailable; OptionCatalog has no such dependency
+
+
+class NumpyCatalog(BaseCatalog):
+    """
+    Option catalog with NumPy-vectorized lookup, completion and search.
+    Drop-in for ``OptionCatalog`` wherever ``get_input`` accepts options.
+    """
+
+    __slots__ = ("_keys", "_labels", "_enabled", "_lower", "_sorted_lower", "_sorted_idx",
+                 "_haystack", "_unique", "_hotkeys", "fold_accents", "version", "__weakref__")
+
+    def __init__(self, options: Optional[Any] = None, *, disabled_keys: Optional[Iterable[Any]] = None,
+                 fold_accents: bool = False):
+        if np is None:
+            raise ImportError("NumpyCatalog requires numpy; use OptionCatalog instead")
+        self.fold_accents = fold_accents
+        if options is None:
+            pairs: Iterable[Tuple[Any, Any]] = ()
+        elif hasattr(options, "items"):
+            pairs = options.items()
+        else:
+            pairs = options
+
+        keys: List[Any] = []
+        labels: List[Any] = []
+        hotkeys: Dict[str, Any] = {}
+        for key, label in pairs:
+            keys.append(key)
+            labels.append(label)
+            if isinstance(key, str) and len(key) == 1:
+                hotkeys[_lower_key(key, fold_accents)] = key
+
+        # Folded in Python, not with np.char.lower: a fixed-width array would
+        # truncate keys whose folded form is longer (e.g. "ß" -> "ss").
+        self._lower = np.array([_lower_key(k, fold_accents) for k in keys], dtype=str)
+        # Stable sort, like OptionCatalog: among equal folded forms the last added wins.
+        self._sorted_idx = np.argsort(self._lower, kind="stable")
+        self._sorted_lower = self._lower[self._sorted_idx]
+        self._keys = keys
+        self._labels = labels
+        self._hotkeys = hotkeys
+        self._haystack: Optional["np.ndarray"] = None  # "key\0label" per option, built on the first label search
+        ordered = self._sorted_lower
+        self._unique = int(np.count_nonzero(ordered[1:] != ordered[:-1])) + 1 if len(keys) else 0
+        self._enabled = bytearray(b"\xff" * ((len(keys) + 7) // 8))
+        self.version = 0
+
+        for key in disabled_keys or ():
+            self.set_enabled(key, False)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        return zip(self._keys, self._labels)
+
+    @property
+    def distinct_count(self) -> int:
+        return self._unique
+
+    def key_at(self, idx: int) -> Any:
+        return self._keys[idx]
+
+    def label_at(self, idx: int) -> Any:
+        return self._labels[idx]
+
+    def lower_at(self, idx: int) -> str:
+        return str(self._lower[idx])
+
+    def index_of(self, key: Any) -> int:
+        """Return the position of ``key``, or -1 if it is not in the catalog."""
+        low = _lower_key(key, self.fold_accents)
+        ordered = self._sorted_lower
+        lo = int(np.searchsorted(ordered, low, side="left"))
+        hi = int(np.searchsorted(ordered, low, side="right"))
+        for pos in range(lo, hi):
+            idx = int(self._sorted_idx[pos])
+            if self._keys[idx] == key:
+                return idx
+        return -1
+
+    def find(self, lower: str) -> int:
+        """Return the position of an already-folded input, or -1."""
+        pos = int(np.searchsorted(self._sorted_lower, lower, side="right")) - 1
+        if pos >= 0 and self._sorted_lower[pos] == lower:
+            return int(self._sorted_idx[pos])
+        return -1
+
+    def find_many(self, lowers: Sequence[str]) -> "np.ndarray":
+        """Positions of many folded inputs at once (-1 where absent), e.g. a comma list."""
+        needles = np.asarray(lowers, dtype=str)
+        ordered = self._sorted_lower
+        if not len(ordered):
+            return np.full(len(needles), -1, dtype=np.intp)
+        pos = np.searchsorted(ordered, needles, side="right") - 1
+        safe = np.maximum(pos, 0)
+        hit = (pos >= 0) & (ordered[safe] == needles)
+        return np.where(hit, self._sorted_idx[safe], -1)
+
+    def _dedupe(self, ordered: "np.ndarray") -> List[str]:
+        if len(ordered) < 2:
+            return ordered.tolist()
+        keep = np.empty(len(ordered), dtype=bool)
+        keep[0] = True
+        np.not_equal(ordered[1:], ordered[:-1], out=keep[1:])
+        return ordered[keep].tolist()
+
+    def iter_lower(self) -> Iterator[str]:
+        """Yield each distinct folded key once, in sorted order."""
+        return iter(self._dedupe(self._sorted_lower))
+
+    @property
+    def hotkeys(self) -> Dict[str, Any]:
+        """Single-character keys by folded form."""
+        return self._hotkeys
+
+    def complete(self, prefix: str) -> List[str]:
+        """Return distinct folded keys starting with ``prefix``, in sorted order."""
+        ordered = self._sorted_lower
+        if not prefix:
+            return self._dedupe(ordered)
+        lo = int(np.searchsorted(ordered, prefix, side="left"))
+        # Every string starting with prefix sorts before prefix with its last character bumped.
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            hi = int(np.searchsorted(ordered, prefix[:-1] + chr(last + 1), side="left"))
+            window = ordered[lo:hi]
+        else:
+            window = ordered[lo:]
+            window = window[np.char.startswith(window, prefix)]
+        return self._dedupe(window)
+
+    def search(self, query: str, match_labels: bool = True) -> "np.ndarray":
+        """
+        Positions whose folded key (or ``key\\0label`` with ``match_labels``)
+        contains ``query``, in option order. Lazy labels are not searched.
+        """
+        if match_labels:
+            haystack = self._haystack
+            if haystack is None:
+                haystack = self._haystack = np.array([f"{low}\0{fold(label_text(label), self.fold_accents)}"
+                                                      for low, label in zip(self._lower.tolist(), self._labels)],
+                                                     dtype=str)
+        else:
+            haystack = self._lower
+        return np.flatnonzero(np.char.find(haystack, query) >= 0)
@@ -0,0 +1,142 @@
+##
+## Receptus - process-pool fuzzy scoring
+##
+## ``ParallelFuzzyScorer`` packs the option keys into one shared-memory
+## block, starts a ``ProcessPoolExecutor`` whose workers attach to that block
+## once, and answers each query by scoring every shard concurrently and
+## merging the per-shard top-k. Only the query and the shard bounds are sent
+## to the workers; the keys are never pickled after start-up.
+##
+## Below ``threshold`` keys the process overhead outweighs the gain, so the
+## scorer stays in-process and behaves exactly like ``difflib``.
+##
+
+
+import difflib
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, cast
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None  # type: ignore[assignment]
+
+
+DEFAULT_THRESHOLD = 50_000
+
+# Worker-side state, set once per process by _attach().
+_worker_shm = None
+_worker_keys: Optional["_PackedKeys"] = None
+
+
+class _PackedKeys:
+    """Keys packed as ``count | offsets[count + 1] | utf-8 blob`` in a buffer."""
+
+    def __init__(self, buf):
+        count = int.from_bytes(bytes(buf[:8]), "little")
+        self._offsets = buf[8:8 + 8 * (count + 1)].cast("Q")
+        self._base = 8 + 8 * (count + 1)
+        self._buf = buf
+        self.count = count
+
+    @staticmethod
+    def pack(keys: Sequence[str]) -> bytes:
+        blobs = [k.encode("utf-8") for k in keys]
+        offsets = array("Q", [0])
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return len(blobs).to_bytes(8, "little") + offsets.tobytes() + b"".join(blobs)
+
+    def __getitem__(self, i: int) -> str:
+        start = self._base + self._offsets[i]
+        return bytes(self._buf[start:self._base + self._offsets[i + 1]]).decode("utf-8")
+
+
+def _attach(name: str) -> None:
+    global _worker_shm, _worker_keys
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not transfer ownership; the parent alone unlinks the block in close().
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+    _worker_shm = shm
+    _worker_keys = _PackedKeys(shm.buf)
+
+
+def _score_range(keys, start: int, stop: int, word: str, n: int, cutoff: float) -> List[Tuple[float, int]]:
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(word)
+    scored = []
+    for i in range(start, stop):
+        matcher.set_seq1(keys[i])
+        if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+            ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((ratio, i))
+    # Ties break on the key itself, exactly as difflib.get_close_matches does.
+    return heapq.nlargest(n, scored, key=lambda hit: (hit[0], keys[hit[1]]))
+
+
+def _score_shard(start: int, stop: int, word: str, n: int, cutoff: float) -> List[Tuple[float, int]]:
+    return _score_range(_worker_keys, start, stop, word, n, cutoff)
+
+
+class ParallelFuzzyScorer:
+    """
+    Fuzzy ``close_matches`` over a fixed list of keys, sharded across worker
+    processes when there are at least ``threshold`` keys.
+
+    Use it as a context manager (or call ``close()``) so the pool is shut
+    down and the shared memory released.
+    """
+
+    def __init__(self, keys: Sequence[str], workers: Optional[int] = None,
+                 threshold: int = DEFAULT_THRESHOLD):
+        self.keys = [str(k) for k in keys]
+        self.workers = workers or os.cpu_count() or 1
+        self._shm = None
+        self._pool = None
+        if shared_memory is not None and self.workers > 1 and len(self.keys) >= threshold:
+            packed = _PackedKeys.pack(self.keys)
+            self._shm = shared_memory.SharedMemory(create=True, size=max(len(packed), 1))
+            cast(memoryview, self._shm.buf)[:len(packed)] = packed
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach,
+                                             initargs=(self._shm.name,))
+
+    @property
+    def parallel(self) -> bool:
+        return self._pool is not None
+
+    def shards(self) -> List[Tuple[int, int]]:
+        size = -(-len(self.keys) // self.workers)
+        return [(start, min(start + size, len(self.keys))) for start in range(0, len(self.keys), size)]
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """Same contract as ``difflib.get_close_matches(word, keys, n, cutoff)``."""
+        if self._pool is None:
+            top = _score_range(self.keys, 0, len(self.keys), word, n, cutoff)
+        else:
+            futures = [self._pool.submit(_score_shard, start, stop, word, n, cutoff)
+                       for start, stop in self.shards()]
+            hits = [hit for f in futures for hit in f.result()]
+            top = heapq.nlargest(n, hits, key=lambda hit: (hit[0], self.keys[hit[1]]))
+        return [self.keys[i] for _, i in top]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+##
+## Receptus - prompt profiling
+##
+## ``PromptProfiler`` runs each ``get_input`` call under ``cProfile`` (and
+## optionally ``tracemalloc``) and writes the results per prompt to a
+## directory: ``<pid>-<seq>-<prompt>.pstats``, plus ``.alloc.txt`` with the
+## top allocation sites when memory profiling is on. The profiler is paused
+## while the input backend waits for the user, so the stats show only the
+## work Receptus itself does.
+##
+## Enable it with ``Receptus(profile="dir")`` or the ``RECEPTUS_PROFILE``
+## environment variable (``RECEPTUS_PROFILE_MEMORY=1`` adds tracemalloc).
+## When it is off, ``get_input`` is not wrapped at all.
+##
+
+
+import cProfile
+import functools
+import itertools
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from .backends import InputBackend
+
+
+class PromptProfiler:
+    """Per-prompt cProfile/tracemalloc dumps, written to ``directory``."""
+
+    def __init__(self, directory: str, *, memory: bool = False, top: int = 25):
+        self.directory = directory
+        self.memory = memory
+        self.top = top
+        self._seq = itertools.count(1)
+        self._local = threading.local()  # the profile of the prompt running on this thread
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["PromptProfiler"]:
+        directory = os.environ.get("RECEPTUS_PROFILE")
+        if not directory:
+            return None
+        return cls(directory, memory=os.environ.get("RECEPTUS_PROFILE_MEMORY", "") not in ("", "0"))
+
+    def path_for(self, prompt: Optional[str], seq: int) -> str:
+        """Output path (without suffix) for one prompt."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", prompt or "").strip("-")[:40] or "prompt"
+        return os.path.join(self.directory, f"{os.getpid()}-{seq:04d}-{slug}")
+
+    def wrap(self, get_input: Callable) -> Callable:
+        """
+        Return ``get_input`` (or ``_run_prompt``) profiled per call. Nested
+        prompts count towards the outer one.
+        """
+        @functools.wraps(get_input)
+        def profiled(*args, **kwargs):
+            if getattr(self._local, "profile", None) is not None:
+                return get_input(*args, **kwargs)
+            prompt = kwargs.get("prompt", args[0] if args else None)
+            prompt = getattr(prompt, "prompt", prompt)  # a compiled Prompt
+            profile = cProfile.Profile()
+            tracing = start = None
+            if self.memory:
+                import tracemalloc
+                tracing = not tracemalloc.is_tracing()
+                if tracing:
+                    tracemalloc.start()
+                start = tracemalloc.take_snapshot()
+            self._local.profile = profile
+            try:
+                profile.enable()
+                try:
+                    return get_input(*args, **kwargs)
+                finally:
+                    profile.disable()
+            finally:
+                self._local.profile = None
+                self._dump(prompt, profile, start, tracing)
+        return profiled
+
+    def _dump(self, prompt, profile, start, tracing) -> None:
+        base = self.path_for(prompt, next(self._seq))
+        profile.dump_stats(base + ".pstats")
+        if start is None:
+            return
+        import tracemalloc
+        stats = tracemalloc.take_snapshot().compare_to(start, "lineno")
+        if tracing:
+            tracemalloc.stop()
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"Top {self.top} allocation sites for prompt {prompt!r}\n")
+            for stat in stats[:self.top]:
+                f.write(f"{stat}\n")
+
+    @contextmanager
+    def paused(self):
+        """Stop counting time on this thread, e.g. while blocked on input."""
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            yield
+            return
+        profile.disable()
+        try:
+            yield
+        finally:
+            profile.enable()
+
+
+class _PausingInput(InputBackend):
+    """Input backend wrapper that pauses the profiler while a read blocks."""
+
+    def __init__(self, backend: InputBackend, profiler: PromptProfiler):
+        self.backend = backend
+        self.profiler = profiler
+
+    def readline(self, prompt):
+        with self.profiler.paused():
+            return self.backend.readline(prompt)
+
+    def read_secret(self, prompt):
+        with self.profiler.paused():
+            return self.backend.read_secret(prompt)
+
+    def read_secret_timeout(self, prompt, timeout):
+        with self.profiler.paused():
+            return self.backend.read_secret_timeout(prompt, timeout)
+
+    def readline_timeout(self, prompt, timeout):
+        with self.profiler.paused():
+            return self.backend.readline_timeout(prompt, timeout)
+
+    def readline_cancellable(self, prompt, timeout, token):
+        with self.profiler.paused():
+            return self.backend.readline_cancellable(prompt, timeout, token)
+
+    def readline_module(self):
+        return self.backend.readline_module()
@@ -0,0 +1,349 @@
+##
+## Receptus - compiled prompts
+##
+## ``get_input`` resolves ~35 arguments before it can show anything: the
+## option source, the formatter, the matcher and its index, the lookup
+## tables for keys and hotkeys. ``Receptus.compile_prompt`` does that work
+## once and returns an immutable ``Prompt``; running it only does the
+## per-call work (the current value, the deadline clock, readline setup and
+## the attempt loop). ``get_input`` itself is compile-then-run.
+##
+## Static options are copied when the prompt is compiled. Pass a callable
+## (or a catalog you update in place) for options that change between runs.
+##
+
+
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import (TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Mapping, MutableMapping, Optional, Sequence,
+                    Tuple, Union)
+
+from .catalog import BaseCatalog
+from .cancel import CancelToken
+from .deadline import Deadline
+from .lazy import resolve_label
+from .matching import Matcher, OptionIndex
+from .memo import Memoized, memoize
+from .metadata import MetaIndex, MetaType
+from .normalize import fold
+
+if TYPE_CHECKING:
+    from .receptus import Receptus
+
+
+def option_tables(current_options, is_enabled: Optional[Callable[[Any, Any], bool]], return_format: str,
+                  fold_accents: bool = False):
+    """
+    Lookup tables for one option set: ``(option_enabled, processed_keys,
+    hotkeys, complete_choices, format_return)``. Dict keys are folded here,
+    once per option set (a catalog folded its own when it was built).
+    """
+    option_enabled: Mapping[Any, bool]
+    processed_keys: Mapping[str, Any]
+    if isinstance(current_options, BaseCatalog):
+        # The catalog already holds the lookup, hotkeys and enabled bitmap.
+        option_enabled = current_options.enabled_with(is_enabled) if is_enabled else current_options.enabled
+        processed_keys = current_options.processed_keys
+        hotkeys = current_options.hotkeys
+        complete_choices = current_options.complete
+    else:
+        # Evaluate which options are currently enabled.
+        option_enabled = {key: is_enabled(key, value) if is_enabled else True for key, value in current_options.items()}
+
+        # Map of input keys and hotkeys (1-char options)
+        processed_keys = {fold(str(k), fold_accents): k for k in current_options}
+        hotkeys = {fold(k, fold_accents): k for k in current_options if isinstance(k, str) and len(k) == 1}
+        option_choices = list(processed_keys.keys())
+
+        def complete_choices(prefix, option_choices=option_choices):
+            return [c for c in option_choices if c.startswith(prefix)]
+
+    # Format return value according to requested return_format.
+    if return_format == "value":
+        def format_return(key):
+            return resolve_label(current_options[key])
+    elif return_format == "tuple":
+        def format_return(key):
+            return (key, resolve_label(current_options[key]))
+    else:
+        def format_return(key):
+            return key
+    return option_enabled, processed_keys, hotkeys, complete_choices, format_return
+
+
+class IndexCache(OrderedDict):
+    """
+    Bounded LRU of option-set indexes (matcher and metadata), keyed by the
+    identity of the option set. Callable options produce a new option set
+    on every attempt; their stale indexes are evicted instead of piling up.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+IndexCacheType = MutableMapping[Any, Tuple[Any, Any, Any]]
+
+
+class Prompt:
+    """
+    A ``get_input`` call with its configuration resolved, ready to run many
+    times. Immutable: use ``replace(**changes)`` to derive a variant.
+    """
+
+    __slots__ = (
+        "receptus", "prompt", "options", "get_options", "static_tables",
+        "default", "attempts", "allow_free_text", "validator", "transformer", "pure",
+        "quit_word", "help_word", "help_callback", "back_word",
+        "allow_multi", "min_choices", "max_choices",
+        "timeout_seconds", "on_timeout", "deadline", "cancel",
+        "disabled_keys", "is_enabled", "enabled_check", "formatter", "line_clear", "line_sep", "line_end",
+        "max_input_len", "page_size", "columns", "max_label_width",
+        "mask_input", "auto_complete", "fuzzy_match", "fuzzy_cutoff", "fuzzy_backend",
+        "matcher", "option_tags", "option_meta", "index_cache", "history_file", "return_format", "fold_accents",
+        "confirm", "confirm_prompt", "confirm_message", "_kwargs",
+    )
+
+    receptus: "Receptus"
+    prompt: Optional[str]
+    options: Any
+    get_options: Callable[[], Any]
+    static_tables: Optional[Tuple[Any, Any, Any, Any, Any]]
+    default: Optional[str]
+    attempts: int
+    allow_free_text: bool
+    validator: Optional[Callable[[str], Tuple[bool, str]]]
+    transformer: Optional[Callable[[str], Any]]
+    pure: Union[bool, str]
+    quit_word: Optional[str]
+    help_word: Optional[str]
+    help_callback: Optional[Callable[[], None]]
+    back_word: Optional[str]
+    allow_multi: bool
+    min_choices: int
+    max_choices: Optional[int]
+    timeout_seconds: Optional[int]
+    on_timeout: Optional[Callable[[], Any]]
+    deadline: Optional[Union[Deadline, float]]
+    cancel: Optional[CancelToken]
+    disabled_keys: FrozenSet[Any]
+    is_enabled: Optional[Callable[[Any, Any], bool]]
+    enabled_check: Optional[Callable[[Any, Any], bool]]  # is_enabled combined with disabled_keys
+    formatter: Callable[[str, str], str]
+    line_clear: Optional[bool]
+    line_sep: Optional[str]
+    line_end: Optional[str]
+    max_input_len: Optional[int]
+    page_size: Optional[int]
+    columns: Optional[Union[int, str]]
+    max_label_width: Optional[int]
+    mask_input: bool
+    auto_complete: bool
+    fuzzy_match: bool
+    fuzzy_cutoff: float
+    fuzzy_backend: Optional[Any]
+    matcher: Optional[Matcher]
+    option_tags: Optional[Dict[Any, Sequence[str]]]
+    option_meta: Optional[MetaType]
+    index_cache: IndexCacheType
+    history_file: Optional[str]
+    return_format: str
+    fold_accents: bool
+    confirm: bool
+    confirm_prompt: Optional[str]
+    confirm_message: Optional[str]
+    _kwargs: Mapping[str, Any]
+
+    def __init__(
+            self,
+            receptus: "Receptus",
+            prompt: Optional[str] = None,
+            options: Optional[Any] = None,
+            default: Optional[str] = None,
+            attempts: int = -1,
+            allow_free_text: bool = False,
+            validator: Optional[Callable[[str], Tuple[bool, str]]] = None,
+            transformer: Optional[Callable[[str], Any]] = None,
+            pure: Union[bool, str] = False,
+            quit_word: Optional[str] = "quit",
+            help_word: Optional[str] = "help",
+            help_callback: Optional[Callable[[], None]] = None,
+            back_word: Optional[str] = None,
+            allow_multi: bool = False,
+            min_choices: int = 1,
+            max_choices: Optional[int] = None,
+            timeout_seconds: Optional[int] = None,
+            on_timeout: Optional[Callable[[], Any]] = None,
+            deadline: Optional[Union[Deadline, float]] = None,
+            cancel: Optional[CancelToken] = None,
+            disabled_keys: Optional[set] = None,
+            is_enabled: Optional[Callable[[Any, Any], bool]] = None,
+            formatter: Optional[Callable[[str, str], str]] = None,
+            line_clear: Optional[bool] = None,
+            line_sep: Optional[str] = None,
+            line_end: Optional[str] = None,
+            max_input_len: Optional[int] = 500,
+            page_size: Optional[int] = None,
+            columns: Optional[Union[int, str]] = None,
+            max_label_width: Optional[int] = None,
+            mask_input: bool = False,
+            auto_complete: bool = False,
+            fuzzy_match: bool = False,
+            fuzzy_cutoff: float = 0.75,
+            fuzzy_backend: Optional[Any] = None,
+            matcher: Optional[Union[Matcher, bool]] = None,
+            option_tags: Optional[Dict[Any, Sequence[str]]] = None,
+            option_meta: Optional[MetaType] = None,
+            index_cache: Optional[IndexCacheType] = None,
+            history_file: Optional[str] = None,
+            return_format: str = "key",
+            confirm: bool = False,
+            confirm_prompt: Optional[str] = "Are you sure? [y/N]: ",
+            confirm_message: Optional[str] = None,
+            ):
+        kwargs = {name: value for name, value in locals().items() if name not in ("self", "receptus", "__class__")}
+        set_ = object.__setattr__
+        set_(self, "_kwargs", MappingProxyType(kwargs))
+        set_(self, "receptus", receptus)
+
+        # Dynamic options: allow options to be callable to re-evaluate every time.
+        static: Any
+        if isinstance(options, BaseCatalog):
+            # Catalogs are used as-is: no copy, no per-attempt index rebuild.
+            static = options
+        elif callable(options):
+            static = None
+        else:
+            static = dict(options) if options else {}
+        if static is not None:
+            get_options = lambda: static  # noqa: E731
+        else:
+            def get_options():
+                opts = options()
+                return opts if isinstance(opts, (dict, BaseCatalog)) else dict(opts)
+        set_(self, "options", static if static is not None else options)
+        set_(self, "get_options", get_options)
+
+        # With force_ascii, "cafe" selects "Café": accents are folded along with case.
+        fold_accents = bool(receptus.force_ascii)
+        set_(self, "fold_accents", fold_accents)
+
+        # Ranked matcher: the index is built once per option set and reused across attempts and runs.
+        if matcher is True:
+            matcher = Matcher(fold_accents=fold_accents)
+        if index_cache is None:
+            index_cache = IndexCache()  # (id(options), id(tags)) -> (options, tags, index)
+        set_(self, "matcher", matcher or None)
+        set_(self, "option_tags", option_tags)
+        set_(self, "option_meta", option_meta)
+        set_(self, "index_cache", index_cache)
+        if static is not None:
+            self.match_index(static)
+            self.meta_index(static)
+
+        # disabled_keys is folded into the enabled check, so every option table honours it.
+        disabled = frozenset(disabled_keys or ())
+        enabled_check = is_enabled
+        if disabled:
+            def enabled_check(key, value):
+                return key not in disabled and (is_enabled is None or is_enabled(key, value))
+        set_(self, "disabled_keys", disabled)
+        set_(self, "enabled_check", enabled_check)
+
+        # With no is_enabled callback the tables of a static dict never change. (Catalogs
+        # keep their own tables, which follow in-place updates.)
+        set_(self, "static_tables",
+             option_tables(static, enabled_check, return_format, fold_accents)
+             if isinstance(static, dict) and is_enabled is None else None)
+
+        # Pure transformer/validator: cached per prompt, or per Receptus with pure="session".
+        if pure == "session":
+            transformer, validator = receptus.memos.wrap(transformer), receptus.memos.wrap(validator)
+        elif pure:
+            transformer = memoize(transformer) if transformer and not isinstance(transformer, Memoized) else transformer
+            validator = memoize(validator) if validator and not isinstance(validator, Memoized) else validator
+        set_(self, "transformer", transformer)
+        set_(self, "validator", validator)
+        set_(self, "pure", pure)
+
+        set_(self, "formatter", formatter or receptus.default_formatter)
+        for name in ("prompt", "default", "attempts", "allow_free_text",
+                     "quit_word", "help_word", "help_callback", "back_word", "allow_multi",
+                     "min_choices", "max_choices", "timeout_seconds", "on_timeout", "deadline", "cancel",
+                     "is_enabled", "line_clear", "line_sep", "line_end", "max_input_len", "page_size", "columns", "max_label_width", "mask_input", "auto_complete",
+                     "fuzzy_match", "fuzzy_cutoff", "fuzzy_backend", "history_file",
+                     "return_format", "confirm", "confirm_prompt", "confirm_message"):
+            set_(self, name, kwargs[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Prompt is immutable; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Prompt is immutable; use replace()")
+
+    def tables(self, current_options):
+        """Lookup tables for this attempt; precompiled ones when the options are static."""
+        static = self.static_tables
+        if static is not None and current_options is self.options:
+            return static
+        return option_tables(current_options, self.enabled_check, self.return_format, self.fold_accents)
+
+    def match_index(self, current_options) -> Optional[OptionIndex]:
+        """The matcher's index for ``current_options``, built once per option set (None without ``matcher``)."""
+        matcher, tags = self.matcher, self.option_tags
+        if not matcher:
+            return None
+        cache_key = (id(current_options), id(tags))
+        cached = self.index_cache.get(cache_key)
+        if cached is None or cached[0] is not current_options or cached[1] is not tags:
+            cached = (current_options, tags, matcher.build_index(current_options, tags=tags))
+            self.index_cache[cache_key] = cached
+        return cached[2]
+
+    def meta_index(self, current_options) -> Optional[MetaIndex]:
+        """The metadata index for ``current_options``, built once per option set (None without ``option_meta``)."""
+        meta = self.option_meta
+        if not meta:
+            return None
+        cache_key = ("meta", id(current_options), id(meta))
+        cached = self.index_cache.get(cache_key)
+        if cached is None or cached[0] is not current_options or cached[1] is not meta:
+            cached = (current_options, meta, MetaIndex(current_options, meta))
+            self.index_cache[cache_key] = cached
+        return cached[2]
+
+    def run(self, current_value: Optional[str] = None, *, deadline: Optional[Union[Deadline, float]] = None,
+            cancel: Optional[CancelToken] = None):
+        """
+        Show the prompt and return the answer, exactly like ``get_input``.
+        ``deadline``/``cancel`` override the compiled ones for this run.
+        """
+        return self.receptus._run_prompt(self, current_value, deadline=deadline, cancel=cancel)
+
+    __call__ = run
+
+    def clear_memos(self) -> None:
+        """Forget the memoized transformer/validator results (see ``pure``)."""
+        for func in (self.transformer, self.validator):
+            if isinstance(func, Memoized):
+                func.cache_clear()
+
+    def replace(self, **changes) -> "Prompt":
+        """A new Prompt with some arguments changed (the receptus and index cache are kept)."""
+        return Prompt(self.receptus, **{**self._kwargs, "index_cache": self.index_cache, **changes})
+
+    def __repr__(self):
+        return f"<Prompt {self.prompt!r}>"
@@ -21,8 +21,27 @@
 
 import sys
 import os
+import time
 import unicodedata
-from typing import Callable, Optional, Any, Dict, List, Union, Sequence, Tuple
+from itertools import islice
+from typing import Callable, Optional, Any, Dict, Iterable, List, Union, Sequence, Tuple
+
+from .backends import InputBackend, OutputBackend, ConsoleInput, StreamOutput, ReceptusTimeout, ReceptusCancelled
+from .cancel import CancelToken
+from .catalog import BaseCatalog
+from .deadline import Deadline
+from .metrics import MetricsRegistry
+from .profiling import PromptProfiler, _PausingInput
+from .prompt import IndexCacheType, Prompt
+from .lazy import is_lazy, resolve_label
+from .layout import FrameCache, pack, display_width, terminal_size
+from .tree import OptionGroup, OptionTree
+from .matching import Matcher
+from .memo import MemoRegistry
+from .metadata import MetaType
+from .normalize import fold, strip_accents
+from .validation import Outcome, match_single, match_multi, apply_free_text
+from .search import IncrementalFilter, read_keys, KEY_ENTER, KEY_BACKSPACE, KEY_UP, KEY_DOWN, KEY_ESCAPE, KEY_CLEAR
 
 # Optionally enable colored output via colorama, if available.
 try:
@@ -31,24 +50,39 @@ try:
 except ImportError:
     pass  # No colorama, fallback to raw output
 
-# Allow options to be provided as a dict, list of tuples, or a callable returning either.
+# Allow options to be provided as a dict, list of tuples, a catalog, or a callable returning any of them.
 OptionsType = Union[
     Dict[Any, str],
     Sequence[tuple],
-    Callable[[], Union[Dict[Any, str], Sequence[tuple]]]
+    BaseCatalog,
+    Callable[[], Union[Dict[Any, str], Sequence[tuple], BaseCatalog]]
 ]
 
-class ReceptusTimeout(Exception):
-    """Raised when user input times out."""
-    pass
+# Internal: a selection that was rejected and already reported (e.g. a disabled option).
+_REJECTED = object()
+
+# get_input arguments that search_select's keystroke mode honours.
+_SEARCH_KWARGS = frozenset({"disabled_keys", "default", "timeout_seconds", "on_timeout", "deadline", "cancel"})
 
 class UserQuit:
     def __repr__(self):
         return "<UserQuit>"
 
+class UserBack:
+    def __repr__(self):
+        return "<UserBack>"
+
+class Cancelled:
+    def __repr__(self):
+        return "<Cancelled>"
+
 class Receptus:
     # Sentinel value for quitting, to be returned if user chooses to exit.
     USER_QUIT = UserQuit()
+    # Sentinel returned when the user asks to go back one level (see back_word).
+    USER_BACK = UserBack()
+    # Sentinel returned when a prompt is aborted through its CancelToken.
+    CANCELLED = Cancelled()
 
     def __init__(
             self, 
@@ -59,31 +93,73 @@ class Receptus:
             line_clear=True,
             line_sep=" ",
             line_end='\n',
-            on_event: Optional[Callable[[str, dict], None]] = None
+            on_event: Optional[Callable[[str, dict], None]] = None,
+            input_backend: Optional[InputBackend] = None,
+            output_backend: Optional[OutputBackend] = None,
+            deadline: Optional[Union[Deadline, float]] = None,
+            cancel: Optional[CancelToken] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            profile: Optional[Union[str, bool, PromptProfiler]] = None,
+            frame_cache: Optional[Union[int, FrameCache]] = 0,
             ):
         """
         Initialize the Receptus with formatting and output controls.
+        ``input_backend``/``output_backend`` replace the console and ``output`` stream.
+        ``deadline`` (a Deadline, or seconds from now) bounds every prompt made by this instance.
+        ``cancel`` (a CancelToken) aborts any prompt of this instance once it is cancelled.
+        ``metrics`` (a MetricsRegistry) collects counters and timings for every prompt.
+        ``profile`` (a directory or PromptProfiler) profiles each get_input call; it defaults
+        to the ``RECEPTUS_PROFILE`` environment variable, and False turns it off.
+        ``frame_cache`` (a size or FrameCache) keeps rendered option blocks for reuse; off by default.
         """
         self.force_ascii = force_ascii if force_ascii is not None else (os.environ.get("FORCE_ASCII") or "--ascii" in sys.argv)
         self.force_no_color = force_no_color if force_no_color is not None else (os.environ.get("NO_COLOR") or "--no-color" in sys.argv)
-        self.line_output = output or sys.stdout
+        self.output_backend = output_backend or StreamOutput(output or sys.stdout)
+        self.input_backend = input_backend or ConsoleInput(prompt_output=self.output_backend)
+        self.line_output = output or (output_backend if output_backend is not None else sys.stdout)
 
         self.line_clear = line_clear
         self.line_sep = line_sep
         self.line_end = line_end
         self.on_event = on_event or (lambda event_type, context: None)
+        self.deadline = Deadline.coerce(deadline)
+        self._active_deadline: Optional[Deadline] = None
+        self.cancel = cancel
+        self._active_cancel: Optional[CancelToken] = None
+        self.metrics = metrics
+        if isinstance(frame_cache, int):
+            frame_cache = FrameCache(frame_cache) if frame_cache > 0 else None
+        self.frame_cache = frame_cache
+        self.memos = MemoRegistry()  # session-scoped transformer/validator caches (pure="session")
+
+        if profile is None:
+            profile = PromptProfiler.from_env()
+        elif profile is True:
+            profile = PromptProfiler("receptus-profile")
+        elif profile and not isinstance(profile, PromptProfiler):
+            profile = PromptProfiler(os.fspath(profile))
+        self.profiler = profile or None
+        if self.profiler is not None:
+            # Only profiled instances pay for profiling: the wrapper shadows the method.
+            self.input_backend = _PausingInput(self.input_backend, self.profiler)
+            self.get_input = self.profiler.wrap(self.get_input)  # type: ignore[method-assign]
+            self._run_prompt = self.profiler.wrap(self._run_prompt)  # type: ignore[method-assign]  # compiled prompts skip get_input
 
 
     def supports_ansi(self):
         """
-        Returns True if the terminal supports ANSI color codes.
+        Returns True if the output backend is a terminal that supports ANSI color codes.
         """
-        if not sys.stdout.isatty():
+        if not self.output_backend.isatty():
             return False
         if os.name != "nt":
             return True
         return ("ANSICON" in os.environ) or ("WT_SESSION" in os.environ) or ("TERM" in os.environ and os.environ["TERM"] == "xterm")
 
+    def terminal_width(self) -> int:
+        """Columns available for layout; read at most once per frame."""
+        return terminal_size.get().columns
+
     def sanitize_input(self, text, ascii_only=None):
         """
         Normalize and optionally strip accents and non-ASCII characters from input.
@@ -92,15 +168,18 @@ class Receptus:
             ascii_only = self.force_ascii
         text = unicodedata.normalize("NFKC", text)
         if ascii_only:
-            text = unicodedata.normalize("NFKD", text)
-            text = "".join(c for c in text if not unicodedata.combining(c))
-            text = text.encode("ascii", "ignore").decode("ascii")
+            text = strip_accents(text).encode("ascii", "ignore").decode("ascii")
         return text
     
     def out(self, *args, line_clear=None, line_sep=None, line_end=None):
         """
         Print to output, optionally clearing the line and normalizing to ASCII.
         """
+        self.output_backend.write(self._format_out(*args, line_clear=line_clear, line_sep=line_sep, line_end=line_end))
+        self.output_backend.flush()
+
+    def _format_out(self, *args, line_clear=None, line_sep=None, line_end=None) -> str:
+        """The text ``out`` would write for ``args``."""
         if line_clear is None:
             line_clear = self.line_clear
         if line_sep is None:
@@ -108,7 +187,7 @@ class Receptus:
         if line_end is None:
             line_end = self.line_end
         suffix = "\033[K" if line_clear else ""
-        print(*(self.sanitize_input(str(a)) for a in args), end=suffix + line_end, sep=line_sep, file=self.line_output, flush=True)
+        return line_sep.join(self.sanitize_input(str(a)) for a in args) + suffix + line_end
 
 
     def color_wrap(self, text, code):
@@ -136,41 +215,60 @@ class Receptus:
             return self.color_wrap(text, code)
         return text
 
+    def _input(self, prompt: str) -> str:
+        """Read one line of input. Every blocking read in Receptus goes through here."""
+        if self._active_cancel is not None:
+            return self.input_backend.readline_cancellable(prompt, None, self._active_cancel)
+        return self.input_backend.readline(prompt)
+
+    def _read_secret(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Read one line without echo, raising ReceptusTimeout after ``timeout``.
+        Masked reads cannot be interrupted, only skipped.
+        """
+        if self._active_cancel is not None and self._active_cancel.cancelled:
+            raise ReceptusCancelled
+        if timeout is None:
+            return self.input_backend.read_secret(prompt)
+        return self.input_backend.read_secret_timeout(prompt, timeout)
+
+    def _readline_module(self):
+        """Return the readline module used for completion and history, or None if unavailable."""
+        return self.input_backend.readline_module()
+
     def _timed_input(self, prompt, timeout):
         """
-        Wait for input with a timeout, using inputimeout (Windows) or signal (UNIX).
-        Raises ReceptusTimeout on timeout.
+        Wait for input with a timeout. Raises ReceptusTimeout on timeout.
         """
-        import platform
-        if platform.system() != "Windows":
-            import signal
-            def handler(signum, frame):
-                raise ReceptusTimeout
-            signal.signal(signal.SIGALRM, handler)
-            signal.alarm(timeout)
-            try:
-                result = input(prompt)
-                signal.alarm(0)
-                return result
-            except ReceptusTimeout:
-                signal.alarm(0)
-                raise
-        else:
-            try:
-                from inputimeout import inputimeout, TimeoutOccurred
-                try:
-                    return inputimeout(prompt, timeout=timeout)
-                except TimeoutOccurred:
-                    raise ReceptusTimeout
-            except ImportError:
-                # No timeout support on Windows without the inputimeout module.
-                return input(prompt)
+        if self._active_cancel is not None:
+            return self.input_backend.readline_cancellable(prompt, timeout, self._active_cancel)
+        return self.input_backend.readline_timeout(prompt, timeout)
 
+    def clear_memos(self, func: Optional[Callable] = None) -> None:
+        """Forget session-scoped ``pure`` results for ``func``, or for every callable."""
+        self.memos.clear(func)
 
-    def _get_confirmation(self, confirm_prompt: str) -> bool:
-        """Ask user for confirmation, Y/N."""
+    def _count(self, name: str, *labels: str) -> None:
+        """Bump a metrics counter, if metrics are enabled."""
+        if self.metrics is not None:
+            self.metrics.inc(name, labels)
+
+
+    def _get_confirmation(self, confirm_prompt: Optional[str]) -> bool:
+        """Ask user for confirmation, Y/N. An exhausted deadline counts as No."""
+        confirm_prompt = confirm_prompt or ""
         while True:
-            conf = input(confirm_prompt)
+            deadline = self._active_deadline
+            if deadline is None:
+                conf = self._input(confirm_prompt)
+            else:
+                try:
+                    if deadline.expired():
+                        raise ReceptusTimeout
+                    conf = self._timed_input(confirm_prompt, deadline.remaining())
+                except ReceptusTimeout:
+                    self.out("## Input timed out ##")
+                    return False
             if conf.strip().lower() in ("y", "yes"):
                 return True
             if conf.strip().lower() in ("n", "no", ""):
@@ -182,9 +280,9 @@ class Receptus:
         if return_format == "key":
             return key
         if return_format == "value":
-            return current_options[key]
+            return resolve_label(current_options[key])
         if return_format == "tuple":
-            return (key, current_options[key])
+            return (key, resolve_label(current_options[key]))
         return key
 
     def _display_prompt(
@@ -198,24 +296,27 @@ class Receptus:
         help_word: Optional[str],
         current_value: Optional[str],
         default: Optional[str],
+        page_size: Optional[int] = None,
+        back_word: Optional[str] = None,
+        columns: Optional[Union[int, str]] = None,
+        max_label_width: Optional[int] = None,
     ):
-        """Displays the prompt, options, and other contextual information."""
+        """
+        Displays the prompt, options, and other contextual information.
+        With ``page_size``, only the first page of options is rendered.
+        With ``columns``, options are packed into columns (see ``_display_columns``).
+        """
         if prompt:
             self.out(f'\n{prompt}')
 
         if current_options:
-            if allow_free_text:
-                self.out(f'    (___) Enter value [Free text]')
-            for key, value in current_options.items():
-                enabled = option_enabled.get(key, True)
-                if not str(key).startswith("*"):
-                    if enabled:
-                        self.out(formatter(f'    ({key}) {value}', "option"))
-                    else:
-                        self.out(formatter(f'    ({key}) {value} [DISABLED]', "disabled_option"))
-        elif allow_free_text:
-            pass
+            # The option block is rendered (or fetched from the frame cache) and written at once.
+            self.output_backend.write(self._option_frame(current_options, option_enabled, formatter, allow_free_text,
+                                                         page_size, columns, max_label_width))
+            self.output_backend.flush()
 
+        if back_word:
+            self.out(f'    ({back_word}) Go Back')
         if quit_word:
             self.out(f'    ({quit_word}) Exit Program')
         if help_word:
@@ -225,36 +326,163 @@ class Receptus:
             self.out(f' Current Value:   {current_value}')
             self.out(f'>>  Press [Enter] to use this value.')
         elif default is not None:
-            self.out(f'>>  Press [Enter] to use default: {current_options.get(default, default)}')
+            self.out(f'>>  Press [Enter] to use default: {resolve_label(current_options.get(default, default))}')
 
-    def _read_input_with_timeout(self, prompt: str, timeout_seconds: Optional[int], mask_input: bool) -> Optional[str]:
+    def _option_frame(self, current_options, option_enabled, formatter: Callable, allow_free_text: bool,
+                      page_size: Optional[int], columns: Optional[Union[int, str]],
+                      max_label_width: Optional[int]) -> str:
+        """
+        The rendered option block, from ``frame_cache`` when the same options,
+        enabled mask, formatter, output mode and width were rendered before.
+        """
+        width = self.terminal_width() if columns or max_label_width else None
+        cache = self.frame_cache
+        if cache is None:
+            return self._render_options(current_options, option_enabled, formatter, allow_free_text,
+                                        page_size, columns, max_label_width, width)[0]
+        owner: Any
+        options_key: Tuple[Any, ...]
+        if isinstance(current_options, BaseCatalog):
+            owner = current_options
+            options_key = (id(current_options), current_options.version, current_options.mask_key(option_enabled))
+        else:
+            # A dict's enabled table is built once per option set and never changes, so its
+            # identity stands for both. Tables rebuilt per attempt simply never hit.
+            owner = option_enabled
+            options_key = (id(option_enabled),)
+        key: Optional[Tuple[Any, ...]] = (
+            options_key, formatter, self.force_ascii, self.force_no_color, self.supports_ansi(),
+            self.line_clear, self.line_sep, self.line_end, width, allow_free_text, page_size, columns, max_label_width)
+        try:
+            hash(key)
+        except TypeError:  # unhashable formatter: render uncached
+            key = None
+        if key is not None:
+            frame = cache.get(key, owner)
+            if frame is not None:
+                return frame
+        frame, lazy = self._render_options(current_options, option_enabled, formatter, allow_free_text,
+                                           page_size, columns, max_label_width, width)
+        if key is not None and not lazy:  # lazy labels expire, so their frames are not kept
+            cache.put(key, owner, frame)
+        return frame
+
+    def _render_options(self, current_options, option_enabled, formatter: Callable, allow_free_text: bool,
+                        page_size: Optional[int], columns: Optional[Union[int, str]],
+                        max_label_width: Optional[int], width: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Render the free-text hint, the options and the "more options" line as
+        one string. Also returns whether any lazy label was resolved for it.
+        """
+        lines = []
+        lazy = False
+
+        def resolved(entries):
+            nonlocal lazy
+            for key, value, enabled in entries:
+                if is_lazy(value):
+                    value = resolve_label(value)
+                    lazy = True
+                yield key, value, enabled
+
+        if allow_free_text:
+            lines.append('    (___) Enter value [Free text]')
+        entries: Iterable[Tuple[Any, Any, bool]]
+        if isinstance(current_options, BaseCatalog):
+            # Walk the catalog's arrays directly instead of a key lookup per option.
+            entries = current_options.iter_entries(option_enabled, 0, page_size)
+        else:
+            entries = islice(((key, value, option_enabled.get(key, True)) for key, value in current_options.items()), page_size)
+        entries = resolved(entries)
+        if columns or max_label_width:
+            lines.extend(self._display_columns(entries, formatter, columns or 1, max_label_width, width=width))
+            entries = ()
+        for key, value, enabled in entries:
+            if not str(key).startswith("*"):
+                if enabled:
+                    lines.append(formatter(f'    ({key}) {value}', "option"))
+                else:
+                    lines.append(formatter(f'    ({key}) {value} [DISABLED]', "disabled_option"))
+        if page_size is not None and len(current_options) > page_size:
+            lines.append(f'    ... {len(current_options) - page_size} more options not shown (type to search)')
+        return "".join(self._format_out(line) for line in lines), lazy
+
+    def _display_columns(self, entries, formatter: Callable, columns: Union[int, str],
+                         max_label_width: Optional[int], indent: str = "    ", gutter: int = 2,
+                         width: Optional[int] = None) -> List[str]:
+        """
+        Lines of options packed into columns that fit ``width`` (default: the
+        terminal): ``"auto"`` fits as many as possible, an int asks for that
+        many. Labels wider than a column (or than ``max_label_width``) are
+        truncated.
+        """
+        cells, styles = [], []
+        for key, value, enabled in entries:
+            if str(key).startswith("*"):
+                continue
+            # Measure what will actually be printed: out() normalizes the text.
+            cells.append(self.sanitize_input(f'({key}) {value}' if enabled else f'({key}) {value} [DISABLED]'))
+            styles.append("option" if enabled else "disabled_option")
+        if width is None:
+            width = self.terminal_width()
+        grid = pack(cells, width - len(indent), columns=columns, gutter=gutter, max_cell_width=max_label_width)
+        lines = []
+        for row in grid.rows:
+            parts = []
+            for j, i in enumerate(row):
+                text = grid.texts[i]
+                padding = "" if j == len(row) - 1 else " " * (grid.col_width - display_width(text) + gutter)
+                parts.append(formatter(text, styles[i]) + padding)
+            lines.append(indent + "".join(parts))
+        return lines
+
+    def _read_input_with_timeout(self, prompt: str, timeout_seconds: Optional[float], mask_input: bool) -> Optional[str]:
         """Reads input, handling masking and timeouts."""
+        deadline = self._active_deadline
+        if deadline is not None and deadline.expired():
+            return None
         if mask_input:
+            if deadline is not None:
+                # A deadline never unmasks the read: the secret is read with the
+                # remaining budget, or not at all if the backend cannot time it.
+                try:
+                    return self._read_secret(prompt, deadline.cap(timeout_seconds))
+                except NotImplementedError:
+                    self.out("## Warning: Masked input cannot be timed here. Using the fallback. ##")
+                    return None
+                except ReceptusTimeout:
+                    self.out("## Input timed out ##")
+                    self._count("timeouts")
+                    return None
             try:
-                from getpass import getpass
                 if timeout_seconds is not None:
                     self.out("## Warning: Password masking does not support timeout. Input will not be masked. ##")
                     return self._timed_input(prompt, timeout_seconds)
-                return getpass(prompt)
+                return self._read_secret(prompt)
+            except ReceptusCancelled:
+                raise
             except Exception:
-                return input(prompt)
+                return self._input(prompt)
 
+        if deadline is not None:
+            timeout_seconds = deadline.cap(timeout_seconds)
         if timeout_seconds is not None:
             try:
                 return self._timed_input(prompt, timeout_seconds)
             except ReceptusTimeout:
                 self.out("## Input timed out ##")
                 # self.on_event("timeout", {"prompt": prompt})  # Optional
+                self._count("timeouts")
                 return None
 
-        return input(prompt)
+        return self._input(prompt)
 
 
     def _confirm_value(
         self,
         value: Any,
         confirm: bool,
-        confirm_prompt: str,
+        confirm_prompt: Optional[str],
         confirm_message: Optional[str],
     ) -> bool:
         """Handles the confirmation logic for a selection. Returns True if confirmed."""
@@ -272,11 +500,15 @@ class Receptus:
 
         return self._get_confirmation(confirm_prompt)
 
-    def _handle_quit_and_help(self, usr_input_lower, quit_word, help_word, help_callback, confirm, confirm_prompt):
+    def _handle_quit_and_help(self, usr_input_lower, quit_word, help_word, help_callback, confirm, confirm_prompt, back_word=None):
+        if back_word and usr_input_lower == back_word.lower():
+            return self.USER_BACK
+
         if usr_input_lower == quit_word.lower() if quit_word else False:
             if confirm and not self._get_confirmation(confirm_prompt):
                 self.out("Selection not confirmed. Please try again.\n")
                 return "retry"
+            self._count("quits")
             return self.USER_QUIT
 
         if usr_input_lower == help_word.lower() if help_word else False:
@@ -286,70 +518,76 @@ class Receptus:
 
         return None
 
-    def _handle_multi_select(self, usr_input, processed_keys, hotkeys, option_enabled, formatter, min_choices, max_choices, format_return):
-        parts = [part.strip() for part in usr_input.split(",")]
-        chosen, bad = [], []
-
-        for part in parts:
-            key_candidate = processed_keys.get(part.lower()) or hotkeys.get(part.lower())
-            enabled = option_enabled.get(key_candidate, True)
-            if not enabled:
-                bad.append(part)
-                continue
-            if part.lower() in processed_keys:
-                chosen.append(processed_keys[part.lower()])
-            elif part.lower() in hotkeys:
-                chosen.append(hotkeys[part.lower()])
-            else:
-                bad.append(part)
-
-        if bad:
-            self.out(f'## Invalid option(s): {", ".join(bad)} ##')
-            return None
-        if len(chosen) < min_choices or (max_choices and len(chosen) > max_choices):
-            self.out(f'## Select between {min_choices} and {max_choices or "∞"} options. ##')
+    def _handle_multi_select(self, usr_input, processed_keys, hotkeys, option_enabled, formatter, min_choices, max_choices, format_return,
+                             meta_index=None, fold_accents=False):
+        outcome = match_multi(usr_input, processed_keys, hotkeys, option_enabled, min_choices, max_choices,
+                              expand=meta_index.query if meta_index is not None else None, fold_accents=fold_accents)
+        if not outcome.ok:
+            self.out(f'## {outcome.error} ##')
+            self._count("invalid_inputs", "Invalid selection")
             return None
+        return [format_return(c) for c in outcome.value]
 
-        return [format_return(c) for c in chosen]
-
-    def _handle_single_select(self, usr_input, processed_keys, hotkeys, option_enabled, formatter, fuzzy_match, fuzzy_cutoff, current_options, format_return):
+    def _handle_single_select(self, usr_input, processed_keys, hotkeys, option_enabled, formatter, fuzzy_match, fuzzy_cutoff, current_options, format_return,
+                              matcher=None, match_index=None, fuzzy_backend=None, meta_index=None, fold_accents=False):
         import difflib
 
-        usr_input_lower = usr_input.lower()
-        key = None
-
-        if usr_input_lower in processed_keys:
-            key = processed_keys[usr_input_lower]
-        elif usr_input_lower in hotkeys:
-            key = hotkeys[usr_input_lower]
-        elif fuzzy_match and processed_keys:
-            matches = difflib.get_close_matches(usr_input_lower, processed_keys, n=3, cutoff=fuzzy_cutoff)
-            if matches:
-                self.out(f'Did you mean: {", ".join(matches)}?')
+        # Folded once per attempt; the key tables were folded when they were built.
+        usr_input_lower = fold(usr_input, fold_accents)
+        outcome = match_single(usr_input, processed_keys, hotkeys, option_enabled, folded=usr_input_lower)
+
+        if outcome.value is None and meta_index is not None:
+            # Metadata query: tags, aliases and field:value terms, all of which must hold.
+            found = [k for k in meta_index.query(usr_input) or () if option_enabled.get(k, True)]
+            if len(found) == 1:
+                outcome = Outcome(found[0])
+            elif found:
+                shown = ", ".join(str(k) for k in found[:10])
+                more = f" and {len(found) - 10} more" if len(found) > 10 else ""
+                self.out(f'Matches: {shown}{more}. Narrow the query or enter a key.')
                 return None
 
-        if key is not None:
-            if not option_enabled.get(key, True):
-                self.out(formatter(f"## Option '{usr_input}' is disabled. ##", "error"))
-                return None
-            return format_return(key)
+        if outcome.value is None:
+            if matcher is not None and match_index is not None:
+                # Ranked pipeline: labels, tags, prefixes, substrings and fuzzy hits.
+                result = matcher.match(match_index, usr_input_lower)
+                if result.accepted is not None:
+                    key = result.accepted.key
+                    self._count("fuzzy_hits", "accepted")
+                    outcome = Outcome(key) if option_enabled.get(key, True) else Outcome(key, f"Option '{usr_input}' is disabled.")
+                else:
+                    suggestions = [str(m.key) for m in result.candidates if option_enabled.get(m.key, True)]
+                    if suggestions:
+                        self.out(f'Did you mean: {", ".join(suggestions)}?')
+                        self._count("fuzzy_hits", "suggested")
+                        return None
+            elif fuzzy_match and processed_keys:
+                close_matches = getattr(fuzzy_backend or processed_keys, "close_matches", None)
+                if close_matches is not None:
+                    matches = close_matches(usr_input_lower, n=3, cutoff=fuzzy_cutoff)
+                else:
+                    matches = difflib.get_close_matches(usr_input_lower, processed_keys, n=3, cutoff=fuzzy_cutoff)
+                if matches:
+                    self.out(f'Did you mean: {", ".join(matches)}?')
+                    self._count("fuzzy_hits", "suggested")
+                    return None
 
-        return None
+        if outcome.value is None:
+            return None
+        if not outcome.ok:
+            self.out(formatter(f"## {outcome.error} ##", "error"))
+            self.on_event("input_invalid", {"input": usr_input, "reason": "Option disabled", "key": outcome.value})
+            self._count("invalid_inputs", "Option disabled")
+            return _REJECTED  # reported; not free text and not an unknown option
+        return format_return(outcome.value)
 
     def _handle_free_text_input(self, usr_input, transformer, validator):
-        value = usr_input
-        if transformer:
-            try:
-                value = transformer(value)
-            except Exception as e:
-                self.out(f'## Input transformation failed: {e} ##')
-                return None
-        if validator:
-            valid, msg = validator(value)
-            if not valid:
-                self.out(f'## {msg or "Invalid input"} ##')
-                return None
-        return value
+        outcome = apply_free_text(usr_input, transformer, validator)
+        if not outcome.ok:
+            self.out(f'## {outcome.error} ##')
+            self._count("invalid_inputs", "Validation failed")
+            return None
+        return outcome.value
 
 
     def get_input(
@@ -362,118 +600,190 @@ class Receptus:
             allow_free_text: bool = False,
             validator: Optional[Callable[[str], Tuple[bool, str]]] = None,
             transformer: Optional[Callable[[str], Any]] = None,
+            pure: Union[bool, str] = False,
             quit_word: Optional[str] = "quit",
             help_word: Optional[str] = "help",
             help_callback: Optional[Callable[[], None]] = None,
+            back_word: Optional[str] = None,
             allow_multi: bool = False,
             min_choices: int = 1,
             max_choices: Optional[int] = None,
             timeout_seconds: Optional[int] = None,
             on_timeout: Optional[Callable[[], Any]] = None,
+            deadline: Optional[Union[Deadline, float]] = None,
+            cancel: Optional[CancelToken] = None,
             disabled_keys: Optional[set] = None,
             is_enabled: Optional[Callable[[Any, Any], bool]] = None,
             formatter: Optional[Callable[[str, str], str]] = None,
-            line_clear: bool = True,
-            line_sep = " ",
-            line_end = '\n',
+            line_clear: Optional[bool] = None,
+            line_sep: Optional[str] = None,
+            line_end: Optional[str] = None,
             max_input_len: Optional[int] = 500,
+            page_size: Optional[int] = None,
+            columns: Optional[Union[int, str]] = None,
+            max_label_width: Optional[int] = None,
             mask_input: bool = False,
             auto_complete: bool = False,
             fuzzy_match: bool = False,
             fuzzy_cutoff: float = 0.75,
+            fuzzy_backend: Optional[Any] = None,
+            matcher: Optional[Union[Matcher, bool]] = None,
+            option_tags: Optional[Dict[Any, Sequence[str]]] = None,
+            option_meta: Optional[MetaType] = None,
+            index_cache: Optional[IndexCacheType] = None,
             history_file: Optional[str] = None,
             return_format: str = "key",  # "key", "value", "tuple"
             confirm: bool = False,
             confirm_prompt: Optional[str] = "Are you sure? [y/N]: ",
             confirm_message: Optional[str] = None,
-        ) -> Union[Any, List[Any], None, UserQuit]:
+        ) -> Union[Any, List[Any], None, UserQuit, UserBack, Cancelled]:
         """
         Prompt the user for input with many options and features.
 
         Handles:
         - Option lists (static/dynamic)
-        - Disabled/dynamically enabled options
+        - Disabled (``disabled_keys``) and dynamically enabled (``is_enabled``) options
         - Multi-select
         - Free text
         - Confirmation
-        - Help/Quit commands
-        - Input validation and transformation
+        - Help/Quit commands, and a Back command (``back_word`` returns ``USER_BACK``)
+        - Input validation and transformation; ``pure=True`` caches their results per
+          input for this prompt, ``pure="session"`` for every prompt of this instance
         - Timeout and masking
-        - History and fuzzy search
+        - ``line_clear``/``line_sep``/``line_end`` override the instance's output settings
+          for this prompt (None keeps them)
+        - A ``deadline`` shared by every read of the call, confirmations included. Once it
+          expires the call returns ``on_timeout()`` if given, else ``current_value`` or
+          ``default``, without asking for confirmation.
+        - A ``cancel`` token (CancelToken): cancelling it from any thread makes the call
+          return ``CANCELLED`` promptly, even while it is blocked reading input
+        - History and fuzzy search (optionally through a ``fuzzy_backend`` such as ParallelFuzzyScorer)
+        - Ranked matching on keys, labels and tags (``matcher``); pass the same ``index_cache``
+          (an IndexCache, a bounded LRU) to several calls to build each option set's index only once
+        - Metadata queries (``option_meta``: tags, aliases, description, ``field: value``):
+          ``env:prod role:db`` selects the one matching option, or in ``allow_multi``
+          all of them
+        - Paged rendering of large option sets (``page_size``)
+        - Multi-column layout fitted to the terminal width (``columns="auto"`` or a count),
+          with labels truncated to ``max_label_width``
         """
 
-        # Dynamic options: allow options to be callable to re-evaluate every time.
-        if callable(options):
-            def get_current_options():
-                opts = options()
-                return dict(opts) if not isinstance(opts, dict) else opts
-        else:
-            _static_opts = dict(options) if options else {}
-            def get_current_options():
-                return _static_opts
-
-        if fuzzy_match:
-            import difflib    # For close match suggestions
+        return self.compile_prompt(
+            prompt=prompt, options=options, default=default, attempts=attempts,
+            allow_free_text=allow_free_text, validator=validator, transformer=transformer, pure=pure,
+            quit_word=quit_word, help_word=help_word, help_callback=help_callback, back_word=back_word,
+            allow_multi=allow_multi, min_choices=min_choices, max_choices=max_choices,
+            timeout_seconds=timeout_seconds, on_timeout=on_timeout, deadline=deadline, cancel=cancel,
+            disabled_keys=disabled_keys, is_enabled=is_enabled, formatter=formatter,
+            line_clear=line_clear, line_sep=line_sep, line_end=line_end,
+            max_input_len=max_input_len, page_size=page_size, columns=columns,
+            max_label_width=max_label_width, mask_input=mask_input,
+            auto_complete=auto_complete, fuzzy_match=fuzzy_match, fuzzy_cutoff=fuzzy_cutoff,
+            fuzzy_backend=fuzzy_backend, matcher=matcher, option_tags=option_tags, option_meta=option_meta,
+            index_cache=index_cache, history_file=history_file, return_format=return_format,
+            confirm=confirm, confirm_prompt=confirm_prompt, confirm_message=confirm_message,
+        ).run(current_value)
+
+    def compile_prompt(self, prompt: Optional[str] = None, **kwargs) -> Prompt:
+        """
+        Resolve a ``get_input`` call once and return a reusable ``Prompt``.
+        Takes the same arguments as ``get_input`` except ``current_value``,
+        which is given to ``Prompt.run()`` instead.
+        """
+        return Prompt(self, prompt, **kwargs)
+
+    def _run_prompt(self, p: Prompt, current_value: Optional[str] = None, *,
+                    deadline: Optional[Union[Deadline, float]] = None,
+                    cancel: Optional[CancelToken] = None):
+        """The attempt loop behind ``get_input`` and ``Prompt.run``."""
+        prompt, default, attempts, allow_free_text = p.prompt, p.default, p.attempts, p.allow_free_text
+        validator, transformer, quit_word, help_word = p.validator, p.transformer, p.quit_word, p.help_word
+        help_callback, back_word, allow_multi = p.help_callback, p.back_word, p.allow_multi
+        min_choices, max_choices, timeout_seconds, on_timeout = p.min_choices, p.max_choices, p.timeout_seconds, p.on_timeout
+        formatter, max_input_len, page_size, mask_input = p.formatter, p.max_input_len, p.page_size, p.mask_input
+        columns, max_label_width = p.columns, p.max_label_width
+        auto_complete, fuzzy_match, fuzzy_cutoff, fuzzy_backend = p.auto_complete, p.fuzzy_match, p.fuzzy_cutoff, p.fuzzy_backend
+        matcher, history_file = p.matcher, p.history_file
+        confirm, confirm_prompt, confirm_message = p.confirm, p.confirm_prompt, p.confirm_message
 
         # Optionally enable tab-completion for choices.
-        readline = None
-        if auto_complete:
-            try:
-                import readline
-            except ImportError:
-                pass # readline not available
-
-        def format_return(key):
-            # Format return value according to requested return_format.
-            if return_format == "key":
-                return key
-            if return_format == "value":
-                return current_options[key]
-            if return_format == "tuple":
-                return (key, current_options[key])
-            return key
+        readline = self._readline_module() if auto_complete else None
 
         attempts_remaining = attempts
         infinite_attempts = (attempts == -1)
 
-        formatter = formatter or self.default_formatter
-        disabled_keys = set(disabled_keys or [])
-        
         # Enable input history (if available and requested)
         if history_file and readline:
             try:
                 if os.path.exists(history_file):
                     readline.read_history_file(history_file)
             except Exception as e:
-                print(f"Warning: Could not load history file: {e}")
+                self.out(f"## Warning: Could not load history file: {e} ##")
+
+        # Nested prompts (wizards, callbacks) share the outer budget; the earliest deadline wins.
+        outer_deadline = self._active_deadline
+        self._active_deadline = Deadline.earliest(Deadline.coerce(deadline if deadline is not None else p.deadline), outer_deadline, self.deadline)
+
+        def deadline_fallback():
+            self.on_event("deadline_expired", {"prompt": prompt})
+            self._count("deadline_expired")
+            if on_timeout:
+                return on_timeout()
+            return current_value if current_value is not None else default
+
+        # Any token in effect cancels the call: its own, an enclosing prompt's, or the instance's.
+        outer_cancel = self._active_cancel
+        self._active_cancel = cancel or p.cancel or outer_cancel or self.cancel
+
+        # The prompt's output settings apply to everything written while it runs.
+        outer_lines = (self.line_clear, self.line_sep, self.line_end)
+        self.line_clear, self.line_sep, self.line_end = (
+            outer if own is None else own for own, outer in zip((p.line_clear, p.line_sep, p.line_end), outer_lines))
+
+        metrics = self.metrics
+        started = time.perf_counter() if metrics is not None else 0.0
+        shown = 0
 
         try:
             # Loop until valid input or attempts exhausted.
             while infinite_attempts or attempts_remaining > 0:
-                current_options = get_current_options()
-                # Evaluate which options are currently enabled.
-                option_enabled = {key: is_enabled(key, value) if is_enabled else True for key, value in current_options.items()}
-
-                # Map of input keys and hotkeys (1-char options)
-                processed_keys = {str(k).lower(): k for k in current_options}
-                hotkeys = {str(k)[0].lower(): k for k in current_options if isinstance(k, str) and len(str(k)) == 1}
-                option_choices = list(processed_keys.keys())
+                if self._active_cancel is not None and self._active_cancel.cancelled:
+                    raise ReceptusCancelled
+                if self._active_deadline is not None and self._active_deadline.expired():
+                    return deadline_fallback()
+                current_options = p.get_options()
+                option_enabled, processed_keys, hotkeys, complete_choices, format_return = p.tables(current_options)
+                fold_accents = getattr(current_options, "fold_accents", p.fold_accents)
 
                 if auto_complete and readline:
+                    # readline calls the completer once per state; compute matches once per text.
+                    completion_cache: Dict[str, Any] = {}
                     def completer(text, state):
-                        matches = [c for c in option_choices if c.startswith(text.lower())]
+                        if completion_cache.get("text") != text:
+                            completion_cache["text"] = text
+                            completion_cache["matches"] = complete_choices(fold(text, fold_accents))
+                        matches = completion_cache["matches"]
                         return matches[state] if state < len(matches) else None
                     readline.set_completer(completer)
                     readline.parse_and_bind('tab: complete')
 
+                if metrics is not None:
+                    render_started = time.perf_counter()
                 self._display_prompt(
                     prompt, current_options, option_enabled, formatter,
-                    allow_free_text, quit_word, help_word, current_value, default
+                    allow_free_text, quit_word, help_word, current_value, default, page_size,
+                    back_word=back_word, columns=columns, max_label_width=max_label_width,
                 )
+                if metrics is not None:
+                    metrics.observe("render_seconds", time.perf_counter() - render_started)
+                    metrics.inc("prompts_shown")
+                    shown += 1
 
                 usr_input_raw = self._read_input_with_timeout(": ", timeout_seconds, mask_input)
 
                 if usr_input_raw is None:
+                    if self._active_deadline is not None and self._active_deadline.expired():
+                        return deadline_fallback()
                     # If timed out, call handler or fallback.
                     if on_timeout:
                         return on_timeout()
@@ -508,7 +818,8 @@ class Receptus:
                 #         help_callback()
                 #     continue
                 quit_help_result = self._handle_quit_and_help(
-                    usr_input_lower, quit_word, help_word, help_callback, confirm, confirm_prompt
+                    usr_input_lower, quit_word, help_word, help_callback, confirm, confirm_prompt,
+                    back_word=back_word,
                 )
                 if quit_help_result == "retry":
                     if not infinite_attempts:
@@ -526,6 +837,7 @@ class Receptus:
                         "reason": "Input too long",
                         "max_len": max_input_len,
                     })
+                    self._count("invalid_inputs", "Input too long")
                     if not infinite_attempts:
                         attempts_remaining -= 1
                     continue
@@ -547,6 +859,7 @@ class Receptus:
                     if allow_free_text and not current_options:
                         return ""
                     self.out(f'## No input provided and no default/current value available. ##\n')
+                    self._count("invalid_inputs", "No input")
                     if not infinite_attempts:
                         attempts_remaining -= 1
                     continue
@@ -585,10 +898,11 @@ class Receptus:
                 #     if not infinite_attempts:
                 #         attempts_remaining -= 1
                 #     continue
+                meta_index = p.meta_index(current_options)
                 if allow_multi and processed_keys:
                     result = self._handle_multi_select(
                         usr_input_cleaned, processed_keys, hotkeys, option_enabled, formatter,
-                        min_choices, max_choices, format_return
+                        min_choices, max_choices, format_return, meta_index=meta_index, fold_accents=fold_accents
                     )
                     if result is not None and self._confirm_value(result, confirm, confirm_prompt, confirm_message):
                         return result
@@ -624,10 +938,17 @@ class Receptus:
                 #     if not infinite_attempts:
                 #         attempts_remaining -= 1
                 #     continue
+                match_index = p.match_index(current_options)
                 result = self._handle_single_select(
                     usr_input_cleaned, processed_keys, hotkeys, option_enabled, formatter,
-                    fuzzy_match, fuzzy_cutoff, current_options, format_return
+                    fuzzy_match, fuzzy_cutoff, current_options, format_return,
+                    matcher=matcher or None, match_index=match_index, fuzzy_backend=fuzzy_backend,
+                    meta_index=meta_index, fold_accents=fold_accents
                 )
+                if result is _REJECTED:
+                    if not infinite_attempts:
+                        attempts_remaining -= 1
+                    continue
                 if result is not None and self._confirm_value(result, confirm, confirm_prompt, confirm_message):
                     return result
                 if result is not None:
@@ -672,8 +993,10 @@ class Receptus:
                 self.on_event("input_invalid", {
                     "input": usr_input_cleaned,
                     "reason": "Unknown option",
-                    "valid_keys": list(current_options.keys())
+                    # Catalogs pass a lazy keys view rather than copying every key.
+                    "valid_keys": current_options.keys() if isinstance(current_options, BaseCatalog) else list(current_options.keys())
                 })
+                self._count("invalid_inputs", "Unknown option")
                 if not infinite_attempts:
                     attempts_remaining -= 1
 
@@ -681,8 +1004,21 @@ class Receptus:
             if not infinite_attempts and attempts > 0:
                 self.out(f'## Maximum attempts reached. ##\n')
             return current_value if current_value is not None else default
-        
+
+        except ReceptusCancelled:
+            token = self._active_cancel
+            self.on_event("cancelled", {"prompt": prompt, "reason": token.reason if token is not None else None})
+            self._count("cancelled")
+            return self.CANCELLED
+
         finally:
+            self._active_deadline = outer_deadline
+            self._active_cancel = outer_cancel
+            self.line_clear, self.line_sep, self.line_end = outer_lines
+            if metrics is not None:
+                metrics.observe("prompt_attempts", shown)
+                metrics.observe("answer_seconds", time.perf_counter() - started)
+
             # Always clear readline completer and save history if needed
             if auto_complete and readline:
                 readline.set_completer(None)
@@ -691,4 +1027,203 @@ class Receptus:
                 try:
                     readline.write_history_file(history_file)
                 except Exception as e:
-                    print(f"Warning: Could not save history file: {e}")
\ No newline at end of file
+                    self.out(f"## Warning: Could not save history file: {e} ##")
+
+    def tree_select(
+            self,
+            prompt: Optional[str] = None,
+            options: Optional[Any] = None,
+            back_word: Optional[str] = "back",
+            max_nodes: int = 10_000,
+            breadcrumb_sep: str = " > ",
+            **kwargs,
+        ) -> Union[Tuple[Any, ...], None, UserQuit, Cancelled]:
+        """
+        Walk nested options one level at a time and return the path of keys
+        to the chosen leaf, e.g. ``("eu", "eu-1", "node-3")``.
+
+        ``options`` is an ``OptionTree`` or anything it accepts: a mapping whose
+        values are labels (leaves) or ``OptionGroup`` branches with lazily
+        loaded children. A breadcrumb of the current path is shown above the
+        prompt and ``back_word`` returns to the parent level. Extra keyword
+        arguments are passed to ``get_input`` for every level.
+        """
+        tree = options if isinstance(options, OptionTree) else OptionTree(options or {}, max_nodes=max_nodes)
+        kwargs.pop("return_format", None)  # navigation needs keys; the result is always a key path
+        path: List[Any] = []
+        while True:
+            level = tree.children(path)
+            shown = {key: f"{node.label}{breadcrumb_sep.rstrip()}" if isinstance(node, OptionGroup) else node
+                     for key, node in level.items()}
+            crumbs = tree.labels(path)
+            heading = breadcrumb_sep.join(crumbs) if crumbs else None
+            if prompt and heading:
+                heading = f"{heading}\n{prompt}"
+            choice = self.get_input(
+                prompt=heading or prompt, options=shown,
+                back_word=back_word if path else None, **kwargs
+            )
+            if choice is self.USER_BACK:
+                path.pop()
+                continue
+            if choice is None or choice is self.USER_QUIT or choice is self.CANCELLED:
+                return choice
+            path.append(choice)
+            if not isinstance(level[choice], OptionGroup):
+                return tuple(path)
+
+    def search_select(
+            self,
+            prompt: Optional[str] = None,
+            options: Optional[OptionsType] = None,
+            top_n: int = 10,
+            match_labels: bool = True,
+            is_enabled: Optional[Callable[[Any, Any], bool]] = None,
+            formatter: Optional[Callable[[str, str], str]] = None,
+            return_format: str = "key",
+            **kwargs,
+        ) -> Union[Any, None, UserQuit, Cancelled]:
+        """
+        Select an option by typing: every keystroke narrows the candidates and
+        only the top ``top_n`` matches are redrawn. Up/Down move the highlight,
+        Enter selects, Escape quits.
+
+        Unless the input backend is the console on a terminal (with termios),
+        this falls back to the line-based ``get_input``, and extra keyword
+        arguments are passed through to it. The keystroke mode honours
+        ``disabled_keys``, ``default``, ``timeout_seconds`` (for the whole
+        selection), ``on_timeout``, ``deadline`` and ``cancel``, and rejects
+        any other ``get_input`` argument with TypeError.
+        """
+        try:
+            import termios
+            import tty
+        except ImportError:
+            termios = None  # type: ignore[assignment]
+        if termios is None or not self._on_console() or not sys.stdin.isatty():
+            return self.get_input(
+                prompt=prompt, options=options, is_enabled=is_enabled,
+                formatter=formatter, return_format=return_format, **kwargs
+            )
+        unsupported = set(kwargs) - _SEARCH_KWARGS
+        if unsupported:
+            raise TypeError(f"search_select does not support {', '.join(sorted(unsupported))} in keystroke mode; "
+                            f"use get_input instead")
+
+        disabled = frozenset(kwargs.get("disabled_keys") or ())
+        if disabled:
+            user_enabled = is_enabled
+
+            def is_enabled(key, value):
+                return key not in disabled and (user_enabled is None or user_enabled(key, value))
+
+        opts = options() if callable(options) else options
+        if not isinstance(opts, (dict, BaseCatalog)):
+            opts = dict(opts or {})
+
+        timeout_seconds = kwargs.get("timeout_seconds")
+        deadline = Deadline.earliest(Deadline.coerce(kwargs.get("deadline")), self._active_deadline, self.deadline,
+                                     Deadline(timeout_seconds) if timeout_seconds is not None else None)
+        token = kwargs.get("cancel") or self._active_cancel or self.cancel
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        keys = read_keys(fd, deadline, token)
+        try:
+            tty.setcbreak(fd)
+            return self._search_loop(
+                prompt, opts, keys, top_n, match_labels,
+                is_enabled, formatter or self.default_formatter, return_format
+            )
+        except ReceptusTimeout:
+            self.on_event("deadline_expired", {"prompt": prompt})
+            self._count("deadline_expired")
+            on_timeout = kwargs.get("on_timeout")
+            return on_timeout() if on_timeout else kwargs.get("default")
+        except ReceptusCancelled:
+            self.on_event("cancelled", {"prompt": prompt, "reason": token.reason if token is not None else None})
+            self._count("cancelled")
+            return self.CANCELLED
+        finally:
+            keys.close()
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+    def _on_console(self) -> bool:
+        """Whether reads go to ConsoleInput (through wrappers such as the profiler's)."""
+        backend: Any = self.input_backend
+        while not isinstance(backend, ConsoleInput):
+            backend = getattr(backend, "backend", None)
+            if not isinstance(backend, InputBackend):
+                return False
+        return True
+
+    def _search_loop(self, prompt, options, keys, top_n, match_labels, is_enabled, formatter, return_format):
+        """Drive an IncrementalFilter from a stream of key tokens (see ``search.read_keys``)."""
+        flt = IncrementalFilter(options, match_labels=match_labels, fold_accents=bool(self.force_ascii))
+        catalog = options if isinstance(options, BaseCatalog) else None
+        query = ""
+        selected = 0
+        drawn = 0
+        status = ""
+
+        def enabled(pos):
+            if catalog is not None and not catalog.is_enabled_at(pos):
+                return False
+            return is_enabled(flt.key_at(pos), flt.label_at(pos)) if is_enabled else True
+
+        if prompt:
+            self.out(f'\n{prompt}')
+
+        while True:
+            visible = flt.top(top_n)
+            selected = min(selected, max(len(visible) - 1, 0))
+
+            # Build the whole frame, then replace the previous one with a single write.
+            lines = [f"> {query}"]
+            for row, pos in enumerate(visible):
+                marker = ">" if row == selected else " "
+                text = self.sanitize_input(f"  {marker} ({flt.key_at(pos)}) {resolve_label(flt.label_at(pos))}")
+                if not enabled(pos):
+                    lines.append(formatter(f"{text} [DISABLED]", "disabled_option"))
+                else:
+                    lines.append(formatter(text, "selected" if row == selected else "option"))
+            lines.append(status or f"  {flt.count()} of {len(flt)} options")
+            frame = "\033[J" + "\n".join(lines) + "\n"
+            if drawn:
+                frame = f"\033[{drawn}F" + frame
+            self.output_backend.write(frame)
+            self.output_backend.flush()
+            drawn = len(lines)
+            status = ""
+
+            key = next(keys, None)
+            if key is None:
+                return None
+            if key == KEY_ESCAPE:
+                return self.USER_QUIT
+            if key == KEY_ENTER:
+                if not visible:
+                    status = "  No matching option."
+                    continue
+                pos = visible[selected]
+                if not enabled(pos):
+                    status = formatter(f"  Option '{flt.key_at(pos)}' is disabled.", "error")
+                    continue
+                self.on_event("input_received", {"raw": query, "cleaned": query, "prompt": prompt})
+                key_value = flt.key_at(pos)
+                if return_format == "value":
+                    return resolve_label(flt.label_at(pos))
+                if return_format == "tuple":
+                    return (key_value, resolve_label(flt.label_at(pos)))
+                return key_value
+            if key == KEY_UP:
+                selected = max(selected - 1, 0)
+            elif key == KEY_DOWN:
+                selected = min(selected + 1, max(len(visible) - 1, 0))
+            elif key in (KEY_BACKSPACE, KEY_CLEAR):
+                query = query[:-1] if key == KEY_BACKSPACE else ""
+                flt.update(query)
+                selected = 0
+            elif len(key) == 1:
+                query += key
+                flt.update(query)
+                selected = 0
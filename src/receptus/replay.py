@@ -0,0 +1,232 @@
+##
+## Receptus - session record and replay
+##
+## ``Recorder`` wraps a Receptus's backends and ``on_event`` hook and appends
+## every rendered frame, every input line (with the time the operator took
+## to type it) and every event to a compact JSONL log, one record per line:
+##
+##     {"k":"hdr","v":1}                      header
+##     {"k":"out","t":0.0012,"d":"..."}       frame written
+##     {"k":"in","t":2.31,"dt":2.30,"d":"b"}  line read, dt = think time
+##     {"k":"timeout","t":..,"dt":..}         timed read that expired
+##     {"k":"eof","t":..}                     input exhausted
+##     {"k":"ev","t":..,"e":"...","c":{..}}   on_event call
+##
+## ``replay()`` feeds the log back through the same flow, at full speed or in
+## real time, and raises ``ReplayMismatch`` if the output or events differ.
+##
+
+
+import json
+import time
+from typing import IO, Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from .backends import InputBackend, OutputBackend, MemoryOutput, ReceptusTimeout
+
+LOG_VERSION = 1
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=repr))
+
+
+class Recorder:
+    """
+    Append-only session log. ``attach(receptus)`` starts recording a
+    Receptus; ``close()`` (or leaving the ``with`` block) flushes the file.
+    """
+
+    def __init__(self, target: Union[str, IO[str]]):
+        if isinstance(target, str):
+            self._file: IO[str] = open(target, "a", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+        self._start = time.monotonic()
+        self.write({"k": "hdr", "v": LOG_VERSION})
+
+    def elapsed(self) -> float:
+        return round(time.monotonic() - self._start, 6)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=repr) + "\n")
+
+    def attach(self, receptus) -> "Recorder":
+        receptus.input_backend = RecordingInput(receptus.input_backend, self)
+        receptus.output_backend = RecordingOutput(receptus.output_backend, self)
+        receptus.line_output = receptus.output_backend
+        on_event = receptus.on_event
+
+        def record_event(event_type, context):
+            self.write({"k": "ev", "t": self.elapsed(), "e": event_type, "c": context})
+            on_event(event_type, context)
+
+        receptus.on_event = record_event
+        return self
+
+    def close(self) -> None:
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingInput(InputBackend):
+    """Wrap an input backend, logging each line and the time taken to enter it."""
+
+    def __init__(self, backend: InputBackend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def _read(self, read, *args):
+        asked = time.monotonic()
+        try:
+            line = read(*args)
+        except ReceptusTimeout:
+            self.recorder.write({"k": "timeout", "t": self.recorder.elapsed(),
+                                 "dt": round(time.monotonic() - asked, 6)})
+            raise
+        except EOFError:
+            self.recorder.write({"k": "eof", "t": self.recorder.elapsed()})
+            raise
+        self.recorder.write({"k": "in", "t": self.recorder.elapsed(),
+                             "dt": round(time.monotonic() - asked, 6), "d": line})
+        return line
+
+    def readline(self, prompt):
+        return self._read(self.backend.readline, prompt)
+
+    def read_secret(self, prompt):
+        return self._read(self.backend.read_secret, prompt)
+
+    def read_secret_timeout(self, prompt, timeout):
+        return self._read(self.backend.read_secret_timeout, prompt, timeout)
+
+    def readline_timeout(self, prompt, timeout):
+        return self._read(self.backend.readline_timeout, prompt, timeout)
+
+    def readline_cancellable(self, prompt, timeout, token):
+        return self._read(self.backend.readline_cancellable, prompt, timeout, token)
+
+    def readline_module(self):
+        return self.backend.readline_module()
+
+
+class RecordingOutput(OutputBackend):
+    """Wrap an output backend, logging every frame written."""
+
+    def __init__(self, backend: OutputBackend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def write(self, text):
+        self.recorder.write({"k": "out", "t": self.recorder.elapsed(), "d": text})
+        self.backend.write(text)
+
+    def flush(self):
+        self.backend.flush()
+
+    def isatty(self):
+        return self.backend.isatty()
+
+
+def load_log(source: Union[str, IO[str]]) -> List[Dict[str, Any]]:
+    """Read a session log into a list of records."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            return load_log(f)
+    records = [json.loads(line) for line in source if line.strip()]
+    if not records or records[0].get("k") != "hdr":
+        raise ValueError("not a Receptus session log")
+    if records[0].get("v") != LOG_VERSION:
+        raise ValueError(f"unsupported session log version: {records[0].get('v')}")
+    return records
+
+
+class ReplayInput(InputBackend):
+    """
+    Serve the input records of a log in order. With ``realtime``, each read
+    waits for the recorded think time (divided by ``speed``) first.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], realtime: bool = False, speed: float = 1.0):
+        self._inputs = iter([r for r in records if r["k"] in ("in", "timeout", "eof")])
+        self.realtime = realtime
+        self.speed = speed
+        self.consumed = 0
+
+    def _next(self):
+        record = next(self._inputs, None)
+        if record is None:
+            raise EOFError("session log exhausted")
+        self.consumed += 1
+        if self.realtime and record.get("dt"):
+            time.sleep(record["dt"] / self.speed)
+        if record["k"] == "timeout":
+            raise ReceptusTimeout
+        if record["k"] == "eof":
+            raise EOFError
+        return record["d"]
+
+    def readline(self, prompt):
+        return self._next()
+
+    def readline_timeout(self, prompt, timeout):
+        return self._next()
+
+
+class ReplayMismatch(AssertionError):
+    """Raised when a replayed session diverges from its recording."""
+    pass
+
+
+class ReplayResult(NamedTuple):
+    result: Any
+    output: str
+    events: List[tuple]
+    inputs: int
+    elapsed: float
+
+
+def _first_difference(expected: str, actual: str) -> str:
+    pos = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+    return f"output differs at offset {pos}: expected {expected[pos:pos + 60]!r}, got {actual[pos:pos + 60]!r}"
+
+
+def replay(source: Union[str, IO[str], List[Dict[str, Any]]], flow: Callable[[Any], Any], *,
+           realtime: bool = False, speed: float = 1.0, check: bool = True,
+           receptus_factory: Optional[Callable[..., Any]] = None, **receptus_kwargs) -> ReplayResult:
+    """
+    Run ``flow(receptus)`` against a recorded session and return what it
+    produced. ``flow`` is the same code that ran during recording. With
+    ``check``, a ``ReplayMismatch`` is raised unless the output and events
+    match the log exactly.
+    """
+    from .receptus import Receptus
+
+    records = source if isinstance(source, list) else load_log(source)
+    events: List[tuple] = []
+    inp = ReplayInput(records, realtime=realtime, speed=speed)
+    out = MemoryOutput()
+    receptus = (receptus_factory or Receptus)(input_backend=inp, output_backend=out,
+                                              on_event=lambda e, c: events.append((e, _jsonable(c))),
+                                              **receptus_kwargs)
+    started = time.perf_counter()
+    result = flow(receptus)
+    elapsed = time.perf_counter() - started
+
+    replayed = ReplayResult(result, out.getvalue(), events, inp.consumed, elapsed)
+    if check:
+        expected = "".join(r["d"] for r in records if r["k"] == "out")
+        if replayed.output != expected:
+            raise ReplayMismatch(_first_difference(expected, replayed.output))
+        expected_events = [(r["e"], r["c"]) for r in records if r["k"] == "ev"]
+        if events != expected_events:
+            raise ReplayMismatch(f"events differ: expected {expected_events!r}, got {events!r}")
+    return replayed
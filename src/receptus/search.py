@@ -0,0 +1,189 @@
+##
+## Receptus - search-as-you-type filtering
+##
+## ``IncrementalFilter`` keeps a stack of result sets, one per query typed so
+## far. Appending a character can only shrink the matches for a substring
+## query, so each keystroke filters the previous result set instead of the
+## full option set; backspace simply pops back to an earlier result.
+##
+## ``read_keys`` turns a terminal file descriptor in cbreak mode into a
+## stream of key tokens for ``Receptus.search_select``.
+##
+
+
+import os
+import select
+from typing import Any, Generator, Iterator, List, Mapping, Optional, Tuple
+
+from .backends import ReceptusCancelled, ReceptusTimeout
+from .catalog import BaseCatalog
+from .deadline import Deadline
+from .lazy import label_text
+from .normalize import fold
+
+
+# Key tokens produced by read_keys() besides plain printable characters.
+KEY_ENTER = "enter"
+KEY_BACKSPACE = "backspace"
+KEY_UP = "up"
+KEY_DOWN = "down"
+KEY_ESCAPE = "escape"
+KEY_CLEAR = "clear"
+
+_ESCAPES = {"[A": KEY_UP, "[B": KEY_DOWN, "OA": KEY_UP, "OB": KEY_DOWN}
+
+
+class IncrementalFilter:
+    """
+    Narrow an option set one keystroke at a time.
+
+    Each candidate is a ``(position, haystack)`` pair where the haystack is
+    the folded key (plus the folded label when ``match_labels``). The
+    haystacks are computed once, on the first keystroke, and carried along
+    with the survivors of every later filter pass.
+    """
+
+    def __init__(self, options: Mapping, match_labels: bool = True, fold_accents: bool = False):
+        if isinstance(options, BaseCatalog):
+            self._catalog: Optional[BaseCatalog] = options
+        else:
+            self._catalog = None
+            self._items: List[Tuple[Any, Any]] = list(options.items())
+        self.options = options
+        self.match_labels = match_labels
+        self.fold_accents = getattr(options, "fold_accents", fold_accents)
+        self._stack: List[Tuple[str, List[Tuple[int, str]]]] = []
+
+    def __len__(self):
+        return len(self.options)
+
+    def key_at(self, pos: int) -> Any:
+        return self._catalog.key_at(pos) if self._catalog is not None else self._items[pos][0]
+
+    def label_at(self, pos: int) -> Any:
+        return self._catalog.label_at(pos) if self._catalog is not None else self._items[pos][1]
+
+    def _haystack(self, pos: int) -> str:
+        key = fold(str(self.key_at(pos)), self.fold_accents)
+        if self.match_labels:
+            return f"{key}\0{fold(label_text(self.label_at(pos)), self.fold_accents)}"
+        return key
+
+    @property
+    def query(self) -> str:
+        return self._stack[-1][0] if self._stack else ""
+
+    def update(self, query: str) -> List[Tuple[int, str]]:
+        """Set the current query and return the matching candidates."""
+        query = fold(query, self.fold_accents)
+        # Drop result sets that are not a prefix of the new query (backspace/edit).
+        while self._stack and not query.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        if not query:
+            return []
+        if self._stack and self._stack[-1][0] == query:
+            return self._stack[-1][1]
+        if self._stack:
+            candidates = [c for c in self._stack[-1][1] if query in c[1]]
+        elif self._catalog is not None and hasattr(self._catalog, "search"):
+            # Vectorized first pass (NumpyCatalog): haystacks only for the survivors.
+            candidates = [(pos, self._haystack(pos)) for pos in self._catalog.search(query, self.match_labels).tolist()]
+        else:
+            candidates = []
+            for pos in range(len(self)):
+                hay = self._haystack(pos)
+                if query in hay:
+                    candidates.append((pos, hay))
+        self._stack.append((query, candidates))
+        return candidates
+
+    def top(self, n: int) -> List[int]:
+        """
+        Return up to ``n`` positions for the current query: key-prefix
+        matches first, then other matches, each in option order.
+        """
+        if not self._stack:
+            return list(range(min(n, len(self))))
+        query, candidates = self._stack[-1]
+        best: List[int] = []
+        rest: List[int] = []
+        for pos, hay in candidates:
+            if hay.startswith(query):
+                best.append(pos)
+                if len(best) == n:
+                    return best
+            elif len(rest) < n:
+                rest.append(pos)
+        return (best + rest)[:n]
+
+    def count(self) -> int:
+        return len(self._stack[-1][1]) if self._stack else len(self)
+
+
+def read_keys(fd: int, deadline: Optional[Deadline] = None, token=None) -> Generator[str, None, None]:
+    """
+    Yield key tokens from a terminal in cbreak mode: printable characters
+    as-is, and the ``KEY_*`` names for editing and navigation keys. Raises
+    ReceptusTimeout once ``deadline`` expires and ReceptusCancelled as soon
+    as ``token`` (a CancelToken) is cancelled.
+    """
+    if token is None:
+        yield from _key_tokens(fd, [fd], deadline, None)
+        return
+    wake_r, wake_w = os.pipe()
+
+    def wake():
+        try:
+            os.write(wake_w, b"\0")
+        except OSError:
+            pass
+
+    token.add_callback(wake)
+    try:
+        yield from _key_tokens(fd, [fd, wake_r], deadline, token)
+    finally:
+        token.remove_callback(wake)
+        os.close(wake_r)
+        os.close(wake_w)
+
+
+def _key_tokens(fd: int, watched: List[int], deadline: Optional[Deadline], token) -> Iterator[str]:
+    pending = b""
+    while True:
+        if deadline is not None or token is not None:
+            wait = deadline.remaining() if deadline is not None else None
+            if wait is not None and wait <= 0:
+                raise ReceptusTimeout
+            ready, _, _ = select.select(watched, [], [], wait)
+            if token is not None and token.cancelled:
+                raise ReceptusCancelled
+            if fd not in ready:
+                continue
+        chunk = os.read(fd, 32)
+        if not chunk:
+            return
+        pending += chunk
+        try:
+            text = pending.decode("utf-8")
+        except UnicodeDecodeError:
+            continue  # incomplete multi-byte character
+        pending = b""
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if ch == "\x1b":
+                seq = text[i + 1:i + 3]
+                if seq in _ESCAPES:
+                    yield _ESCAPES[seq]
+                    i += 3
+                    continue
+                yield KEY_ESCAPE
+            elif ch in ("\r", "\n"):
+                yield KEY_ENTER
+            elif ch in ("\x7f", "\x08"):
+                yield KEY_BACKSPACE
+            elif ch == "\x15":
+                yield KEY_CLEAR
+            elif ch.isprintable():
+                yield ch
+            i += 1
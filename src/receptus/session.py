@@ -0,0 +1,249 @@
+##
+## Receptus - networked prompt sessions
+##
+## ``PromptServer`` accepts connections on a Unix socket or a localhost TCP
+## port and runs one ``PromptSession`` per connection. All socket I/O stays
+## on a single asyncio event loop; the (blocking) prompt logic of each
+## session runs on a worker thread and reaches its connection through
+## thread-safe bridges onto the loop.
+##
+## Each session has its own input/output streams, history, completer and
+## options cache, so concurrent operators never see each other's state.
+##
+
+
+import asyncio
+import concurrent.futures
+import os
+import stat
+from typing import Any, Callable, Dict, List, Optional, Set, cast
+
+from .backends import InputBackend, OutputBackend, ReceptusTimeout, ReceptusCancelled, _wait_for
+from .cancel import CancelToken
+from .receptus import Receptus
+
+
+class SessionReadline:
+    """
+    Per-session stand-in for the ``readline`` module: keeps history and the
+    completer on the session instead of in process-global state.
+    """
+
+    def __init__(self, history_length: int = 1000):
+        self.history: List[str] = []
+        self.history_length = history_length
+        self.completer: Optional[Callable[[str, int], Optional[str]]] = None
+
+    def set_completer(self, completer=None):
+        self.completer = completer
+
+    def get_completer(self):
+        return self.completer
+
+    def parse_and_bind(self, _binding):
+        pass
+
+    def add_history(self, line: str):
+        if line:
+            self.history.append(line)
+            del self.history[:-self.history_length]
+
+    def read_history_file(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            self.history = [line.rstrip("\n") for line in f][-self.history_length:]
+
+    def write_history_file(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in self.history)
+
+    def complete(self, text: str) -> List[str]:
+        """All completions for ``text`` from the current completer."""
+        matches: List[str] = []
+        while self.completer is not None:
+            match = self.completer(text, len(matches))
+            if match is None:
+                break
+            matches.append(match)
+        return matches
+
+
+class _LoopOutput(OutputBackend):
+    """Output whose writes are handed to an asyncio StreamWriter on its loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter, encoding: str = "utf-8"):
+        self._loop = loop
+        self._writer = writer
+        self.encoding = encoding
+
+    def write(self, text: str) -> None:
+        self._loop.call_soon_threadsafe(self._send, text.encode(self.encoding, "replace"))
+
+    def _send(self, data: bytes):
+        if not self._writer.is_closing():
+            self._writer.write(data)
+
+
+class _LoopInput(InputBackend):
+    """
+    Lines read from an asyncio StreamReader by a worker thread. Prompts go to
+    ``output``; every line read is added to the session history.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, reader: asyncio.StreamReader,
+                 output: OutputBackend, readline: SessionReadline):
+        self._loop = loop
+        self._reader = reader
+        self._output = output
+        self._readline = readline
+
+    def readline_timeout(self, prompt: str, timeout: Optional[float]) -> str:
+        return self.readline_cancellable(prompt, timeout, None)
+
+    def readline_cancellable(self, prompt: str, timeout: Optional[float], token) -> str:
+        self._output.write(prompt)
+        future = asyncio.run_coroutine_threadsafe(self._reader.readline(), self._loop)
+        try:
+            data = _wait_for(future, timeout, token)
+        except (ReceptusTimeout, ReceptusCancelled):
+            future.cancel()  # buffered bytes stay in the reader for the next prompt
+            raise
+        if not data:
+            raise EOFError("client disconnected")
+        line = data.decode("utf-8", "replace").rstrip("\r\n")
+        self._readline.add_history(line)
+        return line
+
+    def readline(self, prompt: str) -> str:
+        # A line-based socket cannot suppress the client's local echo, so
+        # read_secret() falls back to this too.
+        return self.readline_timeout(prompt, None)
+
+    def readline_module(self):
+        return self._readline
+
+
+class PromptSession(Receptus):
+    """
+    A Receptus bound to one client connection. Must be driven from a worker
+    thread (as ``PromptServer`` does), never from the event loop thread.
+    Each session has its own ``cancel`` token, so a prompt blocked on one
+    client can be aborted without touching the others. ``width`` is the
+    client's terminal width, used for multi-column layouts.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, *, ansi: bool = False, width: int = 80, **kwargs):
+        kwargs.setdefault("force_no_color", not ansi)
+        kwargs.setdefault("cancel", CancelToken())
+        readline = SessionReadline()
+        output = _LoopOutput(loop, writer)
+        super().__init__(input_backend=_LoopInput(loop, reader, output, readline), output_backend=output, **kwargs)
+        self.loop = loop
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self.readline = readline
+        self.cache: Dict[Any, Any] = {}
+        self.ansi = ansi
+        self.width = width
+
+    def supports_ansi(self):
+        return self.ansi
+
+    def terminal_width(self):
+        return self.width
+
+    def cached(self, name: Any, factory: Callable[[], Any]) -> Any:
+        """Return the session-local value for ``name``, building it on first use."""
+        if name not in self.cache:
+            self.cache[name] = factory()
+        return self.cache[name]
+
+
+class PromptServer:
+    """
+    Serve ``handler(session)`` to every client that connects.
+
+    ``handler`` is an ordinary blocking function that calls
+    ``session.get_input(...)`` as often as it likes; it runs on a thread
+    pool of ``max_sessions`` workers. Extra keyword arguments are passed to
+    each ``PromptSession``.
+    """
+
+    def __init__(self, handler: Callable[[PromptSession], Any], *, max_sessions: int = 256, **session_kwargs):
+        self.handler = handler
+        self.max_sessions = max_sessions
+        self.session_kwargs = session_kwargs
+        self.sessions: Set[PromptSession] = set()
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_sessions,
+                                                               thread_name_prefix="receptus-session")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        session = PromptSession(loop, reader, writer, **self.session_kwargs)
+        self.sessions.add(session)
+        task = cast("asyncio.Task[Any]", asyncio.current_task())  # start_server runs each client in a task
+        self._tasks.add(task)
+        try:
+            await loop.run_in_executor(self._executor, self.handler, session)
+        except (EOFError, ConnectionError):
+            pass  # client went away mid-prompt
+        except Exception as e:
+            session.on_event("session_error", {"peer": session.peer, "error": repr(e)})
+        finally:
+            self.sessions.discard(session)
+            self._tasks.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Listen on a TCP port (localhost by default; port 0 picks a free port)."""
+        self._server = await asyncio.start_server(self._serve, host, port, backlog=self.max_sessions)
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Listen on a Unix domain socket, replacing a stale socket file. Raises
+        FileExistsError if ``path`` exists and is not a socket.
+        """
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{path}: exists and is not a socket")
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._serve, path, backlog=self.max_sessions)
+        return self._server
+
+    @property
+    def address(self):
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        """
+        Stop accepting clients, disconnect the remaining ones (their pending
+        prompts return ``CANCELLED``) and wait for every handler to finish.
+        """
+        if self._server is not None:
+            self._server.close()
+        for session in list(self.sessions):
+            session.cancel.cancel("server closing")
+            session.writer.close()
+            session.reader.feed_eof()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
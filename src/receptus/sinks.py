@@ -0,0 +1,155 @@
+##
+## Receptus - event sinks
+##
+## ``JsonlEventSink`` is a ready-made ``on_event`` handler that appends one
+## JSON object per event to a file. Events are serialized into an in-memory
+## buffer; the file is only touched when the buffer passes ``flush_bytes``,
+## when ``flush_interval`` seconds have passed (checked by a background
+## thread, so an idle prompt still gets its events written), and at exit.
+## Files are rotated by size, keeping at most ``backups`` old files.
+##
+## orjson is used for serialization when installed, json otherwise.
+##
+
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections.abc import Set, KeysView, ValuesView, ItemsView
+from itertools import islice
+from typing import Any, BinaryIO, Callable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]  # fall back to the json module
+
+MAX_ITEMS = 1000  # lazy collections (e.g. a catalog's keys view) are logged up to this many items
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (Set, KeysView, ValuesView, ItemsView)):
+        return list(islice(obj, MAX_ITEMS))
+    return repr(obj)
+
+
+def dumps_line(record: dict) -> bytes:
+    """Serialize ``record`` as one compact JSON line (bytes, newline included)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # e.g. non-string dict keys; json copes with those
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8") + b"\n"
+
+
+class JsonlEventSink:
+    """
+    Buffered, rotating JSON Lines writer for ``Receptus(on_event=...)``.
+    Each line is ``{"ts": <unix time>, "event": <type>, "data": <context>}``.
+    Safe to share between threads and ``Receptus`` instances.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            *,
+            max_bytes: int = 10 * 1024 * 1024,
+            backups: int = 5,
+            flush_bytes: int = 64 * 1024,
+            flush_interval: Optional[float] = 1.0,
+            clock: Callable[[], float] = time.time,
+            ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self._closed = False
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="receptus-event-sink", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def __call__(self, event_type: str, context: dict) -> None:
+        line = dumps_line({"ts": self.clock(), "event": event_type, "data": context})
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= self.flush_bytes:
+                self._write_buffer()
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+        return self._file
+
+    def _write_buffer(self) -> None:
+        # Caller holds the lock.
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        f = self._open()
+        if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+            f = self._open()
+        f.write(data)
+        f.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out buffered events now."""
+        with self._lock:
+            if not self._closed:
+                self._write_buffer()
+
+    def close(self) -> None:
+        """Flush and close the file. Later events are dropped."""
+        self._stop.set()
+        with self._lock:
+            if self._closed:
+                return
+            self._write_buffer()
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
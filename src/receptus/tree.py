@@ -0,0 +1,88 @@
+##
+## Receptus - hierarchical options
+##
+## An option value may be an ``OptionGroup`` instead of a label: a branch
+## whose children come from a provider that is only called when the user
+## drills into it. ``OptionTree`` caches each loaded level by its path and
+## evicts the least recently visited levels once the cached node count
+## exceeds ``max_nodes``, never evicting the levels on the current path.
+## Memory and load time therefore follow the path the user walks, not the
+## size of the whole tree.
+##
+
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+ChildrenType = Union[Dict[Any, Any], Sequence[tuple]]
+
+
+class OptionGroup:
+    """
+    A labelled branch. ``children`` is an options mapping (values are labels
+    or nested groups) or a zero-argument callable returning one.
+    """
+
+    __slots__ = ("label", "children")
+
+    def __init__(self, label: str, children: Union[ChildrenType, Callable[[], ChildrenType]]):
+        self.label = label
+        self.children = children
+
+    def load(self) -> Dict[Any, Any]:
+        children = self.children() if callable(self.children) else self.children
+        return children if isinstance(children, dict) else dict(children)
+
+    def __str__(self):
+        return self.label
+
+    def __repr__(self):
+        return f"<OptionGroup {self.label!r}>"
+
+
+class OptionTree:
+    """LRU cache of loaded levels, keyed by the path of keys leading to them."""
+
+    def __init__(self, root: Union[ChildrenType, Callable[[], ChildrenType], OptionGroup],
+                 max_nodes: int = 10_000):
+        self.root = root if isinstance(root, OptionGroup) else OptionGroup("", root)
+        self.max_nodes = max_nodes
+        self._levels: "OrderedDict[Tuple, Dict[Any, Any]]" = OrderedDict()
+        self.cached_nodes = 0
+        self.loads = 0
+
+    def children(self, path: Sequence[Any] = ()) -> Dict[Any, Any]:
+        """The options at ``path``, loading (and caching) every missing level on the way."""
+        path = tuple(path)
+        level = self._levels.get(path)
+        if level is not None:
+            self._levels.move_to_end(path)
+            return level
+        if path:
+            node = self.children(path[:-1])[path[-1]]
+            if not isinstance(node, OptionGroup):
+                raise KeyError(f"{path[-1]!r} is not a group")
+        else:
+            node = self.root
+        level = node.load()
+        self.loads += 1
+        self._levels[path] = level
+        self.cached_nodes += len(level)
+        self._evict(pinned={path[:i] for i in range(len(path) + 1)})
+        return level
+
+    def _evict(self, pinned: Iterable[Tuple]) -> None:
+        pinned = set(pinned)
+        for cached_path in list(self._levels):
+            if self.cached_nodes <= self.max_nodes:
+                break
+            if cached_path not in pinned:
+                self.cached_nodes -= len(self._levels.pop(cached_path))
+
+    def labels(self, path: Sequence[Any]) -> Tuple[str, ...]:
+        """Labels of the groups along ``path``, for breadcrumbs."""
+        return tuple(str(self.children(path[:i])[key]) for i, key in enumerate(path))
+
+    def clear(self) -> None:
+        self._levels.clear()
+        self.cached_nodes = 0
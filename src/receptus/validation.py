@@ -0,0 +1,307 @@
+##
+## Receptus - validation core
+##
+## The matching and validation rules behind ``get_input`` as pure functions:
+## they take the user's text plus precomputed lookup tables and return an
+## ``Outcome`` (value or error message) without printing or prompting.
+## ``Receptus`` wraps them for interactive use; ``ValidationSpec`` and
+## ``validate_records`` apply the same rules to streams of imported values.
+##
+## ``validate_records`` consumes its input in batches, so memory stays
+## bounded for any number of records, and can spread the batches over a
+## process pool. Specs used with a pool must be picklable (module-level
+## validator and transformer functions, in-memory options).
+##
+
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .catalog import BaseCatalog
+from .lazy import resolve_label
+from .normalize import fold
+
+_MISSING = object()  # not an option key (None and other falsy keys are valid keys)
+
+
+class Outcome(NamedTuple):
+    """Result of validating one input: ``error`` is None on success."""
+    value: Any
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def match_single(text: str, processed_keys: Mapping, hotkeys: Mapping, option_enabled: Mapping,
+                 fold_accents: bool = False, folded: Optional[str] = None) -> Outcome:
+    """
+    Resolve ``text`` to one option key by exact key or hotkey. Unknown input
+    gives ``Outcome(None, ...)``; a disabled option gives its key plus an error.
+    Pass ``folded`` when the caller has already folded ``text``.
+    """
+    lower = folded if folded is not None else fold(text, fold_accents)
+    if lower in processed_keys:
+        key = processed_keys[lower]
+    elif lower in hotkeys:
+        key = hotkeys[lower]
+    else:
+        return Outcome(None, f"Unknown option '{text}'.")
+    if not option_enabled.get(key, True):
+        return Outcome(key, f"Option '{text}' is disabled.")
+    return Outcome(key)
+
+
+def match_multi(text: str, processed_keys: Mapping, hotkeys: Mapping, option_enabled: Mapping,
+                min_choices: int = 1, max_choices: Optional[int] = None,
+                expand: Optional[Callable[[str], Optional[List[Any]]]] = None,
+                fold_accents: bool = False) -> Outcome:
+    """
+    Resolve a comma-separated selection to a list of enabled option keys.
+    With ``expand``, a part that is not a key is a query selecting every
+    enabled key it returns (e.g. a metadata query).
+    """
+    chosen, bad = [], []
+    parts = [part.strip() for part in text.split(",")]
+    lowers = [fold(part, fold_accents) for part in parts]
+    # Catalog key views resolve the whole list at once (vectorized for a NumpyCatalog).
+    get_many = getattr(processed_keys, "get_many", None)
+    keys = (get_many(lowers, _MISSING) if get_many is not None
+            else [processed_keys.get(lower, _MISSING) for lower in lowers])
+    for part, lower, key in zip(parts, lowers, keys):
+        if key is _MISSING and lower in hotkeys:
+            key = hotkeys[lower]
+        if key is not _MISSING:
+            if option_enabled.get(key, True):
+                chosen.append(key)
+            else:
+                bad.append(part)
+        else:
+            found = [k for k in (expand(part) or ()) if option_enabled.get(k, True)] if expand else []
+            if found:
+                seen = set(chosen)
+                chosen.extend(k for k in found if k not in seen)
+            else:
+                bad.append(part)
+
+    if bad:
+        return Outcome(None, f'Invalid option(s): {", ".join(bad)}')
+    if len(chosen) < min_choices or (max_choices and len(chosen) > max_choices):
+        return Outcome(None, f'Select between {min_choices} and {max_choices or "∞"} options.')
+    return Outcome(chosen)
+
+
+def apply_free_text(text: str, transformer: Optional[Callable[[str], Any]] = None,
+                    validator: Optional[Callable[[Any], Tuple[bool, str]]] = None) -> Outcome:
+    """Transform, then validate, a free-text answer."""
+    value = text
+    if transformer:
+        try:
+            value = transformer(value)
+        except Exception as e:
+            return Outcome(None, f'Input transformation failed: {e}')
+    if validator:
+        valid, msg = validator(value)
+        if not valid:
+            return Outcome(None, msg or "Invalid input")
+    return Outcome(value)
+
+
+class ValidationSpec:
+    """
+    The non-interactive part of a ``get_input`` call: the same options,
+    enablement, multi-select, free-text, transformer, validator and
+    ``return_format`` rules, applied to one value at a time by calling it.
+    """
+
+    def __init__(
+            self,
+            options: Optional[Any] = None,
+            *,
+            allow_free_text: bool = False,
+            allow_multi: bool = False,
+            min_choices: int = 1,
+            max_choices: Optional[int] = None,
+            validator: Optional[Callable[[Any], Tuple[bool, str]]] = None,
+            transformer: Optional[Callable[[str], Any]] = None,
+            disabled_keys: Optional[set] = None,
+            is_enabled: Optional[Callable[[Any, Any], bool]] = None,
+            default: Any = None,
+            max_input_len: Optional[int] = 500,
+            return_format: str = "key",
+            fold_accents: bool = False,
+            ):
+        if options is not None and not isinstance(options, (dict, BaseCatalog)):
+            options = dict(options)
+        self.options = options or {}
+        self.allow_free_text = allow_free_text
+        self.allow_multi = allow_multi
+        self.min_choices = min_choices
+        self.max_choices = max_choices
+        self.validator = validator
+        self.transformer = transformer
+        self.default = default
+        self.max_input_len = max_input_len
+        self.return_format = return_format
+        # A catalog folds its keys once, when built; input must be folded the same way.
+        self.fold_accents = getattr(self.options, "fold_accents", fold_accents)
+
+        disabled = set(disabled_keys or ())
+        self.option_enabled: Mapping[Any, bool]
+        self.processed_keys: Mapping[str, Any]
+        self.hotkeys: Mapping[str, Any]
+        if isinstance(self.options, BaseCatalog):
+            if disabled or is_enabled:
+                self.option_enabled = self.options.enabled_with(
+                    lambda k, v: k not in disabled and (is_enabled(k, v) if is_enabled else True))
+            else:
+                self.option_enabled = self.options.enabled
+            self.processed_keys = self.options.processed_keys
+            self.hotkeys = self.options.hotkeys
+        else:
+            self.option_enabled = {key: (key not in disabled) and (is_enabled(key, value) if is_enabled else True)
+                                   for key, value in self.options.items()}
+            self.processed_keys = {fold(str(k), fold_accents): k for k in self.options}
+            self.hotkeys = {fold(k, fold_accents): k for k in self.options if isinstance(k, str) and len(k) == 1}
+
+    def format_return(self, key: Any) -> Any:
+        if self.return_format == "value":
+            return resolve_label(self.options[key])
+        if self.return_format == "tuple":
+            return (key, resolve_label(self.options[key]))
+        return key
+
+    def __call__(self, raw: Any) -> Outcome:
+        text = "" if raw is None else str(raw).strip()
+        if not text:
+            if self.default is not None:
+                return Outcome(self.default)
+            if self.allow_free_text and not self.options:
+                return Outcome("")
+            return Outcome(None, "No input provided and no default/current value available.")
+        if self.max_input_len and len(text) > self.max_input_len:
+            return Outcome(None, f"Input too long. Max input size: {self.max_input_len} characters.")
+
+        if self.allow_multi and self.processed_keys:
+            outcome = match_multi(text, self.processed_keys, self.hotkeys, self.option_enabled,
+                                  self.min_choices, self.max_choices, fold_accents=self.fold_accents)
+            return Outcome([self.format_return(k) for k in outcome.value]) if outcome.ok else outcome
+
+        if self.options:
+            outcome = match_single(text, self.processed_keys, self.hotkeys, self.option_enabled, self.fold_accents)
+            if outcome.ok:
+                return Outcome(self.format_return(outcome.value))
+            if outcome.value is not None or not self.allow_free_text:
+                return outcome
+
+        if self.allow_free_text:
+            outcome = apply_free_text(text, self.transformer, self.validator)
+            if outcome.ok and outcome.value is None:
+                return Outcome(None, "Invalid input")
+            return outcome
+        return Outcome(None, f"Unknown option '{text}'.")
+
+
+SpecType = Union[ValidationSpec, Mapping[str, ValidationSpec]]
+
+
+class RecordError(NamedTuple):
+    index: int  # type: ignore[assignment]  # shadows tuple.index; documented as err.index
+    field: Optional[str]
+    value: Any
+    message: str
+
+
+class ValidationBatch(NamedTuple):
+    """``valid`` holds ``(index, cleaned record)`` pairs; ``errors`` the rejected fields."""
+    start: int
+    valid: List[Tuple[int, Any]]
+    errors: List[RecordError]
+
+
+def _check(spec: ValidationSpec, value: Any) -> Outcome:
+    try:
+        return spec(value)
+    except Exception as e:  # a failing validator rejects the record, not the run
+        return Outcome(None, f"{type(e).__name__}: {e}")
+
+
+def validate_batch(spec: SpecType, start: int, records: List[Any]) -> ValidationBatch:
+    """
+    Validate one batch. With a single spec each record is a value; with a
+    mapping of field name to spec each record is a mapping, and the cleaned
+    record is a dict of the validated fields.
+    """
+    valid: List[Tuple[int, Any]] = []
+    errors: List[RecordError] = []
+    for index, record in enumerate(records, start):
+        if isinstance(spec, ValidationSpec):
+            outcome = _check(spec, record)
+            if outcome.ok:
+                valid.append((index, outcome.value))
+            else:
+                errors.append(RecordError(index, None, record, outcome.error or ""))
+            continue
+        cleaned: Dict[str, Any] = {}
+        failed = False
+        for field, field_spec in spec.items():
+            value = record.get(field)
+            outcome = _check(field_spec, value)
+            if outcome.ok:
+                cleaned[field] = outcome.value
+            else:
+                failed = True
+                errors.append(RecordError(index, field, value, outcome.error or ""))
+        if not failed:
+            valid.append((index, cleaned))
+    return ValidationBatch(start, valid, errors)
+
+
+_worker_spec: Optional[SpecType] = None
+
+
+def _init_worker(spec: SpecType) -> None:
+    global _worker_spec
+    _worker_spec = spec
+
+
+def _validate_in_worker(start: int, records: List[Any]) -> ValidationBatch:
+    if _worker_spec is None:
+        raise RuntimeError("validation worker was not initialized")
+    return validate_batch(_worker_spec, start, records)
+
+
+def _batches(records: Iterable[Any], batch_size: int) -> Iterator[Tuple[int, List[Any]]]:
+    it = iter(records)
+    start = 0
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield start, batch
+        start += len(batch)
+
+
+def validate_records(records: Iterable[Any], spec: SpecType, *, batch_size: int = 10_000,
+                     workers: Optional[int] = None) -> Iterator[ValidationBatch]:
+    """
+    Stream ``records`` through ``spec``, yielding one ``ValidationBatch`` per
+    ``batch_size`` records, in input order. With ``workers`` > 1 the batches
+    are validated in a process pool; at most ``2 * workers`` batches are in
+    flight, so the input is still consumed lazily.
+    """
+    if not workers or workers <= 1:
+        for start, batch in _batches(records, batch_size):
+            yield validate_batch(spec, start, batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        pending = []
+        for start, batch in _batches(records, batch_size):
+            pending.append(pool.submit(_validate_in_worker, start, batch))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
@@ -10,7 +10,7 @@ def _mk(with_buf=True):
 
 def test_supports_ansi_true_with_tty_and_env(monkeypatch):
     r = Receptus(output=StringIO())
-    monkeypatch.setattr(sys.stdout, "isatty", lambda: True, raising=False)
+    monkeypatch.setattr(r.output_backend, "isatty", lambda: True)
     monkeypatch.setattr(os, "name", "nt")
     monkeypatch.setenv("WT_SESSION", "1")
     assert r.supports_ansi() is True
@@ -44,7 +44,7 @@ def test_sanitize_ascii_strip():
 
 def test_supports_ansi_false_when_not_tty(monkeypatch):
     r = Receptus(force_no_color=False, output=StringIO())
-    monkeypatch.setattr(sys.stdout, "isatty", lambda: False, raising=False)
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True, raising=False)  # the host's stdout does not matter
     assert r.supports_ansi() is False
 
 def test_color_wrap_respects_force_no_color():
@@ -72,7 +72,19 @@ def test_format_return_variants():
 def test_supports_ansi_posix_tty(monkeypatch):
     r = Receptus(output=StringIO())
     # TTY + non-Windows => True
-    monkeypatch.setattr(sys.stdout, "isatty", lambda: True, raising=False)
+    monkeypatch.setattr(r.output_backend, "isatty", lambda: True)
     monkeypatch.setattr(os, "name", "posix")
     assert r.supports_ansi() is True
 
+
+def test_supports_ansi_follows_the_output_backend(monkeypatch):
+    from receptus.backends import FdOutput, MemoryOutput
+    monkeypatch.setattr(os, "name", "posix")
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: False, raising=False)
+    master, slave = os.openpty()
+    try:
+        assert Receptus(output_backend=FdOutput(slave)).supports_ansi() is True
+    finally:
+        os.close(master)
+        os.close(slave)
+    assert Receptus(output_backend=MemoryOutput()).supports_ansi() is False
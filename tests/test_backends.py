@@ -0,0 +1,67 @@
+# tests/test_backends.py
+import io
+import os
+import pytest
+from receptus import Receptus, ReceptusTimeout
+from receptus.backends import QueueInput, StreamInput, MemoryOutput, FdOutput, NullOutput, StreamOutput
+
+
+def test_queue_input_and_memory_output_drive_get_input():
+    inp, out = QueueInput(["zz", "b"]), MemoryOutput()
+    r = Receptus(input_backend=inp, output_backend=out, force_no_color=True)
+    assert r.get_input(prompt="Pick", options={"a": "Alpha", "b": "Bravo"}) == "b"
+    assert "(a) Alpha" in out.getvalue()
+    assert len(inp.prompts) == 2
+    assert r.line_output is out
+
+
+def test_queue_input_eof_and_timeout():
+    inp = QueueInput(["x"])
+    assert inp.readline("> ") == "x"
+    with pytest.raises(EOFError):
+        inp.readline("> ")
+    with pytest.raises(ReceptusTimeout):
+        inp.readline_timeout("> ", 0.01)
+    inp.close()
+    for _ in range(2):
+        with pytest.raises(EOFError):
+            inp.readline("> ")
+
+
+def test_confirmation_and_timeout_route_through_backend():
+    r = Receptus(input_backend=QueueInput(["maybe", "y"]), output_backend=NullOutput())
+    assert r._get_confirmation("ok? ") is True
+    r = Receptus(input_backend=QueueInput(), output_backend=MemoryOutput())
+    assert r._read_input_with_timeout("> ", timeout_seconds=0.01, mask_input=False) is None
+    assert "Input timed out" in r.output_backend.getvalue()
+
+
+def test_stream_input_keeps_line_after_timeout():
+    rfd, wfd = os.pipe()
+    echo = io.StringIO()
+    inp = StreamInput(os.fdopen(rfd, "r"), echo=echo)
+    with pytest.raises(ReceptusTimeout):
+        inp.readline_timeout("first: ", 0.05)
+    os.write(wfd, b"late\nnext\n")
+    os.close(wfd)
+    assert inp.readline("again: ") == "late"
+    assert inp.readline_timeout("", 1) == "next"
+    with pytest.raises(EOFError):
+        inp.readline("")
+    assert echo.getvalue() == "first: again: "
+
+
+def test_fd_output_writes_encoded_bytes():
+    rfd, wfd = os.pipe()
+    r = Receptus(output_backend=FdOutput(wfd), force_no_color=True)
+    r.out("héllo", line_clear=False)
+    os.close(wfd)
+    assert os.read(rfd, 100) == "héllo\n".encode()
+
+
+def test_stream_output_default_and_legacy_output():
+    buf = io.StringIO()
+    r = Receptus(output=buf)
+    assert isinstance(r.output_backend, StreamOutput) and r.line_output is buf
+    r.out("hi", line_clear=False)
+    assert buf.getvalue() == "hi\n"
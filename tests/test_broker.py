@@ -0,0 +1,110 @@
+# tests/test_broker.py
+import builtins
+import threading
+import pytest
+from concurrent.futures import CancelledError
+from receptus import Receptus, PromptBroker, ReceptusTimeout
+from receptus.backends import ConsoleInput, QueueInput, MemoryOutput
+
+
+def _receptus(lines, blocking=False):
+    inp = QueueInput(lines, blocking=blocking)
+    return Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True), inp
+
+
+def test_requests_are_served_by_priority_then_fifo():
+    r, inp = _receptus(["a1", "a2", "a3", "a4"])
+    broker = PromptBroker(r, start=False)
+    low = broker.submit("low", allow_free_text=True)
+    first = broker.submit("high-1", allow_free_text=True, priority=5)
+    second = broker.submit("high-2", allow_free_text=True, priority=5)
+    mid = broker.submit("mid", allow_free_text=True, priority=1)
+    broker.start()
+    assert [f.result(2) for f in (first, second, mid, low)] == ["a1", "a2", "a3", "a4"]
+    broker.close()
+    out = r.output_backend.getvalue()
+    assert out.index("high-1") < out.index("high-2") < out.index("mid") < out.index("low")
+
+
+def test_many_threads_share_one_terminal():
+    r, inp = _receptus([], blocking=True)
+    results = {}
+    with PromptBroker(r) as broker:
+        def worker(i):
+            results[i] = broker.ask(f"worker {i}", options={"y": "Yes", "n": "No"})
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        inp.feed(*["y", "n"] * 4)
+        for t in threads:
+            t.join(5)
+    assert sorted(results.values()) == ["n"] * 4 + ["y"] * 4
+    frames = r.output_backend.getvalue().split("\n\nworker ")
+    assert all(frame.count("(y) Yes") == 1 for frame in frames[1:])  # no interleaving
+
+
+def test_cancel_and_deadline_and_errors():
+    r, inp = _receptus(["x"])
+    broker = PromptBroker(r, start=False)
+    cancelled = broker.submit("skip me", allow_free_text=True)
+    expired = broker.submit("too late", allow_free_text=True, default="fallback", deadline=0)
+    answered = broker.submit("answer", allow_free_text=True)
+    failing = broker.submit("eof", allow_free_text=True)
+    assert cancelled.cancel()
+    broker.start()
+    assert expired.result(2) == "fallback"
+    assert answered.result(2) == "x"
+    with pytest.raises(EOFError):
+        failing.result(2)
+    with pytest.raises(CancelledError):
+        cancelled.result()
+    assert len(inp.prompts) == 2  # neither the cancelled nor the expired request read input
+    broker.close()
+    with pytest.raises(RuntimeError):
+        broker.submit("closed")
+
+
+def test_keyboard_interrupt_stops_serve_and_reaches_the_requester():
+    class Interrupted(QueueInput):
+        def readline(self, prompt):
+            raise KeyboardInterrupt
+    r = Receptus(input_backend=Interrupted(), output_backend=MemoryOutput(), force_no_color=True)
+    broker = PromptBroker(r, start=False)
+    future = broker.submit("ctrl-c", allow_free_text=True)
+    later = broker.submit("after", allow_free_text=True)
+    with pytest.raises(KeyboardInterrupt):
+        broker.serve()
+    with pytest.raises(KeyboardInterrupt):
+        future.result(0)
+    assert not later.done()
+    broker.close()
+    assert later.cancelled()
+
+
+def test_close_cancels_queued_requests():
+    r, _ = _receptus([])
+    broker = PromptBroker(r, start=False)
+    future = broker.submit("never", allow_free_text=True)
+    broker.close()
+    assert future.cancelled()
+
+
+def test_console_timeout_off_main_thread_keeps_late_line(monkeypatch):
+    release = threading.Event()
+    def slow_input(prompt):
+        release.wait(5)
+        return "late answer"
+    monkeypatch.setattr(builtins, "input", slow_input)
+    console = ConsoleInput()
+    outcome = {}
+    def worker():
+        try:
+            console.readline_timeout("> ", 0.05)
+        except ReceptusTimeout:
+            outcome["timeout"] = True
+        release.set()
+        outcome["next"] = console.readline("> ")
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join(5)
+    assert outcome == {"timeout": True, "next": "late answer"}
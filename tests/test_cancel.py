@@ -0,0 +1,207 @@
+# tests/test_cancel.py
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from receptus import Receptus, CancelToken, PromptServer
+from receptus.backends import ConsoleInput, StreamInput, QueueInput, MemoryOutput, ReceptusCancelled, ReceptusTimeout
+
+OPTIONS = {"a": "Alpha", "b": "Beta"}
+
+
+def cancel_later(token, delay=0.05, reason=None):
+    timer = threading.Timer(delay, token.cancel, kwargs={"reason": reason})
+    timer.start()
+    return timer
+
+
+def test_token_callbacks():
+    token = CancelToken()
+    calls = []
+    token.add_callback(lambda: calls.append("first"))
+    removed = lambda: calls.append("removed")  # noqa: E731
+    token.add_callback(removed)
+    token.remove_callback(removed)
+    token.cancel("stop")
+    token.cancel("again")  # one-shot: the first reason is kept
+    token.add_callback(lambda: calls.append("late"))
+    assert calls == ["first", "late"]
+    assert token.cancelled and token.reason == "stop" and token.wait(0)
+
+
+def test_cancel_wakes_blocked_queue_read():
+    token = CancelToken()
+    events = []
+    r = Receptus(input_backend=QueueInput(blocking=True), output_backend=MemoryOutput(),
+                 on_event=lambda e, c: events.append((e, c)))
+    cancel_later(token, reason="shutdown")
+    start = time.monotonic()
+    result = r.get_input("Pick", options=OPTIONS, cancel=token)
+    assert result is Receptus.CANCELLED
+    assert time.monotonic() - start < 1
+    assert ("cancelled", {"prompt": "Pick", "reason": "shutdown"}) in events
+
+
+def test_cancel_interrupts_timed_read():
+    token = CancelToken()
+    r = Receptus(input_backend=QueueInput(blocking=True), output_backend=MemoryOutput(), cancel=token)
+    cancel_later(token)
+    start = time.monotonic()
+    assert r.get_input("Pick", options=OPTIONS, timeout_seconds=30) is Receptus.CANCELLED
+    assert time.monotonic() - start < 1
+
+
+def test_precancelled_token_returns_without_reading():
+    token = CancelToken()
+    token.cancel()
+    backend = QueueInput(["a"])
+    r = Receptus(input_backend=backend, output_backend=MemoryOutput())
+    assert r.get_input("Pick", options=OPTIONS, cancel=token) is Receptus.CANCELLED
+    assert backend.prompts == []
+    # Without the token the line is still there.
+    assert r.get_input("Pick", options=OPTIONS) == "a"
+
+
+def test_cancel_during_confirmation():
+    token = CancelToken()
+    backend = QueueInput(["a"], blocking=True)
+    r = Receptus(input_backend=backend, output_backend=MemoryOutput())
+    cancel_later(token)
+    assert r.get_input("Pick", options=OPTIONS, confirm=True, cancel=token) is Receptus.CANCELLED
+
+
+def test_cancel_restores_completer_and_outer_token():
+    class FakeReadline:
+        def __init__(self):
+            self.completers = []
+
+        def set_completer(self, fn):
+            self.completers.append(fn)
+
+        def parse_and_bind(self, _):
+            pass
+
+    class Input(QueueInput):
+        def readline_module(self):
+            return fake
+
+    fake = FakeReadline()
+    token = CancelToken()
+    r = Receptus(input_backend=Input(blocking=True), output_backend=MemoryOutput())
+    cancel_later(token)
+    assert r.get_input("Pick", options=OPTIONS, auto_complete=True, cancel=token) is Receptus.CANCELLED
+    assert fake.completers[0] is not None and fake.completers[-1] is None
+    assert r._active_cancel is None
+
+
+def test_tree_select_and_form_pass_cancelled_through():
+    from receptus import Form, Field, OptionGroup
+    token = CancelToken()
+    token.cancel()
+    r = Receptus(input_backend=QueueInput(["x"]), output_backend=MemoryOutput(), cancel=token)
+    tree = {"x": OptionGroup("X", {"y": "Y"})}
+    assert r.tree_select("Where", tree) is Receptus.CANCELLED
+    form = Form(Field("name"), Field("env", options=OPTIONS))
+    assert form.run(r) is Receptus.CANCELLED
+
+
+def test_stream_input_keeps_line_after_cancel():
+    read_fd, write_fd = os.pipe()
+    stream = os.fdopen(read_fd, "r")
+    backend = StreamInput(stream)
+    token = CancelToken()
+    cancel_later(token)
+    with pytest.raises(ReceptusCancelled):
+        backend.readline_cancellable(": ", None, token)
+    os.write(write_fd, b"b\n")
+    assert backend.readline(": ") == "b"
+    os.close(write_fd)
+    stream.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pseudo-terminal")
+def test_console_select_path_on_tty_off_main_thread(monkeypatch):
+    master, slave = os.openpty()
+    tty_in = os.fdopen(slave, "r")
+    monkeypatch.setattr(sys, "stdin", tty_in)
+    monkeypatch.setattr(sys, "stdout", io.StringIO())
+    out = MemoryOutput()
+    outcome = {}
+
+    def worker():
+        backend = ConsoleInput(prompt_output=out)
+        os.write(master, b"b\n")
+        outcome["line"] = backend.readline_cancellable("first: ", 5, CancelToken())
+        token = CancelToken()
+        cancel_later(token)
+        start = time.monotonic()
+        try:
+            backend.readline_cancellable(": ", None, token)
+        except ReceptusCancelled:
+            outcome["cancelled_after"] = time.monotonic() - start
+        outcome["pending"] = backend._pending
+
+    try:
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join(5)
+    finally:
+        tty_in.close()
+        os.close(master)
+    assert outcome["line"] == "b"
+    assert outcome["cancelled_after"] < 1
+    assert outcome["pending"] is None  # no reader thread left behind
+    assert out.getvalue().startswith("first: ")  # prompt went to the output backend, not stdout
+    assert sys.stdout.getvalue() == ""
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs POSIX signals")
+def test_console_cancel_on_main_thread_keeps_readline_input(monkeypatch):
+    calls = []
+
+    def blocking_input(prompt):
+        calls.append(prompt)  # input() is what readline completion and history hook into
+        time.sleep(5)
+        return "never"
+
+    monkeypatch.setattr("builtins.input", blocking_input)
+    backend = ConsoleInput()
+    token = CancelToken()
+    cancel_later(token)
+    start = time.monotonic()
+    with pytest.raises(ReceptusCancelled):
+        backend.readline_cancellable(": ", None, token)
+    assert time.monotonic() - start < 1 and calls == [": "]
+
+    monkeypatch.setattr("builtins.input", lambda prompt: "typed")
+    assert backend.readline_cancellable(": ", 5, CancelToken()) == "typed"
+    monkeypatch.setattr("builtins.input", blocking_input)
+    with pytest.raises(ReceptusTimeout):
+        backend.readline_cancellable(": ", 0.05, CancelToken())
+
+
+def test_server_close_cancels_blocked_sessions():
+    results = []
+    prompted = threading.Event()
+
+    def handler(session):
+        prompted.set()
+        results.append(session.get_input("Pick", options=OPTIONS))
+
+    async def main():
+        server = PromptServer(handler)
+        await server.start_tcp()
+        host, port = server.address[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        await asyncio.get_running_loop().run_in_executor(None, prompted.wait, 5)
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(server.close(), 5)
+        writer.close()
+
+    asyncio.run(main())
+    assert results == [Receptus.CANCELLED]
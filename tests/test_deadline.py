@@ -0,0 +1,158 @@
+# tests/test_deadline.py
+import io
+import os
+import sys
+import time
+
+import pytest
+
+from receptus import Receptus, Deadline, ReceptusTimeout
+from receptus.backends import ConsoleInput, InputBackend, QueueInput, MemoryOutput
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowOperator(InputBackend):
+    """Takes ``think`` fake seconds per answer; times out when the read allows less."""
+
+    def __init__(self, clock, lines, think=10.0):
+        self.clock, self.lines, self.think = clock, list(lines), think
+        self.timeouts = []
+
+    def readline(self, prompt):
+        return self.readline_timeout(prompt, None)
+
+    def readline_timeout(self, prompt, timeout):
+        self.timeouts.append(timeout)
+        if timeout is not None and timeout < self.think:
+            self.clock.now += timeout
+            raise ReceptusTimeout
+        self.clock.now += self.think
+        return self.lines.pop(0)
+
+
+def test_deadline_basics():
+    clock = FakeClock()
+    d = Deadline(5, clock=clock)
+    assert d.cap(None) == 5 and d.cap(2) == 2 and not d.expired()
+    clock.now = 7
+    assert d.remaining() == 0 and d.expired()
+    assert Deadline.coerce(None) is None and Deadline.coerce(d) is d
+    later = Deadline(50, clock=clock)
+    assert Deadline.earliest(None, later, d) is d
+
+
+def test_session_deadline_spans_prompts_and_falls_back():
+    clock = FakeClock()
+    events = []
+    inp = SlowOperator(clock, ["a", "b"])
+    r = Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True,
+                 deadline=Deadline(15, clock=clock), on_event=lambda e, c: events.append(e))
+    assert r.get_input(options={"a": "A", "b": "B"}) == "a"
+    assert r.get_input(options={"a": "A", "b": "B"}, default="b", timeout_seconds=60) == "b"
+    assert inp.timeouts == [15, 5]
+    assert "deadline_expired" in events
+    # An exhausted budget returns the fallback without reading at all.
+    assert r.get_input(allow_free_text=True, on_timeout=lambda: "timeout") == "timeout"
+    assert len(inp.timeouts) == 2
+
+
+def test_confirmation_draws_from_the_same_budget():
+    clock = FakeClock()
+    inp = SlowOperator(clock, ["a"], think=4)
+    out = MemoryOutput()
+    r = Receptus(input_backend=inp, output_backend=out, force_no_color=True)
+    result = r.get_input(options={"a": "A", "b": "B"}, default="b", confirm=True,
+                         deadline=Deadline(6, clock=clock))
+    assert result == "b"  # answered "a", confirmation ran out of time -> fallback, unconfirmed
+    assert inp.timeouts == [6, 2]
+    assert out.getvalue().count("Are you sure") == 0  # prompts go to the input backend
+
+
+def test_real_clock_bounds_blocking_prompt():
+    r = Receptus(input_backend=QueueInput(blocking=True), output_backend=MemoryOutput())
+    started = time.monotonic()
+    assert r.get_input(allow_free_text=True, default="d", confirm=True, deadline=0.05) == "d"
+    assert time.monotonic() - started < 1
+
+
+def test_nested_prompt_inherits_outer_deadline():
+    clock = FakeClock()
+    inp = SlowOperator(clock, ["help", "sub", "x"], think=3)
+    r = Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True)
+    seen = []
+    result = r.get_input(options={"x": "X"}, deadline=Deadline(10, clock=clock),
+                         help_callback=lambda: seen.append(r.get_input(allow_free_text=True)))
+    assert (result, seen) == ("x", ["sub"])
+    assert inp.timeouts == [10, 7, 4]
+    assert r._active_deadline is None
+
+
+class SecretOperator(SlowOperator):
+    def read_secret_timeout(self, prompt, timeout):
+        self.secrets = getattr(self, "secrets", 0) + 1
+        return self.readline_timeout(prompt, timeout)
+
+
+class UntimedSecrets(QueueInput):
+    def read_secret_timeout(self, prompt, timeout):
+        raise NotImplementedError
+
+
+def test_deadline_keeps_input_masked_and_bounds_it():
+    clock = FakeClock()
+    inp = SecretOperator(clock, ["hunter2", "hunter3"], think=3)
+    out = MemoryOutput()
+    r = Receptus(input_backend=inp, output_backend=out, force_no_color=True, deadline=Deadline(5, clock=clock))
+    assert r.get_input("Password", allow_free_text=True, mask_input=True) == "hunter2"
+    assert inp.secrets == 1 and inp.timeouts == [5]
+    assert "will not be masked" not in out.getvalue()
+    # The masked read gets only what is left of the budget, then the fallback applies.
+    assert r.get_input("Password", allow_free_text=True, mask_input=True, default="none") == "none"
+    assert inp.secrets == 2 and inp.timeouts == [5, 2]
+
+
+def test_wrapped_backends_keep_timed_secret_reads_masked(tmp_path):
+    clock = FakeClock()
+    inp = SecretOperator(clock, ["hunter2"], think=3)
+    r = Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True,
+                 deadline=Deadline(5, clock=clock), profile=str(tmp_path))
+    assert r.get_input("Password", allow_free_text=True, mask_input=True) == "hunter2"
+    assert inp.secrets == 1
+
+
+def test_untimed_masked_read_falls_back_without_blocking():
+    inp = UntimedSecrets(blocking=True)
+    r = Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True)
+    started = time.monotonic()
+    assert r.get_input("Password", allow_free_text=True, mask_input=True, default="d", deadline=60) == "d"
+    assert time.monotonic() - started < 1 and inp.prompts == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs a POSIX terminal")
+def test_console_timed_secret_read_is_masked_and_bounded(monkeypatch):
+    import termios
+    master, slave = os.openpty()
+    tty_in = os.fdopen(slave, "r")
+    monkeypatch.setattr(sys, "stdin", tty_in)
+    monkeypatch.setattr(sys, "stdout", io.StringIO())
+    out = MemoryOutput()
+    backend = ConsoleInput(prompt_output=out)
+    try:
+        os.write(master, b"s3cret\n")
+        assert backend.read_secret_timeout("Password: ", 5) == "s3cret"
+        started = time.monotonic()
+        with pytest.raises(ReceptusTimeout):
+            backend.read_secret_timeout("Password: ", 0.05)
+        assert time.monotonic() - started < 1
+        assert termios.tcgetattr(slave)[3] & termios.ECHO  # echo restored
+    finally:
+        tty_in.close()
+        os.close(master)
+    assert out.getvalue() == "Password: \nPassword: \n"
@@ -0,0 +1,146 @@
+# tests/test_forms.py
+import dataclasses
+import json
+import pytest
+from receptus import Receptus, Form, Field, FormError
+from receptus.backends import InputBackend, OutputBackend, QueueInput, MemoryOutput
+
+REGIONS = {"eu": "Europe", "us": "United States"}
+ZONES = {"eu": {"eu1": "Frankfurt", "eu2": "Dublin"}, "us": {"us1": "Virginia"}}
+
+
+def make_form(**kwargs):
+    return Form(
+        Field("region", "Region", options=REGIONS),
+        Field("zone", "Zone", choices_from=lambda a: ZONES[a["region"]]),
+        Field("replicas", "Replicas", allow_free_text=True, transformer=int,
+              validator=lambda v: (0 < v < 10, "1-9 replicas"), default=3, type=int),
+        Field("backup", "Backup region", options=REGIONS,
+              when=lambda a: a["replicas"] > 1, default=lambda a: a["region"]),
+        name="Deployment",
+        **kwargs,
+    )
+
+
+def _receptus(lines, output=None):
+    return Receptus(input_backend=QueueInput(lines), output_backend=output or MemoryOutput(), force_no_color=True)
+
+
+def test_interactive_run_returns_typed_result():
+    form = make_form()
+    result = form.run(_receptus(["us", "eu1", "us1", "", "eu"]))
+    assert type(result).__name__ == "Deployment"
+    assert dataclasses.asdict(result) == {"region": "us", "zone": "us1", "replicas": 3, "backup": "eu"}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.region = "eu"
+    assert {f.name: f.type for f in dataclasses.fields(result)}["replicas"] is int
+
+
+def test_when_skips_field_with_default():
+    result = make_form().run(_receptus(["eu", "eu2", "1"]))
+    assert (result.replicas, result.backup) == (1, "eu")
+
+
+def test_quit_stops_the_form():
+    assert make_form().run(_receptus(["eu", "quit"])) is Receptus.USER_QUIT
+
+
+def test_fill_from_dict_and_file(tmp_path):
+    form = make_form()
+    result = form.fill({"region": "EU", "zone": "eu2", "replicas": 5, "backup": "us"})
+    assert dataclasses.astuple(result) == ("eu", "eu2", 5, "us")
+
+    path = tmp_path / "answers.json"
+    path.write_text(json.dumps({"region": "us", "zone": "us1"}))
+    assert dataclasses.astuple(form.fill(str(path))) == ("us", "us1", 3, "us")
+
+
+def test_fill_rejects_bad_or_missing_answers():
+    form = make_form()
+    with pytest.raises(FormError) as e:
+        form.fill({"region": "eu", "zone": "eu1", "replicas": 42})
+    assert e.value.field == "replicas" and "1-9 replicas" in str(e.value)
+    with pytest.raises(FormError, match="zone"):
+        form.fill({"region": "eu"})
+
+
+def test_partial_answers_prompt_only_for_the_rest():
+    inp = QueueInput(["eu2"])
+    r = Receptus(input_backend=inp, output_backend=MemoryOutput(), force_no_color=True)
+    result = make_form().run(r, answers={"region": "eu", "replicas": 1})
+    assert (result.region, result.zone) == ("eu", "eu2")
+    assert len(inp.prompts) == 1
+
+
+class CountingOutput(OutputBackend):
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+
+def test_one_frame_per_screen_and_shared_index_cache():
+    out = CountingOutput()
+    form = Form(Field("a", options=REGIONS), Field("b", options=REGIONS), matcher=True)
+    r = _receptus(["europe", "us"], output=out)
+    result = form.run(r)
+    assert (result.a, result.b) == ("eu", "us")
+    assert len(out.writes) == 2  # one frame per prompt instead of one write per line
+    assert "(eu) Europe" in out.writes[0]
+    assert len(form.index_cache) == 1  # both fields share the same normalized options and index
+    assert isinstance(r.output_backend, CountingOutput)
+
+
+class FakeReadline:
+    def __init__(self):
+        self.calls = []
+
+    def read_history_file(self, path):
+        self.calls.append("read")
+
+    def write_history_file(self, path):
+        self.calls.append("write")
+
+    def set_completer(self, *_):
+        pass
+
+    def parse_and_bind(self, *_):
+        pass
+
+
+class ReadlineInput(QueueInput):
+    def __init__(self, lines, readline):
+        super().__init__(lines)
+        self.rl = readline
+
+    def readline_module(self):
+        return self.rl
+
+
+def test_history_loaded_and_saved_once(tmp_path):
+    hist = tmp_path / "hist"
+    hist.write_text("")
+    rl = FakeReadline()
+    r = Receptus(input_backend=ReadlineInput(["eu", "us"], rl), output_backend=MemoryOutput())
+    form = Form(Field("a", options=REGIONS, auto_complete=True), Field("b", options=REGIONS, auto_complete=True),
+                history_file=str(hist))
+    form.run(r)
+    assert rl.calls == ["read", "write"]
+
+
+def test_history_save_failure_is_reported_through_the_output(tmp_path):
+    rl = FakeReadline()
+
+    def fail(path):
+        raise OSError("read-only")
+    rl.write_history_file = fail
+    out = MemoryOutput()
+    r = Receptus(input_backend=ReadlineInput(["eu"], rl), output_backend=out)
+    Form(Field("a", options=REGIONS), history_file=str(tmp_path / "hist")).run(r)
+    assert "Warning: Could not save history file: read-only" in out.getvalue()
+
+
+def test_duplicate_field_names_rejected():
+    with pytest.raises(ValueError):
+        Form(Field("a"), Field("a"))
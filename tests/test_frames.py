@@ -0,0 +1,104 @@
+# tests/test_frames.py
+from receptus import Receptus, OptionCatalog, FrameCache
+from receptus.backends import QueueInput, MemoryOutput
+
+OPTIONS = {f"k{i}": f"item {i}" for i in range(20)}
+
+
+class CountingFormatter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, style_type, **kwargs):
+        self.calls += 1
+        return text
+
+
+def make(lines, **kwargs):
+    kwargs.setdefault("frame_cache", 64)
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(),
+                    force_no_color=True, **kwargs)
+
+
+def option_chunks(r):
+    return [c for c in r.output_backend.chunks if "(k0) item 0" in c]
+
+
+def test_retry_and_repeated_runs_reuse_the_rendered_block():
+    fmt = CountingFormatter()
+    r = make(["nope", "k1", "k2"])
+    p = r.compile_prompt("Pick", options=OPTIONS, formatter=fmt, quit_word=None, help_word=None)
+    assert p.run() == "k1"
+    calls = fmt.calls
+    assert p.run() == "k2"
+    assert fmt.calls == calls  # third frame came from the cache too
+    assert calls == len(OPTIONS)  # rendered once for three frames
+    chunks = option_chunks(r)
+    assert len(chunks) == 3 and len(set(chunks)) == 1  # one write per block
+    assert r.frame_cache.hits == 2
+
+
+def test_cache_is_off_by_default_and_skips_rebuilt_tables():
+    fmt = CountingFormatter()
+    r = make(["nope", "k1"], frame_cache=0)
+    assert r.frame_cache is None
+    assert r.get_input("Pick", options=OPTIONS, formatter=fmt, quit_word=None, help_word=None) == "k1"
+    assert fmt.calls == 2 * len(OPTIONS)  # a stateful formatter sees every attempt
+    opts = dict(OPTIONS)
+    r = make(["nope", "k1"])
+    assert r.get_input("Pick", options=lambda: opts) == "k1"
+    assert r.frame_cache.hits == 0  # tables rebuilt per attempt never hit
+
+
+def test_keys_that_compare_equal_but_print_differently_are_not_confused():
+    r = make(["1", "true"])
+    r.get_input("Pick", options={1: "x"})
+    r.get_input("Pick", options={True: "x"})
+    out = r.output_backend.getvalue()
+    assert "(1) x" in out and "(True) x" in out
+
+
+def test_catalog_enabled_changes_invalidate_the_frame():
+    cat = OptionCatalog(OPTIONS)
+    r = make(["k1", "k1", "k1"])
+    r.get_input("Pick", options=cat)
+    cat.set_enabled("k3", False)
+    r.get_input("Pick", options=cat)
+    r.get_input("Pick", options=cat, is_enabled=lambda k, v: k != "k4")
+    chunks = option_chunks(r)
+    assert "[DISABLED]" not in chunks[0]
+    assert "(k3) item 3 [DISABLED]" in chunks[1] and "(k4) item 4 [DISABLED]" not in chunks[1]
+    assert "(k4) item 4 [DISABLED]" in chunks[2]
+    assert r.frame_cache.hits == 0
+
+
+def test_width_and_output_mode_are_part_of_the_key():
+    r = make(["k1", "k1", "k1"])
+    widths = iter([80, 40, 40, 40])
+    r.terminal_width = lambda: next(widths)
+    p = r.compile_prompt("Pick", options=OPTIONS, columns="auto")
+    for _ in range(3):
+        p.run()
+    chunks = option_chunks(r)
+    assert chunks[0] != chunks[1] and chunks[1] == chunks[2]
+    assert r.frame_cache.hits == 1
+    r.force_ascii = True
+    r.input_backend.feed("k1")
+    p.run()
+    assert r.frame_cache.hits == 1
+
+
+def test_lru_is_bounded_and_can_be_disabled():
+    cache = FrameCache(max_entries=2, max_chars=10)
+    cache.put("a", None, "12345")
+    cache.put("b", None, "123")
+    cache.put("c", None, "1234")  # over max_chars: "a" goes
+    assert cache.get("a", None) is None and cache.get("b", None) == "123"
+    cache.put("d", None, "1")  # over max_entries: least recently used "c" goes
+    assert len(cache) == 2 and cache.get("c", None) is None
+    cache.put("huge", None, "x" * 11)
+    assert cache.get("huge", None) is None
+    owner = object()
+    cache.put("e", owner, "1")
+    assert cache.get("e", object()) is None and cache.get("e", owner) == "1"
+    assert make([], frame_cache=0).frame_cache is None
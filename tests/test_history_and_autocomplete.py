@@ -2,6 +2,7 @@
 from io import StringIO
 import types, sys
 from receptus import Receptus
+from receptus.backends import QueueInput, MemoryOutput
 
 def test_history_file_and_autocomplete(monkeypatch, tmp_path):
     # fake readline module
@@ -89,4 +90,20 @@ def test_completer_invoked_and_history_written(monkeypatch, tmp_path):
     assert comp("zzz", 0) is None   # no matches
 
     # History write path executed
-    assert holder["wrote"] is True
\ No newline at end of file
+    assert holder["wrote"] is True
+def test_history_warnings_go_to_the_output_backend(capsys, tmp_path):
+    hist = tmp_path / "hist.txt"
+    hist.write_text("1\n")
+
+    def boom(_p):
+        raise OSError("denied")
+    rl = types.SimpleNamespace(set_completer=lambda _f: None, parse_and_bind=lambda _s: None,
+                               read_history_file=boom, write_history_file=boom)
+    inp = QueueInput(["a"])
+    inp.readline_module = lambda: rl
+    out = MemoryOutput()
+    r = Receptus(input_backend=inp, output_backend=out, force_no_color=True)
+    assert r.get_input(options={"a": "Alpha"}, auto_complete=True, history_file=str(hist)) == "a"
+    assert "Could not load history file: denied" in out.getvalue()
+    assert "Could not save history file: denied" in out.getvalue()
+    assert capsys.readouterr().out == ""
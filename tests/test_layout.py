@@ -0,0 +1,85 @@
+# tests/test_layout.py
+import os
+import signal
+
+import pytest
+
+from receptus import Receptus
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.layout import TerminalSize, display_width, pack, truncate
+
+
+def test_display_width_counts_terminal_cells():
+    assert display_width("abc") == 3
+    assert display_width("日本語") == 6
+    assert display_width("ｱ") == 1  # halfwidth katakana
+    assert display_width("é") == 1  # combining accent
+
+
+def test_truncate_by_cells():
+    assert truncate("short", 10) == "short"
+    assert truncate("abcdefghij", 6) == "abc..."
+    assert truncate("日本語のラベル", 7) == "日本..."
+    assert display_width(truncate("日本語のラベル", 8)) <= 8
+
+
+def test_pack_fills_columns_top_to_bottom():
+    cells = [f"({i}) x" for i in range(7)]  # 5 cells wide
+    grid = pack(cells, 20, gutter=2)
+    assert grid.col_width == 5
+    assert grid.rows == [[0, 3, 6], [1, 4], [2, 5]]
+    fixed = pack(["a" * 30, "b"], 20, columns=2)
+    assert fixed.col_width == 9 and fixed.texts[0] == "aaaaaa..."
+    assert pack(cells, 20, columns="auto", max_cell_width=3).texts[0] == "..."
+    assert pack([], 80).rows == []
+
+
+def make(lines, width=80):
+    r = Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(),
+                 line_clear=False, force_no_color=True)
+    r.terminal_width = lambda: width
+    return r
+
+
+def option_lines(r):
+    return [line for line in r.output_backend.getvalue().splitlines() if line.startswith("    (")]
+
+
+def test_three_hundred_options_fit_in_columns():
+    options = {f"k{i:03d}": f"item {i}" for i in range(300)}
+    r = make(["k150"], width=124)
+    assert r.get_input("Pick", options=options, columns="auto", quit_word=None, help_word=None) == "k150"
+    lines = option_lines(r)
+    assert len(lines) == 43  # 15-cell labels + 2-cell gutter: 7 per 120-cell row
+    assert all(display_width(line) <= 124 for line in lines)
+    assert lines[0].split()[::3] == ["(k000)", "(k043)", "(k086)", "(k129)", "(k172)", "(k215)", "(k258)"]
+
+
+def test_fixed_columns_truncate_and_mark_disabled():
+    options = {"a": "A very long label that cannot fit", "b": "Beta", "c": "Gamma"}
+    r = make(["b"], width=46)
+    r.get_input("Pick", options=options, columns=2, is_enabled=lambda k, v: k != "c")
+    lines = option_lines(r)
+    assert lines[0] == "    (a) A very long l...  (c) Gamma [DISABLED]"
+    assert lines[1] == "    (b) Beta"
+
+
+def test_max_label_width_alone_keeps_one_column():
+    r = make(["a"])
+    r.get_input("Pick", options={"a": "Alphabetical", "b": "B"}, max_label_width=8, quit_word=None, help_word=None)
+    assert option_lines(r) == ["    (a) A...", "    (b) B"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="needs SIGWINCH")
+def test_terminal_size_is_cached_until_sigwinch(monkeypatch):
+    sizes = iter([os.terminal_size((100, 30)), os.terminal_size((60, 30))])
+    monkeypatch.setattr("shutil.get_terminal_size", lambda fallback: next(sizes))
+    previous = signal.getsignal(signal.SIGWINCH)
+    try:
+        tracker = TerminalSize()
+        assert tracker.get().columns == 100
+        assert tracker.get().columns == 100  # cached, not re-queried
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert tracker.get().columns == 60
+    finally:
+        signal.signal(signal.SIGWINCH, previous)
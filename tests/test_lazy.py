@@ -0,0 +1,65 @@
+# tests/test_lazy.py
+from receptus import Receptus, LazyLabel, OptionCatalog
+from receptus.backends import QueueInput, MemoryOutput
+
+
+class Status:
+    """A live status lookup that counts its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def label(self, host):
+        def status():
+            self.calls.append(host)
+            return f"{host} (healthy)"
+        return status
+
+
+def make(lines):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(), force_no_color=True)
+
+
+def test_only_visible_rows_and_the_answer_are_resolved():
+    status = Status()
+    hosts = {f"web-{i:05d}": status.label(f"web-{i:05d}") for i in range(10_000)}
+    r = make(["web-09999"])
+    assert r.get_input("Host", options=hosts, page_size=3, return_format="tuple") == ("web-09999", "web-09999 (healthy)")
+    assert status.calls == ["web-00000", "web-00001", "web-00002", "web-09999"]
+    assert "(web-00001) web-00001 (healthy)" in r.output_backend.getvalue()
+
+
+def test_plain_callables_are_memoized_across_prompts():
+    status = Status()
+    hosts = {"a": status.label("a"), "b": status.label("b")}
+    r = make(["a", "b"])
+    r.get_input("Host", options=hosts)
+    assert r.get_input("Host", options=hosts, return_format="value") == "b (healthy)"
+    assert status.calls == ["a", "b"]
+
+
+def test_lazy_label_expires_and_frames_are_not_cached():
+    now = [0.0]
+    load = iter(["12%", "99%"])
+    cpu = LazyLabel(lambda: f"CPU {next(load)}", ttl=5, clock=lambda: now[0])
+    r = Receptus(input_backend=QueueInput(["x", "x", "x"]), output_backend=MemoryOutput(),
+                 force_no_color=True, frame_cache=64)
+    cat = OptionCatalog({"x": cpu})
+    r.get_input("Host", options=cat)
+    r.get_input("Host", options=cat)
+    now[0] = 10.0
+    r.get_input("Host", options=cat)
+    out = r.output_backend.getvalue()
+    assert out.count("(x) CPU 12%") == 2 and "(x) CPU 99%" in out
+    assert len(r.frame_cache) == 0
+    assert str(cpu) == "CPU 99%" and f"{cpu:>8}" == " CPU 99%"
+
+
+def test_matching_and_search_skip_lazy_labels():
+    status = Status()
+    hosts = {"db": status.label("db"), "web": "Frontend"}
+    r = make(["frontend", "db"])
+    assert r.get_input("Host", options=hosts, matcher=True, page_size=0) == "web"
+    assert status.calls == []  # indexing and matching never resolved the lazy label
+    assert r.get_input("Host", options=hosts, matcher=True, return_format="value") == "db (healthy)"
+    assert status.calls == ["db"]
@@ -0,0 +1,90 @@
+from io import StringIO
+import pytest
+from receptus import Receptus, MappedCatalog
+from receptus.mapped import _grams
+
+
+def _build(tmp_path, options, **kw):
+    path = str(tmp_path / "opts.rcat")
+    MappedCatalog.build(path, options, **kw)
+    return MappedCatalog.open(path)
+
+
+def test_build_and_lookup(tmp_path):
+    opts = {"numpy": "NumPy 2.0", "Pandas": "pandas 2.2", "pytest": "pytest 8", "p": "Pip", "é": "E acute"}
+    with _build(tmp_path, opts, disabled_keys={"pytest"}) as cat:
+        assert len(cat) == 5
+        # Sorted by folded key
+        assert list(cat) == ["numpy", "p", "Pandas", "pytest", "é"]
+        assert cat["Pandas"] == "pandas 2.2"
+        assert "pandas" not in cat
+        assert cat.processed_keys["pandas"] == "Pandas"
+        assert "zzz" not in cat.processed_keys
+        assert cat.hotkeys == {"p": "p", "é": "é"}
+        assert cat.enabled["pytest"] is False and cat.enabled["numpy"] is True
+        assert cat.complete("p") == ["p", "pandas", "pytest"]
+        assert cat.complete("pa") == ["pandas"]
+        assert cat.complete("p", limit=1) == ["p"]
+        assert cat.distinct_count == 5
+        assert dict(cat.items())["é"] == "E acute"
+
+
+def test_fuzzy_via_ngram_index_and_fallback(tmp_path):
+    opts = {f"package-{i:04d}": str(i) for i in range(500)}
+    opts["requests"] = "HTTP"
+    with _build(tmp_path, opts) as cat:
+        assert cat.has_ngram_index
+        assert cat.close_matches("reqests") == ["requests"]
+    with _build(tmp_path, opts, ngram_index=False) as cat:
+        assert not cat.has_ngram_index
+        assert cat.close_matches("reqests") == ["requests"]
+
+
+def test_set_enabled_is_process_local(tmp_path):
+    path = str(tmp_path / "c.rcat")
+    MappedCatalog.build(path, {"a": "A"})
+    with MappedCatalog.open(path) as first, MappedCatalog.open(path) as second:
+        first.set_enabled("a", False)
+        assert first.enabled["a"] is False
+        assert second.enabled["a"] is True
+
+
+def test_close_with_live_views(tmp_path):
+    cat = _build(tmp_path, {"requests": "HTTP", "regex": "re"})
+    (posting,) = [cat._gram_postings(g) for g in _grams(b"req")]
+    enabled = cat.enabled
+    cat.close()  # must not raise BufferError while views are alive
+    assert len(posting) == 1
+    del posting, enabled
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "bogus.rcat"
+    path.write_bytes(b"\0" * 512)
+    with pytest.raises(ValueError):
+        MappedCatalog.open(str(path))
+
+
+def test_get_input_reads_from_mapped_catalog_with_paging(tmp_path, monkeypatch):
+    opts = {f"pkg{i:03d}": f"Package {i}" for i in range(100)}
+    buf = StringIO()
+    r = Receptus(output=buf, force_no_color=True)
+    with _build(tmp_path, opts) as cat:
+        seq = iter(["PKG042"])
+        monkeypatch.setattr("builtins.input", lambda _: next(seq))
+        res = r.get_input(prompt="Pick", options=cat, page_size=5, return_format="tuple")
+    assert res == ("pkg042", "Package 42")
+    out = buf.getvalue()
+    assert "(pkg004) Package 4" in out
+    assert "(pkg005)" not in out
+    assert "95 more options not shown" in out
+
+
+def test_page_size_applies_to_plain_dicts():
+    buf = StringIO()
+    r = Receptus(output=buf, force_no_color=True)
+    r._display_prompt("P", {"a": "A", "b": "B", "c": "C"}, {}, r.default_formatter,
+                      False, None, None, None, None, page_size=2)
+    out = buf.getvalue()
+    assert "(b) B" in out and "(c) C" not in out
+    assert "1 more options not shown" in out
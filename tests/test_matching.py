@@ -0,0 +1,80 @@
+from io import StringIO
+from receptus import Receptus, Matcher, OptionIndex, OptionCatalog
+from receptus.matching import ExactStage, SubstringStage, FuzzyStage
+
+COLORS = {"r": "Red", "g": "Green", "b": "Blue", "gy": "Grey", "lg": "Light Green"}
+
+
+def _match(query, options=COLORS, **kw):
+    m = Matcher(**kw)
+    return m.match(m.build_index(options), query)
+
+
+def test_exact_key_and_hotkey_accept():
+    assert _match("g").accepted.key == "g"
+    assert _match("G").accepted.stage == "exact"
+
+
+def test_label_exact_auto_accepts():
+    res = _match("green")
+    assert res.accepted.key == "g" and res.accepted.stage == "label"
+
+
+def test_prefix_ranking_and_top_k():
+    res = _match("gr", top_k=2)
+    assert res.accepted is None
+    # "Green" and "Grey" are label-word prefixes; neither key starts with "gr"
+    assert {m.key for m in res.candidates} == {"g", "gy"}
+    res = _match("l")
+    assert res.candidates[0].key == "lg"
+
+
+def test_substring_and_fuzzy_stages():
+    res = _match("reen")
+    assert [m.stage for m in res.candidates][:2] == ["substring", "substring"]
+    res = _match("gren", top_k=3)
+    assert res.candidates[0].key == "g" and res.candidates[0].stage == "fuzzy"
+
+
+def test_tags_and_tie_is_not_accepted():
+    m = Matcher()
+    idx = m.build_index({"web1": "Web 1", "db1": "DB 1", "db2": "DB 2"},
+                        tags={"db1": ["prod"], "db2": ["prod"], "web1": ["edge"]})
+    assert m.match(idx, "edge").accepted.key == "web1"
+    res = m.match(idx, "prod")
+    assert res.accepted is None
+    assert sorted(c.key for c in res.candidates) == ["db1", "db2"]
+
+
+def test_custom_pipeline_and_empty_query():
+    m = Matcher(stages=[ExactStage(), SubstringStage()])
+    idx = m.build_index({"alpha": "A"})
+    assert [c.stage for c in m.match(idx, "lph").candidates] == ["substring"]
+    assert m.match(idx, "al").candidates == []
+    assert m.match(idx, "   ").accepted is None
+
+
+def test_stages_only_touch_indexed_candidates():
+    idx = OptionIndex({f"key{i}": f"label {i}" for i in range(1000)})
+    seen = []
+    stage = FuzzyStage(candidates=10)
+    real = idx.lower_key
+    idx.lower_key = lambda pos: seen.append(pos) or real(pos)
+    list(stage.search(idx, "key999x"))
+    assert 0 < len(set(seen)) <= 10
+
+
+def test_index_accepts_catalog():
+    idx = OptionIndex(OptionCatalog(COLORS))
+    assert Matcher().match(idx, "blue").accepted.key == "b"
+
+
+def test_get_input_with_matcher_accepts_label(monkeypatch):
+    buf = StringIO()
+    r = Receptus(output=buf, force_no_color=True)
+    seq = iter(["Gr", "Green"])
+    monkeypatch.setattr("builtins.input", lambda _: next(seq))
+    res = r.get_input(options=COLORS, matcher=True, is_enabled=lambda k, v: k != "gy")
+    assert res == "g"
+    out = buf.getvalue()
+    assert "Did you mean: g, lg?" in out  # disabled "gy" is not suggested
@@ -0,0 +1,102 @@
+# tests/test_memo.py
+import pickle
+
+from receptus import Receptus, Memoized, memoize, Form, Field
+from receptus.backends import QueueInput, MemoryOutput
+
+
+class Calls:
+    def __init__(self):
+        self.seen = []
+
+    def transform(self, text):
+        self.seen.append(("t", text))
+        return text.upper()
+
+    def validate(self, value):
+        self.seen.append(("v", value))
+        return (value != "BAD", "bad value")
+
+
+def make(lines):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput())
+
+
+def square(x):
+    return x * x
+
+
+def test_memoize_is_a_bounded_lru():
+    calls = []
+
+    @memoize(maxsize=2)
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    assert [double(1), double(1), double(2), double(3), double(1)] == [2, 2, 4, 6, 2]
+    assert calls == [1, 2, 3, 1] and len(double) == 2  # 1 was evicted by 3
+    assert double(True) == 2 and calls[-1] is True  # equal but differently typed arguments are not conflated
+    assert double.invalidate(1) and not double.invalidate(3)
+    assert double([1]) == [1, 1]  # unhashable: computed, not cached
+    double.cache_clear()
+    assert len(double) == 0 and double.__name__ == "double"
+
+
+def test_exceptions_are_not_cached_and_memo_pickles():
+    attempts = []
+
+    @memoize
+    def flaky(x):
+        attempts.append(x)
+        if len(attempts) == 1:
+            raise OSError("not yet")
+        return x
+
+    try:
+        flaky("a")
+    except OSError:
+        pass
+    assert flaky("a") == "a" and attempts == ["a", "a"]
+    copy = pickle.loads(pickle.dumps(memoize(square)))
+    assert isinstance(copy, Memoized) and copy(3) == 9
+
+
+def test_pure_prompt_reuses_results_after_declined_confirm():
+    calls = Calls()
+    r = make(["path", "n", "path", "y"])
+    value = r.get_input("Path", allow_free_text=True, transformer=calls.transform, validator=calls.validate,
+                        pure=True, confirm=True)
+    assert value == "PATH"
+    assert calls.seen == [("t", "path"), ("v", "PATH")]
+
+
+def test_session_scope_spans_prompts_and_can_be_cleared():
+    calls = Calls()
+    r = make(["x", "x", "x", "x"])
+    for _ in range(2):
+        r.get_input("X", allow_free_text=True, transformer=calls.transform, pure="session")
+    assert calls.seen == [("t", "x")]
+    r.get_input("X", allow_free_text=True, transformer=calls.transform, pure=True)  # prompt scope: own cache
+    r.clear_memos(calls.transform)
+    r.get_input("X", allow_free_text=True, transformer=calls.transform, pure="session")
+    assert calls.seen == [("t", "x")] * 3
+
+
+def test_compiled_prompt_keeps_its_cache_until_cleared():
+    calls = Calls()
+    r = make(["a", "a", "a"])
+    p = r.compile_prompt("A", allow_free_text=True, validator=calls.validate, pure=True)
+    assert p.run() == p.run() == "a"
+    p.clear_memos()
+    p.run()
+    assert calls.seen == [("v", "a"), ("v", "a")]
+
+
+def test_form_fields_pass_pure_through():
+    calls = Calls()
+    r = make(["bad", "good", "good"])
+    form = Form(Field("name", allow_free_text=True, transformer=calls.transform, validator=calls.validate,
+                      pure="session"))
+    assert form.run(r).name == form.run(r).name == "GOOD"
+    assert calls.seen == [("t", "bad"), ("v", "BAD"), ("t", "good"), ("v", "GOOD")]
@@ -0,0 +1,57 @@
+# tests/test_metadata.py
+from receptus import Receptus, MetaIndex, OptionCatalog
+from receptus.backends import QueueInput, MemoryOutput
+
+HOSTS = {"h1": "pg-primary", "h2": "pg-replica", "h3": "web-1", "h4": "pg-staging"}
+META = {
+    "h1": {"env": "prod", "role": "db", "aliases": ["primary"], "description": "Main Postgres"},
+    "h2": {"env": "prod", "role": "db", "tags": ["replica"]},
+    "h3": {"env": "prod", "role": ["web", "cache"]},
+    "h4": ["env:staging", "role:db"],
+    "gone": {"env": "prod"},
+}
+
+
+def make(lines):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(), force_no_color=True)
+
+
+def test_index_intersects_postings():
+    index = MetaIndex(HOSTS, META)
+    assert index.query("env:prod role:db") == ["h1", "h2"]
+    assert index.query("ROLE:db") == ["h1", "h2", "h4"]
+    assert index.query("role:cache") == ["h3"]
+    assert index.query("primary") == ["h1"] and index.query("postgres") == ["h1"]
+    assert index.query("env:prod role:nope") == [] and index.query("  ") is None
+    assert index.postings("env:prod") == [0, 1, 2]  # metadata for unknown keys is ignored
+    assert MetaIndex(OptionCatalog(HOSTS), META).query("env:staging") == ["h4"]
+
+
+def test_single_select_by_alias_or_unique_query():
+    r = make(["primary", "env:prod role:db", "replica"])
+    p = r.compile_prompt("Host", options=HOSTS, option_meta=META)
+    assert p.run() == "h1"
+    assert p.run() == "h2"  # the ambiguous query listed both, then the alias picked one
+    assert "Matches: h1, h2." in r.output_backend.getvalue()
+
+
+def test_disabled_options_drop_out_of_queries():
+    r = make(["env:prod role:db"])
+    assert r.get_input("Host", options=HOSTS, option_meta=META, is_enabled=lambda k, v: k != "h2") == "h1"
+
+
+def test_multi_select_expands_queries():
+    r = make(["env:prod role:db, h4, replica"])
+    assert r.get_input("Hosts", options=HOSTS, option_meta=META, allow_multi=True, return_format="value") == [
+        "pg-primary", "pg-replica", "pg-staging"]
+
+
+def test_index_is_built_once_per_option_set():
+    cache = {}
+    r = make(["primary", "primary"])
+    r.get_input("Host", options=OptionCatalog(HOSTS), option_meta=META, index_cache=cache)
+    p = r.compile_prompt("Host", options=HOSTS, option_meta=META, index_cache=cache)
+    index = p.meta_index(p.options)
+    assert p.run() == "h1"
+    assert p.meta_index(p.options) is index
+    assert len([k for k in cache if k[0] == "meta"]) == 2
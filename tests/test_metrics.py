@@ -0,0 +1,122 @@
+# tests/test_metrics.py
+import threading
+import urllib.request
+
+from receptus import Receptus, MetricsRegistry, Matcher, CancelToken
+from receptus.backends import QueueInput, MemoryOutput
+
+OPTIONS = {"apple": "Apple", "banana": "Banana"}
+
+
+def make(lines, metrics):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(), metrics=metrics)
+
+
+def test_prompt_metrics_are_counted():
+    m = MetricsRegistry()
+    r = make(["nope", "x" * 20, "apple"], m)
+    assert r.get_input("Fruit", options=OPTIONS, max_input_len=10) == "apple"
+    assert m.value("prompts_shown") == 3
+    assert m.value("invalid_inputs", ("Unknown option",)) == 1
+    assert m.value("invalid_inputs", ("Input too long",)) == 1
+    assert m.value("prompt_attempts") == 1  # one observation per call
+    assert m.value("answer_seconds") == 1 and m.value("render_seconds") == 3
+
+    assert make(["quit"], m).get_input("Fruit", options=OPTIONS) is Receptus.USER_QUIT
+    assert m.value("quits") == 1
+
+
+def test_disabled_selection_is_counted_once():
+    m = MetricsRegistry()
+    r = make(["banana", "apple"], m)
+    assert r.get_input("Fruit", options=OPTIONS, is_enabled=lambda k, v: k != "banana", allow_free_text=True) == "apple"
+    assert m.value("invalid_inputs", ("Option disabled",)) == 1
+    assert m.value("invalid_inputs", ("Unknown option",)) == 0
+    assert "not a valid option" not in r.output_backend.getvalue()
+
+
+def test_disabled_selection_still_fires_input_invalid():
+    events = []
+    r = Receptus(input_backend=QueueInput(["banana", "apple"]), output_backend=MemoryOutput(),
+                 metrics=MetricsRegistry(), on_event=lambda e, c: events.append((e, c)))
+    r.get_input("Fruit", options=OPTIONS, disabled_keys={"banana"})
+    invalid = [c for e, c in events if e == "input_invalid"]
+    assert invalid == [{"input": "banana", "reason": "Option disabled", "key": "banana"}]
+
+
+def test_fuzzy_timeout_and_cancel_metrics():
+    m = MetricsRegistry()
+    r = make(["appel", "apple"], m)
+    assert r.get_input("Fruit", options=OPTIONS, fuzzy_match=True) == "apple"
+    assert m.value("fuzzy_hits", ("suggested",)) == 1
+
+    r = make(["cherry"], m)
+    assert r.get_input("Fruit", options={"c1": "Cherry"}, matcher=Matcher()) == "c1"
+    assert m.value("fuzzy_hits", ("accepted",)) == 1
+
+    r = Receptus(input_backend=QueueInput(blocking=True), output_backend=MemoryOutput(), metrics=m)
+    assert r.get_input("Fruit", options=OPTIONS, timeout_seconds=0.01, default="apple") == "apple"
+    assert m.value("timeouts") == 1
+
+    token = CancelToken()
+    token.cancel()
+    assert r.get_input("Fruit", options=OPTIONS, cancel=token) is Receptus.CANCELLED
+    assert m.value("cancelled") == 1
+
+
+def test_threads_aggregate_into_one_view():
+    m = MetricsRegistry()
+
+    def worker():
+        for _ in range(1000):
+            m.inc("prompts_shown")
+            m.observe("render_seconds", 0.002)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert m.value("prompts_shown") == 4000
+    assert m.value("render_seconds") == 4000
+
+
+def test_prometheus_text_format():
+    m = MetricsRegistry()
+    m.inc("invalid_inputs", ('bad "quote"',))
+    m.observe("render_seconds", 0.003)
+    m.observe("render_seconds", 0.2)
+    text = m.render()
+    assert "# TYPE receptus_prompts_shown_total counter\nreceptus_prompts_shown_total 0\n" in text
+    assert 'receptus_invalid_inputs_total{reason="bad \\"quote\\""} 1' in text
+    assert 'receptus_render_seconds_bucket{le="0.001"} 0' in text
+    assert 'receptus_render_seconds_bucket{le="0.005"} 1' in text
+    assert 'receptus_render_seconds_bucket{le="+Inf"} 2' in text
+    assert "receptus_render_seconds_count 2" in text
+    assert text.endswith("\n")
+
+
+def test_custom_metrics_and_file_dump(tmp_path):
+    m = MetricsRegistry(namespace="app")
+    m.counter("deploys", "Deploys started.", ("env",))
+    m.inc("deploys", ("prod",), amount=2)
+    path = tmp_path / "receptus.prom"
+    m.write(str(path))
+    text = path.read_text()
+    assert 'app_deploys_total{env="prod"} 2' in text
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_http_endpoint():
+    m = MetricsRegistry()
+    m.inc("quits")
+    server = m.serve()
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "receptus_quits_total 1" in body
+    finally:
+        server.shutdown()
+        server.server_close()
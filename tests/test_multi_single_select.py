@@ -1,5 +1,6 @@
 from io import StringIO
 from receptus import Receptus
+from receptus.receptus import _REJECTED
 
 def _mk(with_buf=True):
     buf = StringIO()
@@ -26,9 +27,9 @@ def test_handle_single_select_disabled_branch():
     r, buf = _mk()
     processed = {"a":"a"}
     hot = {}
-    # option exists but disabled -> return None and print error
+    # option exists but disabled -> rejected and print error
     assert r._handle_single_select("a", processed, hot, {"a": False},
-                                   r.default_formatter, False, 0.75, {}, lambda k:k) is None
+                                   r.default_formatter, False, 0.75, {}, lambda k:k) is _REJECTED
 
 def test_handle_multi_select_good_and_disabled(capsys):
     r, _ = _mk()
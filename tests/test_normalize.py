@@ -0,0 +1,69 @@
+# tests/test_normalize.py
+from receptus import Receptus, Matcher, MappedCatalog, OptionCatalog, ValidationSpec
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.normalize import fold, strip_accents
+from receptus.search import IncrementalFilter
+
+
+def make(lines, **kw):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(), force_no_color=True, **kw)
+
+
+def test_fold():
+    assert fold("Straße") == fold("STRASSE") == "strasse"
+    assert fold("１２") == "12"
+    assert fold("ﬁle") == "file"
+    assert fold("Café") == "café"
+    assert fold("Café", accents=True) == "cafe"
+    assert fold("Café") == "café"  # decomposed input composes like the key
+    assert strip_accents("Ångström") == "Angstrom"
+
+
+def test_dict_options_match_casefolded_and_width_folded_input():
+    options = {"Straße": "Street", "12": "Twelve", "Ä": "A umlaut"}
+    r = make(["STRASSE", "１２", "ä"])
+    assert r.get_input("Pick", options=options) == "Straße"
+    assert r.get_input("Pick", options=options) == "12"
+    assert r.get_input("Pick", options=options) == "Ä"
+
+
+def test_accents_fold_with_force_ascii_only():
+    options = {"café": "Coffee", "thé": "Tea"}
+    assert make(["cafe"], force_ascii=True).get_input("Pick", options=options) == "café"
+    r = make(["cafe"])
+    assert r.get_input("Pick", options=options, attempts=1) is None
+
+
+def test_catalogs_fold_accents_when_asked():
+    catalog = OptionCatalog({"Café": "Coffee", "Straße": "Street"}, fold_accents=True)
+    assert catalog.find(fold("CAFE", accents=True)) == 0
+    assert catalog.index_of("Café") == 0
+    r = make(["CAFE, strasse"])
+    assert r.get_input("Pick", options=catalog, allow_multi=True) == ["Café", "Straße"]
+    assert OptionCatalog({"Café": "Coffee"}).find("cafe") == -1
+
+
+def test_matcher_and_search_fold_labels():
+    options = {"s1": "Große Straße", "s2": "Kleine Gasse"}
+    m = Matcher()
+    assert m.match(m.build_index(options), "GROSSE STRASSE").accepted.key == "s1"
+    flt = IncrementalFilter(options)
+    assert [pos for pos, _ in flt.update("STRASSE")] == [0]
+    assert IncrementalFilter({"c": "Café"}, fold_accents=True).update("cafe") != []
+
+
+def test_validation_spec_folds_input():
+    spec = ValidationSpec({"Straße": "Street"})
+    assert spec("STRASSE").value == "Straße"
+    assert ValidationSpec({"café": "Coffee"}, fold_accents=True)("CAFE").value == "café"
+
+
+def test_mapped_catalog_keeps_its_folding(tmp_path):
+    path = str(tmp_path / "opts.rcat")
+    MappedCatalog.build(path, {"Straße": "Street", "Café": "Coffee"}, fold_accents=True)
+    catalog = MappedCatalog.open(path)
+    assert catalog.fold_accents
+    assert list(catalog) == ["Café", "Straße"]  # sorted by folded key
+    assert catalog.index_of("Straße") == 1
+    assert catalog.find("strasse") == 1
+    assert catalog.processed_keys["cafe"] == "Café"
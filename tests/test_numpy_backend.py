@@ -0,0 +1,55 @@
+# tests/test_numpy_backend.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from receptus import Receptus, OptionCatalog
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.numpy_backend import NumpyCatalog
+from receptus.search import IncrementalFilter
+
+OPTIONS = {"Apple": "Red fruit", "apricot": "Orange fruit", "b": "Banana", "APPLE": "Shouting", 7: "Seven",
+           "cherry": "Dark red"}
+
+
+def test_matches_option_catalog():
+    ref, cat = OptionCatalog(OPTIONS), NumpyCatalog(OPTIONS)
+    assert list(cat.items()) == list(ref.items())
+    assert list(cat.iter_lower()) == list(ref.iter_lower()) and cat.distinct_count == ref.distinct_count
+    for low in ["apple", "apricot", "7", "b", "nope", ""]:
+        assert cat.find(low) == ref.find(low)
+    for key in ["Apple", "APPLE", 7, "7", "zzz"]:
+        assert cat.index_of(key) == ref.index_of(key)
+    for prefix in ["", "a", "ap", "apr", "c", "x"]:
+        assert cat.complete(prefix) == ref.complete(prefix)
+    assert cat.hotkeys == ref.hotkeys == {"b": "b"}
+
+
+def test_batch_lookup_and_substring_search():
+    cat = NumpyCatalog(OPTIONS)
+    assert cat.find_many(["cherry", "nope", "apple"]).tolist() == [5, -1, 3]
+    assert NumpyCatalog().find_many(["a"]).tolist() == [-1]
+    assert cat.search("red").tolist() == [0, 5]
+    assert cat.search("red", match_labels=False).tolist() == []
+    assert IncrementalFilter(cat).update("fruit") == IncrementalFilter(OptionCatalog(OPTIONS)).update("fruit")
+
+
+def test_usable_in_get_input():
+    cat = NumpyCatalog({f"host{i:05d}": f"Host {i}" for i in range(5000)}, disabled_keys=["host00002"])
+    r = Receptus(input_backend=QueueInput(["host00002", "HOST04999", "host00001,host00003"]),
+                 output_backend=MemoryOutput())
+    assert r.get_input("Pick", options=cat, page_size=5) == "host04999"
+    assert r.get_input("Pick", options=cat, allow_multi=True) == ["host00001", "host00003"]
+    assert "is disabled" in r.output_backend.getvalue()
+
+
+def test_multi_select_uses_one_batch_lookup(monkeypatch):
+    import receptus
+    assert receptus.NumpyCatalog is NumpyCatalog
+    cat = NumpyCatalog(OPTIONS)
+    calls = []
+    find_many = cat.find_many
+    monkeypatch.setattr(NumpyCatalog, "find_many", lambda self, lowers: calls.append(lowers) or find_many(lowers))
+    r = Receptus(input_backend=QueueInput(["cherry, b, 7"]), output_backend=MemoryOutput())
+    assert r.get_input("Pick", options=cat, allow_multi=True) == ["cherry", "b", 7]
+    assert calls == [["cherry", "b", "7"]]
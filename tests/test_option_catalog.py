@@ -0,0 +1,107 @@
+from io import StringIO
+import tracemalloc
+from receptus import Receptus, OptionCatalog
+
+
+def _mk():
+    buf = StringIO()
+    return Receptus(force_no_color=True, output=buf), buf
+
+
+def test_catalog_mapping_and_views():
+    cat = OptionCatalog({"a": "Alpha", "Beta": "Bravo", 3: "Three"}, disabled_keys={"Beta"})
+    assert len(cat) == 3
+    assert list(cat) == ["a", "Beta", 3]
+    assert cat["Beta"] == "Bravo" and cat[3] == "Three"
+    assert "beta" not in cat and "Beta" in cat
+    assert dict(cat.items()) == {"a": "Alpha", "Beta": "Bravo", 3: "Three"}
+    assert list(cat.values()) == ["Alpha", "Bravo", "Three"]
+    assert cat.processed_keys["beta"] == "Beta"
+    assert cat.processed_keys["3"] == 3
+    assert cat.hotkeys == {"a": "a"}
+    assert cat.enabled.get("Beta", True) is False
+    assert cat.enabled.get("a", True) is True
+    assert list(cat.iter_entries()) == [("a", "Alpha", True), ("Beta", "Bravo", False), (3, "Three", True)]
+
+
+def test_catalog_shadowed_keys_and_toggle():
+    cat = OptionCatalog.from_pairs([("A", "upper"), ("a", "lower")])
+    # last key wins the lowercase slot, earlier key still reachable by exact key
+    assert cat.processed_keys["a"] == "a"
+    assert cat["A"] == "upper"
+    v = cat.version
+    cat.set_enabled("A", False)
+    assert cat.version == v + 1
+    assert cat.enabled["A"] is False and cat.enabled["a"] is True
+    cat.set_enabled("A")
+    assert cat.enabled["A"] is True
+
+
+def test_catalog_complete_and_close_matches():
+    cat = OptionCatalog({"apple": 1, "apricot": 2, "banana": 3})
+    assert cat.complete("ap") == ["apple", "apricot"]
+    assert cat.complete("z") == []
+    assert cat.close_matches("aple") == ["apple"]
+
+
+def test_enabled_with_predicate_combines_bitmap():
+    cat = OptionCatalog({"a": "A", "b": "B", "c": "C"}, disabled_keys=["c"])
+    view = cat.enabled_with(lambda k, v: k != "b")
+    assert [view[k] for k in "abc"] == [True, False, False]
+
+
+def test_get_input_accepts_catalog(monkeypatch):
+    r, buf = _mk()
+    cat = OptionCatalog({"r": "Red", "g": "Green", "b": "Blue"}, disabled_keys={"b"})
+    seq = iter(["b", "G"])
+    monkeypatch.setattr("builtins.input", lambda _: next(seq))
+    res = r.get_input(prompt="Color", options=cat, return_format="tuple")
+    assert res == ("g", "Green")
+    out = buf.getvalue()
+    assert "(r) Red" in out
+    assert "(b) Blue [DISABLED]" in out
+    assert "is disabled" in out
+
+
+def test_get_input_catalog_multi_fuzzy_and_predicate(monkeypatch):
+    r, buf = _mk()
+    cat = OptionCatalog({"alpha": "A", "bravo": "B", "charlie": "C"})
+    seq = iter(["alpa", "alpha", "alpha,bravo"])
+    monkeypatch.setattr("builtins.input", lambda _: next(seq))
+    assert r.get_input(options=cat, fuzzy_match=True) == "alpha"
+    assert "Did you mean: alpha?" in buf.getvalue()
+    res = r.get_input(options=cat, allow_multi=True, is_enabled=lambda k, v: k != "charlie")
+    assert res == ["alpha", "bravo"]
+    assert "(charlie) C [DISABLED]" in buf.getvalue()
+
+
+def _per_option_bytes(build, n):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        obj = build(n)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del obj
+    return size / n
+
+
+def test_catalog_memory_per_option_is_below_dict_bookkeeping():
+    n = 20000
+
+    def dict_path(n):
+        # What get_input holds for a plain dict: the copy plus the per-attempt structures.
+        opts = {f"Pkg-{i:06d}": f"Package {i}" for i in range(n)}
+        enabled = {k: True for k in opts}
+        processed = {str(k).lower(): k for k in opts}
+        hotkeys = {str(k)[0].lower(): k for k in opts if len(k) == 1}
+        return opts, enabled, processed, hotkeys, list(processed)
+
+    def catalog_path(n):
+        return OptionCatalog.from_pairs((f"Pkg-{i:06d}", f"Package {i}") for i in range(n))
+
+    dict_bytes = _per_option_bytes(dict_path, n)
+    catalog_bytes = _per_option_bytes(catalog_path, n)
+    assert catalog_bytes < dict_bytes, f"catalog {catalog_bytes:.0f} B/option, dict path {dict_bytes:.0f} B/option"
@@ -0,0 +1,39 @@
+import difflib
+from io import StringIO
+from receptus import Receptus, Matcher
+from receptus.matching import FuzzyStage, default_stages
+from receptus.parallel import ParallelFuzzyScorer
+
+KEYS = [f"package-{i:04d}" for i in range(400)] + ["requests", "request-toolbelt", "urllib3"]
+
+
+def test_below_threshold_stays_in_process():
+    with ParallelFuzzyScorer(KEYS, workers=4) as scorer:
+        assert scorer.parallel is False
+        assert scorer.close_matches("reqests") == difflib.get_close_matches("reqests", KEYS)
+
+
+def test_sharded_pool_matches_difflib():
+    with ParallelFuzzyScorer(KEYS, workers=2, threshold=0) as scorer:
+        assert scorer.parallel is True
+        assert scorer.shards() == [(0, 202), (202, 403)]
+        for word in ("reqests", "package-0042", "urlib"):
+            assert scorer.close_matches(word, n=5, cutoff=0.6) == \
+                difflib.get_close_matches(word, KEYS, n=5, cutoff=0.6)
+    assert scorer.parallel is False  # closed
+
+
+def test_fuzzy_stage_and_get_input_accept_backend(monkeypatch):
+    opts = {k: k.upper() for k in KEYS}
+    with ParallelFuzzyScorer(KEYS, workers=1) as scorer:
+        stages = [s for s in default_stages() if not isinstance(s, FuzzyStage)] + [FuzzyStage(scorer=scorer)]
+        m = Matcher(stages=stages)
+        res = m.match(m.build_index(opts), "urlib")
+        assert res.candidates[0].key == "urllib3"
+
+        buf = StringIO()
+        r = Receptus(output=buf, force_no_color=True)
+        seq = iter(["reqests", "requests"])
+        monkeypatch.setattr("builtins.input", lambda _: next(seq))
+        assert r.get_input(options=opts, fuzzy_match=True, fuzzy_backend=scorer) == "requests"
+        assert "Did you mean: requests" in buf.getvalue()
@@ -0,0 +1,66 @@
+# tests/test_profiling.py
+import os
+import pstats
+import time
+
+from receptus import Receptus, PromptProfiler, OptionGroup
+from receptus.backends import InputBackend, QueueInput, MemoryOutput
+
+
+class SlowInput(InputBackend):
+    """An operator who takes a while to answer."""
+
+    def __init__(self, lines, delay=0.2):
+        self.lines, self.delay = list(lines), delay
+
+    def readline(self, prompt):
+        time.sleep(self.delay)
+        return self.lines.pop(0)
+
+
+def test_off_by_default_leaves_get_input_unwrapped(monkeypatch):
+    monkeypatch.delenv("RECEPTUS_PROFILE", raising=False)
+    r = Receptus(input_backend=QueueInput(["a"]), output_backend=MemoryOutput())
+    assert r.profiler is None
+    assert "get_input" not in vars(r)
+    assert type(r.input_backend) is QueueInput
+
+
+def test_pstats_written_per_prompt_without_input_wait(tmp_path):
+    r = Receptus(input_backend=SlowInput(["x", "a"]), output_backend=MemoryOutput(), profile=str(tmp_path))
+    assert r.get_input("Pick a fruit", options={"a": "Apple"}) == "a"
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith("-0001-Pick-a-fruit.pstats")
+    stats = pstats.Stats(str(tmp_path / files[0]))
+    assert stats.total_tt < 0.2  # the 0.4s spent waiting on the operator is excluded
+    assert any(func[2] == "get_input" for func in stats.stats)
+
+
+def test_env_var_enables_memory_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("RECEPTUS_PROFILE", str(tmp_path))
+    monkeypatch.setenv("RECEPTUS_PROFILE_MEMORY", "1")
+    r = Receptus(input_backend=QueueInput(["a"]), output_backend=MemoryOutput())
+    assert r.profiler.memory
+    r.get_input(options={"a": "Apple"})
+    names = sorted(os.listdir(tmp_path))
+    assert [n.split("-", 2)[2] for n in names] == ["prompt.alloc.txt", "prompt.pstats"]
+    with open(tmp_path / names[0], encoding="utf-8") as f:
+        assert f.readline().startswith("Top 25 allocation sites")
+    assert Receptus(profile=False, output_backend=MemoryOutput()).profiler is None
+
+
+def test_nested_prompts_are_profiled_once_per_outer_call(tmp_path):
+    profiler = PromptProfiler(str(tmp_path))
+    r = Receptus(input_backend=QueueInput(["help", "a", "a"]), output_backend=MemoryOutput(), profile=profiler)
+
+    def help_callback():
+        r.get_input("Inner", options={"a": "Apple"})
+
+    assert r.get_input("Outer", options={"a": "Apple"}, help_callback=help_callback) == "a"
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and "Outer" in files[0]
+
+    tree = {"f": OptionGroup("Fruit", {"a": "Apple"})}
+    r = Receptus(input_backend=QueueInput(["f", "a"]), output_backend=MemoryOutput(), profile=profiler)
+    assert r.tree_select("Where", tree) == ("f", "a")
+    assert len(os.listdir(tmp_path)) == 3  # one dump per level
@@ -0,0 +1,103 @@
+# tests/test_prompt.py
+import time
+
+import pytest
+
+from receptus import Receptus, Prompt, Matcher, Deadline, OptionCatalog
+from receptus.backends import QueueInput, MemoryOutput
+
+HOSTS = {f"h{i}": f"host-{i}" for i in range(50)}
+
+
+class CountingMatcher(Matcher):
+    builds = 0
+
+    def build_index(self, options, tags=None):
+        CountingMatcher.builds += 1
+        return super().build_index(options, tags=tags)
+
+
+def make(lines):
+    return Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput())
+
+
+def test_compiled_prompt_reuses_tables_and_index():
+    CountingMatcher.builds = 0
+    r = make(["h1", "host-2", "", "h3"])
+    confirm = r.compile_prompt("Restart?", options=HOSTS, matcher=CountingMatcher(), return_format="tuple")
+    tables = confirm.tables(confirm.options)
+    assert confirm.run() == ("h1", "host-1")
+    assert confirm() == ("h2", "host-2")  # label match through the prebuilt index
+    assert confirm.run(current_value="h9") == "h9"
+    assert confirm.run() == ("h3", "host-3")
+    assert CountingMatcher.builds == 1
+    assert confirm.tables(confirm.options) is tables
+
+
+def test_prompt_is_immutable_and_slotted():
+    p = make([]).compile_prompt("Pick", options={"a": "Alpha"})
+    with pytest.raises(AttributeError):
+        p.default = "a"
+    with pytest.raises(AttributeError):
+        del p.prompt
+    assert not hasattr(p, "__dict__")
+    q = p.replace(default="a")
+    assert q.default == "a" and p.default is None
+    assert q.index_cache is p.index_cache and q.receptus is p.receptus
+    assert repr(p) == "<Prompt 'Pick'>"
+
+
+def test_static_options_are_copied_but_callables_are_reevaluated():
+    opts = {"a": "Alpha"}
+    r = make(["b", "a", "b"])
+    static = r.compile_prompt("Pick", options=opts, attempts=1)
+    opts["b"] = "Beta"
+    assert static.run() is None  # "b" was added after compiling
+    live = r.compile_prompt("Pick", options=lambda: opts)
+    assert live.run() == "a" and live.run() == "b"
+
+
+def test_is_enabled_is_evaluated_per_attempt():
+    enabled = {"a": False}
+    r = make(["a", "a"])
+    p = r.compile_prompt("Pick", options={"a": "Alpha"}, is_enabled=lambda k, v: enabled.get(k, True), attempts=1)
+    assert p.run() is None
+    enabled["a"] = True
+    assert p.run() == "a"
+
+
+def test_disabled_keys_are_enforced():
+    r = make(["b", "a", "b"])
+    p = r.compile_prompt("Pick", options={"a": "Alpha", "b": "Beta"}, disabled_keys={"b"}, attempts=2)
+    assert p.run() == "a"
+    assert "(b) Beta [DISABLED]" in r.output_backend.getvalue()
+    catalog = OptionCatalog({"a": "Alpha", "b": "Beta"})
+    assert r.get_input("Pick", options=catalog, disabled_keys={"b"}, attempts=1) is None
+
+
+def test_line_settings_apply_while_the_prompt_runs():
+    r = make(["a"])
+    r.line_clear = False
+    assert r.get_input("Pick", options={"a": "Alpha"}, line_end="|\n") == "a"
+    assert "    (a) Alpha|\n" in r.output_backend.getvalue()
+    assert r.line_end == "\n"
+
+
+def test_relative_deadline_starts_at_each_run():
+    r = Receptus(input_backend=QueueInput(blocking=True), output_backend=MemoryOutput())
+    p = r.compile_prompt("Pick", options={"a": "Alpha"}, default="a", deadline=0.05)
+    assert p.run() == "a"
+    r.input_backend.feed("a")
+    assert p.run(current_value=None) == "a"  # the expired first run does not leak into this one
+    assert p.run(deadline=Deadline(0)) == "a"
+    started = time.monotonic()
+    assert p.replace(deadline=60).run(deadline=0) == "a"  # a spent budget is not "no deadline"
+    assert time.monotonic() - started < 1
+
+
+def test_index_cache_is_bounded_for_callable_options():
+    r = make(["zzzz"] * 51)
+    p = r.compile_prompt("Host", options=lambda: dict(HOSTS), matcher=True, attempts=51)
+    assert p.run() is None
+    assert 1 <= len(p.index_cache) <= p.index_cache.max_entries
+    assert all(entry[0] is not HOSTS for entry in p.index_cache.values())
@@ -0,0 +1,66 @@
+# tests/test_replay.py
+import io
+import pytest
+from receptus import Receptus
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.replay import Recorder, ReplayMismatch, load_log, replay
+
+
+def flow(r):
+    color = r.get_input(prompt="Color", options={"r": "Red", "g": "Green"}, fuzzy_match=True)
+    name = r.get_input(prompt="Name", allow_free_text=True, validator=lambda v: (len(v) > 1, "too short"))
+    return color, name
+
+
+def _record(lines, **kwargs):
+    log = io.StringIO()
+    r = Receptus(input_backend=QueueInput(lines), output_backend=MemoryOutput(), force_no_color=True, **kwargs)
+    with Recorder(log).attach(r):
+        result = flow(r)
+    log.seek(0)
+    return result, log
+
+
+def test_record_then_replay_matches():
+    result, log = _record(["rd", "g", "x", "Ann"])
+    records = load_log(log)
+    assert result == ("g", "Ann")
+    assert [rec["d"] for rec in records if rec["k"] == "in"] == ["rd", "g", "x", "Ann"]
+    assert all(rec["dt"] >= 0 for rec in records if rec["k"] == "in")
+    assert any(rec["k"] == "ev" and rec["e"] == "input_invalid" for rec in records)
+
+    replayed = replay(records, flow, force_no_color=True)
+    assert replayed.result == ("g", "Ann")
+    assert replayed.inputs == 4
+
+
+def test_replay_detects_changed_output():
+    _, log = _record(["r", "Bob"])
+    def changed(r):
+        r.out("extra banner")
+        return flow(r)
+    with pytest.raises(ReplayMismatch, match="output differs"):
+        replay(log, changed, force_no_color=True)
+
+
+def test_replay_realtime_and_timeouts(monkeypatch):
+    log = io.StringIO()
+    r = Receptus(input_backend=QueueInput(), output_backend=MemoryOutput(), force_no_color=True)
+    with Recorder(log).attach(r):
+        r.get_input(allow_free_text=True, timeout_seconds=0.01, on_timeout=lambda: "late")
+    log.seek(0)
+    records = load_log(log)
+    assert [rec["k"] for rec in records if rec["k"] in ("in", "timeout")] == ["timeout"]
+
+    slept = []
+    monkeypatch.setattr("receptus.replay.time.sleep", slept.append)
+    out = replay(records, lambda r: r.get_input(allow_free_text=True, timeout_seconds=0.01, on_timeout=lambda: "late"),
+                 realtime=True, speed=2.0, force_no_color=True)
+    assert out.result == "late" and len(slept) == 1
+
+
+def test_load_log_rejects_other_files(tmp_path):
+    path = tmp_path / "x.jsonl"
+    path.write_text('{"k":"out","d":"x"}\n')
+    with pytest.raises(ValueError):
+        load_log(str(path))
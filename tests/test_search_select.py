@@ -0,0 +1,132 @@
+from io import StringIO
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from receptus import Receptus, UserQuit, CancelToken
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.search import IncrementalFilter, read_keys, KEY_ENTER, KEY_BACKSPACE, KEY_DOWN, KEY_ESCAPE, KEY_UP
+
+
+OPTS = {"us-east": "Virginia", "us-west": "Oregon", "eu-west": "Ireland", "ap-south": "Mumbai"}
+
+
+def _mk():
+    buf = StringIO()
+    return Receptus(output=buf, force_no_color=True), buf
+
+
+def test_filter_narrows_previous_result_set():
+    flt = IncrementalFilter(OPTS)
+    assert [p for p, _ in flt.update("w")] == [1, 2]
+    # Narrowing only inspects the previous survivors.
+    flt._stack[-1][1].pop()  # drop eu-west from the survivors
+    assert [p for p, _ in flt.update("we")] == [1]
+    # Backspace pops back to the cached set for "w".
+    assert [p for p, _ in flt.update("w")] == [1]
+    assert [p for p, _ in flt.update("ireland")] == [2]
+
+
+def test_filter_ranks_key_prefix_first_and_limits():
+    flt = IncrementalFilter({"xeu": "a", "eu-1": "b", "eu-2": "c"})
+    flt.update("eu")
+    assert flt.top(2) == [1, 2]
+    assert flt.top(5) == [1, 2, 0]
+    assert flt.count() == 3
+    flt.update("")
+    assert flt.top(2) == [0, 1]
+
+
+def test_filter_keys_only():
+    flt = IncrementalFilter(OPTS, match_labels=False)
+    assert flt.update("oregon") == []
+
+
+def test_search_loop_select_with_arrows():
+    r, buf = _mk()
+    keys = iter(["u", "s", KEY_DOWN, KEY_DOWN, KEY_UP, KEY_DOWN, KEY_ENTER])
+    res = r._search_loop("Region", OPTS, keys, 5, True, None, r.default_formatter, "tuple")
+    assert res == ("us-west", "Oregon")
+    out = buf.getvalue()
+    assert "> us" in out and "2 of 4 options" in out
+    assert "\033[" in out and "F" in out  # redraws move the cursor up
+
+
+def test_search_loop_disabled_no_match_backspace_and_escape():
+    r, buf = _mk()
+    keys = iter(["z", KEY_ENTER, KEY_BACKSPACE, "e", "u", KEY_ENTER, KEY_ESCAPE])
+    res = r._search_loop(None, OPTS, keys, 5, True, lambda k, v: k != "eu-west",
+                         r.default_formatter, "key")
+    assert isinstance(res, UserQuit)
+    out = buf.getvalue()
+    assert "No matching option." in out
+    assert "is disabled" in out
+    # End of key stream returns None
+    assert r._search_loop(None, OPTS, iter([]), 5, True, None, r.default_formatter, "key") is None
+
+
+def test_search_select_falls_back_without_tty(monkeypatch):
+    r, buf = _mk()
+    monkeypatch.setattr(sys.stdin, "isatty", lambda: False, raising=False)
+    monkeypatch.setattr("builtins.input", lambda _: "eu-west")
+    assert r.search_select("Region", OPTS, return_format="value") == "Ireland"
+
+
+def test_search_select_uses_get_input_for_non_console_backends(monkeypatch):
+    termios = pytest.importorskip("termios")
+    monkeypatch.setattr(sys.stdin, "isatty", lambda: True, raising=False)
+
+    def no_raw_mode(fd):
+        raise AssertionError("the host terminal must not be touched")
+    monkeypatch.setattr(termios, "tcgetattr", no_raw_mode)
+    r = Receptus(input_backend=QueueInput(["zz", "eu-west"]), output_backend=MemoryOutput())
+    assert r.search_select("Region", OPTS, disabled_keys={"us-east"}, attempts=2) == "eu-west"
+
+
+@pytest.fixture
+def console_tty(monkeypatch):
+    pytest.importorskip("termios")
+    master, slave = os.openpty()
+    tty_in = os.fdopen(slave, "r")
+    monkeypatch.setattr(sys, "stdin", tty_in)
+    yield master
+    tty_in.close()
+    os.close(master)
+
+
+def type_later(master, data, delay=0.05):
+    timer = threading.Timer(delay, os.write, (master, data))
+    timer.start()
+    return timer
+
+
+def test_keystroke_mode_honours_disabled_keys_deadline_and_cancel(console_tty):
+    r = Receptus(output_backend=MemoryOutput(), force_no_color=True)
+    type_later(console_tty, b"eu\r")
+    assert r.search_select("Region", OPTS) == "eu-west"
+    type_later(console_tty, b"eu\r\x1b")
+    assert isinstance(r.search_select("Region", OPTS, disabled_keys={"eu-west"}), UserQuit)
+    assert "is disabled" in r.output_backend.getvalue()
+    started = time.monotonic()
+    assert r.search_select("Region", OPTS, default="ap-south", deadline=0.05) == "ap-south"
+    assert r.search_select("Region", OPTS, timeout_seconds=0.05, on_timeout=lambda: "late") == "late"
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    assert r.search_select("Region", OPTS, cancel=token) is Receptus.CANCELLED
+    assert time.monotonic() - started < 2
+    with pytest.raises(TypeError, match="allow_multi"):
+        r.search_select("Region", OPTS, allow_multi=True)
+
+
+def test_read_keys_decodes_tokens():
+    rfd, wfd = os.pipe()
+    os.write(wfd, "ab\x1b[A\x1b[B\x7f\r\x1bx\x15é".encode("utf-8"))
+    os.close(wfd)
+    try:
+        tokens = list(read_keys(rfd))
+    finally:
+        os.close(rfd)
+    assert tokens == ["a", "b", "up", "down", "backspace", "enter", "escape", "x", "clear", "é"]
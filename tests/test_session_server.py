@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import pytest
+from receptus.session import PromptServer, SessionReadline
+
+
+def _handler(session):
+    color = session.get_input(prompt="Color?", options={"r": "Red", "g": "Green"})
+    name = session.get_input(prompt="Name?", allow_free_text=True)
+    session.cache["answers"] = (color, name)
+    session.out(f"bye {name}:{color}")
+
+
+async def _client(connect, answers):
+    reader, writer = await connect()
+    transcript = b""
+    for answer in answers:
+        transcript += await reader.readuntil(b": ")
+        writer.write(answer.encode() + b"\n")
+        await writer.drain()
+    transcript += await reader.read()
+    writer.close()
+    return transcript.decode()
+
+
+def _run(start, connect_factory, n=20):
+    async def main():
+        server = PromptServer(_handler)
+        await start(server)
+        try:
+            clients = [_client(connect_factory(server), [("r", "g")[i % 2], f"user{i}"]) for i in range(n)]
+            return await asyncio.gather(*clients)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_many_concurrent_tcp_sessions():
+    outs = _run(lambda s: s.start_tcp(), lambda s: (lambda: asyncio.open_connection(*s.address)))
+    for i, out in enumerate(outs):
+        assert "Color?" in out and "(g) Green" in out
+        assert f"bye user{i}:{('r', 'g')[i % 2]}" in out
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets")
+def test_unix_socket_session(tmp_path):
+    path = str(tmp_path / "prompt.sock")
+    outs = _run(lambda s: s.start_unix(path), lambda s: (lambda: asyncio.open_unix_connection(path)), n=3)
+    assert "bye user2:r" in outs[2]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets")
+def test_unix_socket_refuses_to_replace_a_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        asyncio.run(PromptServer(_handler).start_unix(str(path)))
+    assert path.read_text() == "keep me"
+
+
+def test_sessions_keep_state_isolated_and_time_out():
+    seen = []
+
+    def handler(session):
+        options = {"apple": "A", "apricot": "B"}
+        original = session._input
+
+        def probe(prompt):
+            completions.append(session.readline.complete("ap"))
+            return original(prompt)
+
+        completions = []
+        session._input = probe
+        session.get_input(options=options, auto_complete=True)
+        seen.append((session.readline.history[:], completions[0]))
+        assert session.readline.get_completer() is None
+        session.cached("n", lambda: len(seen))
+        assert session.get_input(prompt="Wait", allow_free_text=True, timeout_seconds=0.05, default="dflt") == "dflt"
+        session.out("done")
+
+    async def main():
+        server = PromptServer(handler)
+        await server.start_tcp()
+        try:
+            outs = await asyncio.gather(
+                _client(lambda: asyncio.open_connection(*server.address), ["apple"]),
+                _client(lambda: asyncio.open_connection(*server.address), ["apricot"]),
+            )
+        finally:
+            await server.close()
+        return outs
+
+    outs = asyncio.run(main())
+    assert all("done" in o for o in outs)
+    assert sorted(seen) == [(["apple"], ["apple", "apricot"]), (["apricot"], ["apple", "apricot"])]
+
+
+def test_disconnect_ends_session_quietly():
+    events = []
+
+    def handler(session):
+        session.get_input(prompt="Q", options={"a": "A"})
+
+    async def main():
+        server = PromptServer(handler, on_event=lambda ev, ctx: events.append(ev))
+        await server.start_tcp()
+        reader, writer = await asyncio.open_connection(*server.address)
+        await reader.readuntil(b": ")
+        writer.close()
+        for _ in range(100):
+            if not server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        remaining = len(server.sessions)
+        await server.close()
+        return remaining
+
+    assert asyncio.run(main()) == 0
+    assert "session_error" not in events
+
+
+def test_session_readline_history_file(tmp_path):
+    rl = SessionReadline(history_length=2)
+    for line in ("a", "", "b", "c"):
+        rl.add_history(line)
+    assert rl.history == ["b", "c"]
+    path = str(tmp_path / "h")
+    rl.write_history_file(path)
+    other = SessionReadline()
+    other.read_history_file(path)
+    assert other.history == ["b", "c"]
@@ -0,0 +1,89 @@
+# tests/test_sinks.py
+import json
+import threading
+import time
+
+from receptus import Receptus, JsonlEventSink
+from receptus.backends import QueueInput, MemoryOutput
+from receptus.catalog import OptionCatalog
+from receptus.sinks import dumps_line
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_events_are_buffered_until_flush(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonlEventSink(str(path), flush_interval=None, clock=lambda: 42.0)
+    r = Receptus(input_backend=QueueInput(["x", "a"]), output_backend=MemoryOutput(), on_event=sink)
+    assert r.get_input("Pick", options={"a": "Alpha"}) == "a"
+    assert not path.exists() or path.read_bytes() == b""
+    sink.flush()
+    events = read_lines(path)
+    assert [e["event"] for e in events] == ["input_received", "input_invalid", "input_received"]
+    assert events[1]["data"]["valid_keys"] == ["a"] and events[0]["ts"] == 42.0
+    sink.close()
+    sink("late", {})  # dropped after close
+    assert len(read_lines(path)) == 3
+
+
+def test_size_threshold_flushes(tmp_path):
+    path = tmp_path / "events.jsonl"
+    with JsonlEventSink(str(path), flush_bytes=100, flush_interval=None) as sink:
+        for i in range(11):
+            sink("tick", {"i": i})
+        flushed = len(read_lines(path))
+        assert 0 < flushed < 11
+    assert len(read_lines(path)) == 11
+
+
+def test_background_flush_for_idle_prompts(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonlEventSink(str(path), flush_interval=0.01)
+    sink("prompt", {"p": 1})
+    for _ in range(200):
+        if path.exists() and path.read_bytes():
+            break
+        time.sleep(0.01)
+    assert read_lines(path)[0]["data"] == {"p": 1}
+    sink.close()
+
+
+def test_rotation_keeps_bounded_backups(tmp_path):
+    path = tmp_path / "events.jsonl"
+    with JsonlEventSink(str(path), max_bytes=200, backups=2, flush_bytes=1, flush_interval=None) as sink:
+        for i in range(50):
+            sink("tick", {"i": i})
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["events.jsonl", "events.jsonl.1", "events.jsonl.2"]
+    assert all(p.stat().st_size <= 200 for p in tmp_path.iterdir())
+    newest = read_lines(path)[-1]["data"]["i"]
+    assert newest == 49
+    assert read_lines(str(path) + ".1")[-1]["data"]["i"] < read_lines(path)[0]["data"]["i"]
+
+
+def test_serializer_handles_lazy_and_unknown_values():
+    catalog = OptionCatalog({str(i): f"Item {i}" for i in range(5)})
+    record = json.loads(dumps_line({"keys": catalog.keys(), "tags": {"x"}, "obj": object, "k": (1, 2)}))
+    assert record["keys"] == ["0", "1", "2", "3", "4"]
+    assert record["tags"] == ["x"] and record["k"] == [1, 2]
+    assert record["obj"] == repr(object)
+
+
+def test_shared_between_threads(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonlEventSink(str(path), flush_bytes=256, flush_interval=None)
+
+    def worker(n):
+        for i in range(200):
+            sink("tick", {"worker": n, "i": i})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sink.close()
+    assert len(read_lines(path)) == 800
@@ -0,0 +1,79 @@
+# tests/test_tree_select.py
+from io import StringIO
+import builtins
+from receptus import Receptus, OptionGroup, OptionTree
+
+loaded = []
+
+
+def nodes(cluster):
+    def provider():
+        loaded.append(cluster)
+        return {f"{cluster}-n{i}": f"Node {i}" for i in range(3)}
+    return provider
+
+
+def clusters(region):
+    def provider():
+        loaded.append(region)
+        return {f"{region}{i}": OptionGroup(f"Cluster {i}", nodes(f"{region}{i}")) for i in range(2)}
+    return provider
+
+
+def make_tree(max_nodes=10_000):
+    loaded.clear()
+    return OptionTree({"eu": OptionGroup("Europe", clusters("eu")),
+                       "us": OptionGroup("Americas", clusters("us")),
+                       "local": "Localhost"}, max_nodes=max_nodes)
+
+
+def _run(monkeypatch, answers, options, **kwargs):
+    it = iter(answers)
+    monkeypatch.setattr(builtins, "input", lambda _p: next(it))
+    buf = StringIO()
+    r = Receptus(output=buf, force_no_color=True)
+    return r.tree_select("Pick a target", options, **kwargs), buf.getvalue()
+
+
+def test_walks_lazily_and_shows_breadcrumbs(monkeypatch):
+    tree = make_tree()
+    result, out = _run(monkeypatch, ["eu", "eu1", "eu1-n2"], tree)
+    assert result == ("eu", "eu1", "eu1-n2")
+    assert loaded == ["eu", "eu1"]  # the "us" branch was never loaded
+    assert "Europe > Cluster 1\nPick a target" in out
+    assert "(eu) Europe >" in out and "(local) Localhost" in out
+    assert "(back) Go Back" in out
+
+
+def test_back_returns_to_parent_and_reuses_cache(monkeypatch):
+    tree = make_tree()
+    result, out = _run(monkeypatch, ["eu", "back", "us", "back", "eu", "eu0", "eu0-n0"], tree)
+    assert result == ("eu", "eu0", "eu0-n0")
+    assert loaded == ["eu", "us", "eu0"]  # revisiting "eu" hits the cache
+    assert out.count("(back) Go Back") == 4
+
+
+def test_root_leaf_and_quit(monkeypatch):
+    assert _run(monkeypatch, ["local"], make_tree())[0] == ("local",)
+    result, out = _run(monkeypatch, ["quit"], make_tree())
+    assert result is Receptus.USER_QUIT
+    assert "Go Back" not in out  # no back command at the root
+
+
+def test_lru_eviction_by_node_count_keeps_current_path():
+    tree = make_tree(max_nodes=6)
+    tree.children(["eu", "eu0"])
+    assert tree.cached_nodes == 8  # over budget, but every level is on the current path
+    tree.children(["us", "us1"])
+    # root, "us" and "us1" are pinned; the unvisited europe levels were evicted
+    assert tree.cached_nodes == 3 + 2 + 3
+    assert ("eu",) not in tree._levels and ("eu", "eu0") not in tree._levels
+    tree.children(["eu"])
+    assert loaded.count("eu") == 2
+    assert tree.labels(["us", "us1"]) == ("Americas", "Cluster 1")
+
+
+def test_back_word_on_plain_get_input(monkeypatch):
+    monkeypatch.setattr(builtins, "input", lambda _p: "BACK")
+    r = Receptus(output=StringIO())
+    assert r.get_input(options={"a": "A"}, back_word="back") is Receptus.USER_BACK
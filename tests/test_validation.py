@@ -0,0 +1,98 @@
+# tests/test_validation.py
+import itertools
+import pytest
+from receptus import OptionCatalog
+from receptus.validation import (Outcome, ValidationSpec, apply_free_text, match_multi, match_single,
+                                 validate_records)
+
+COLORS = {"r": "Red", "g": "Green", "blue": "Blue"}
+
+
+def even_number(value):
+    return value % 2 == 0, "must be even"
+
+
+def test_core_functions_are_pure_outcomes():
+    keys = {"r": "r", "blue": "blue"}
+    hot = {"r": "r"}
+    enabled = {"r": True, "blue": False}
+    assert match_single("R", keys, hot, enabled) == Outcome("r")
+    assert match_single("blue", keys, hot, enabled) == Outcome("blue", "Option 'blue' is disabled.")
+    assert match_single("x", keys, hot, enabled).value is None
+    assert match_multi("r, x", keys, hot, enabled).error == "Invalid option(s): x"
+    assert match_multi("r", keys, hot, enabled, min_choices=2).error == "Select between 2 and ∞ options."
+    assert apply_free_text("4", int, even_number) == Outcome(4)
+    assert apply_free_text("3", int, even_number).error == "must be even"
+    assert apply_free_text("x", int).error.startswith("Input transformation failed")
+
+
+def test_spec_mirrors_get_input_rules():
+    spec = ValidationSpec(COLORS, disabled_keys={"g"}, return_format="value")
+    assert spec("R") == Outcome("Red")
+    assert not spec("g").ok and not spec("purple").ok and not spec("").ok
+    multi = ValidationSpec(COLORS, allow_multi=True, max_choices=2)
+    assert multi("r,blue").value == ["r", "blue"]
+    assert "Select between" in multi("r,g,blue").error
+    free = ValidationSpec(allow_free_text=True, transformer=int, validator=even_number, default=0)
+    assert free("") == Outcome(0) and free(" 8 ") == Outcome(8) and free("7").error == "must be even"
+    mixed = ValidationSpec(COLORS, allow_free_text=True)
+    assert mixed("teal") == Outcome("teal")
+
+
+def test_spec_resolves_lazy_labels():
+    assert ValidationSpec({"w": lambda: "x"}, return_format="value")("w") == Outcome("x")
+    assert ValidationSpec({"w": lambda: "x"}, return_format="tuple")("w") == Outcome(("w", "x"))
+
+
+def test_multi_select_keeps_falsy_keys_and_their_enabled_state():
+    options = {0: "Zero", "": "Blank", 1: "One"}
+    spec = ValidationSpec(options, allow_multi=True, disabled_keys={0})
+    assert not spec("0,1").ok
+    assert ValidationSpec(options, allow_multi=True)("0,1").value == [0, 1]
+    assert ValidationSpec(options, allow_multi=True)(" , 1").value == ["", 1]
+
+
+def test_spec_accepts_catalogs():
+    catalog = OptionCatalog(COLORS)
+    spec = ValidationSpec(catalog, disabled_keys={"r"})
+    assert spec("blue").value == "blue" and not spec("r").ok
+    assert catalog.is_enabled_at(catalog.index_of("r"))  # the catalog itself is untouched
+
+
+def test_streaming_batches_with_errors():
+    consumed = []
+    def source():
+        for i in range(25):
+            consumed.append(i)
+            yield str(i)
+    spec = ValidationSpec(allow_free_text=True, transformer=int, validator=even_number)
+    batches = validate_records(source(), spec, batch_size=10)
+    first = next(batches)
+    assert len(consumed) == 10  # lazy: only the first batch has been read
+    assert first.start == 0 and [v for _, v in first.valid] == [0, 2, 4, 6, 8]
+    rest = list(batches)
+    assert [b.start for b in rest] == [10, 20]
+    errors = [e for b in [first] + rest for e in b.errors]
+    assert [e.index for e in errors] == list(range(1, 25, 2))
+    assert errors[0].message == "must be even" and errors[0].value == "1"
+
+
+def test_record_mapping_and_failing_validator():
+    def broken(_):
+        raise RuntimeError("boom")
+    spec = {"color": ValidationSpec(COLORS), "size": ValidationSpec(allow_free_text=True, transformer=int,
+                                                                    validator=broken)}
+    (batch,) = validate_records([{"color": "r", "size": "1"}, {"color": "x"}], spec)
+    assert batch.valid == []
+    assert [(e.index, e.field) for e in batch.errors] == [(0, "size"), (1, "color")]
+    assert batch.errors[0].message == "RuntimeError: boom"
+
+
+def test_process_pool_matches_serial():
+    spec = {"color": ValidationSpec(COLORS), "n": ValidationSpec(allow_free_text=True, transformer=int,
+                                                                 validator=even_number)}
+    records = [{"color": c, "n": str(n)} for c, n in zip(itertools.cycle(["r", "g", "nope"]), range(300))]
+    serial = list(validate_records(records, spec, batch_size=50))
+    parallel = list(validate_records(iter(records), spec, batch_size=50, workers=2))
+    assert parallel == serial
+    assert sum(len(b.valid) for b in serial) == 100